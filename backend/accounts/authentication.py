@@ -0,0 +1,87 @@
+"""
+Token authentication backed by the cache.
+
+``CachedTokenAuthentication`` keeps the resolved ``(user, token)`` pair for
+``AUTH_TOKEN_CACHE_TIMEOUT`` seconds, so most requests authenticate without
+touching the database. Entries are bounded by the cache's own eviction
+(``MAX_ENTRIES`` for the local-memory backend) and are dropped by the signal
+handlers in ``accounts.signals`` on logout, profile or role changes and
+deactivation.
+
+Those handlers only clear the cache of the process they run in, so tokens
+are cached only when ``CACHE_SHARED`` says every worker uses the same cache.
+Otherwise a token revoked through one worker would keep authenticating on
+the others; each request then looks the token up like ``TokenAuthentication``.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+def _token_key(key):
+    return f'auth:token:{key}'
+
+
+def _user_key(user_id):
+    return f'auth:user:{user_id}'
+
+
+def invalidate_token(key):
+    cache.delete(_token_key(key))
+
+
+def invalidate_user(user_id):
+    key = cache.get(_user_key(user_id))
+    if key is not None:
+        cache.delete_many([_token_key(key), _user_key(user_id)])
+
+
+def _entries(key, user, token):
+    return {
+        _token_key(key): (user, token),
+        # Reverse mapping so user changes can find the cached token.
+        _user_key(user.pk): key,
+    }
+
+
+def _timeout():
+    return getattr(settings, 'AUTH_TOKEN_CACHE_TIMEOUT', 300)
+
+
+def _enabled():
+    return getattr(settings, 'CACHE_SHARED', False)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        if not _enabled():
+            return super().authenticate_credentials(key)
+
+        cached = cache.get(_token_key(key))
+        if cached is not None:
+            return cached
+
+        user, token = super().authenticate_credentials(key)
+        cache.set_many(_entries(key, user, token), _timeout())
+        return user, token
+
+    async def aauthenticate_credentials(self, key):
+        """``authenticate_credentials`` for async views, using the async cache and ORM."""
+        if _enabled():
+            cached = await cache.aget(_token_key(key))
+            if cached is not None:
+                return cached
+
+        model = self.get_model()
+        try:
+            token = await model.objects.select_related('user').aget(key=key)
+        except model.DoesNotExist:
+            raise exceptions.AuthenticationFailed(_('Invalid token.'))
+        if not token.user.is_active:
+            raise exceptions.AuthenticationFailed(_('User inactive or deleted.'))
+        if _enabled():
+            await cache.aset_many(_entries(key, token.user, token), _timeout())
+        return token.user, token
@@ -1,15 +1,43 @@
 from rest_framework import serializers
 from django.contrib.auth import authenticate
+from taskapp.serializers import EagerLoadingMixin, ValuesSerializer
 from .models import User
 
 
-class UserSerializer(serializers.ModelSerializer):
+class UserSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ('id', 'username', 'email', 'first_name', 'last_name', 'role', 'phone', 'avatar')
         read_only_fields = ('id',)
 
 
+class UserValuesSerializer(ValuesSerializer):
+    """``.values()`` counterpart of ``UserSerializer`` used by ``UserMap``."""
+    model = User
+    fields = UserSerializer.Meta.fields
+    computed = {'avatar': ('avatar',)}
+    
+    @classmethod
+    def render_ids(cls, user_ids, request=None):
+        serializer = cls({'request': request, 'user_map': None})
+        rows = serializer.values(User.objects.filter(pk__in=user_ids))
+        return {row['id']: serializer.to_representation(row) for row in rows}
+    
+    @classmethod
+    async def arender_ids(cls, user_ids, request=None):
+        serializer = cls({'request': request, 'user_map': None})
+        rows = serializer.values(User.objects.filter(pk__in=user_ids))
+        return {row['id']: serializer.to_representation(row) async for row in rows}
+    
+    def get_avatar(self, row):
+        if not row['avatar']:
+            return None
+        # Same URL ImageField would render, absolute when a request is known
+        url = User._meta.get_field('avatar').storage.url(row['avatar'])
+        request = self.context.get('request')
+        return request.build_absolute_uri(url) if request is not None else url
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, min_length=8)
     password_confirm = serializers.CharField(write_only=True, min_length=8)
@@ -0,0 +1,36 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from rest_framework import exceptions
+from rest_framework.authtoken.models import Token
+
+from . import authentication
+from .authentication import CachedTokenAuthentication
+from .models import User
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user('employee', password='x')
+        self.token = Token.objects.create(user=self.user)
+        self.backend = CachedTokenAuthentication()
+
+    @override_settings(CACHE_SHARED=True)
+    def test_shared_cache_skips_the_lookup(self):
+        self.backend.authenticate_credentials(self.token.key)
+        with self.assertNumQueries(0):
+            user, token = self.backend.authenticate_credentials(self.token.key)
+        self.assertEqual(user, self.user)
+
+        self.token.delete()
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials(self.token.key)
+
+    @override_settings(CACHE_SHARED=False)
+    def test_per_process_cache_is_not_trusted(self):
+        key = self.token.key
+        self.token.delete()
+        # Left behind in the cache of a worker that did not see the logout.
+        cache.set_many(authentication._entries(key, self.user, self.token))
+        with self.assertRaises(exceptions.AuthenticationFailed):
+            self.backend.authenticate_credentials(key)
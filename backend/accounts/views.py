@@ -6,6 +6,7 @@ from rest_framework.authtoken.models import Token
 from django.db import transaction
 from django.conf import settings
 import logging
+from taskapp.response_cache import conditional_response
 from .serializers import UserSerializer, UserRegistrationSerializer, LoginSerializer
 from .models import User
 
@@ -67,6 +68,7 @@ def logout(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_response(lambda request: [f'user:{request.user.pk}'])
 def profile(request):
     serializer = UserSerializer(request.user)
     return Response(serializer.data)
@@ -84,6 +86,7 @@ def update_profile(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@conditional_response(lambda request: ['users'])
 def employee_list(request):
     if not request.user.is_admin:
         return Response(
@@ -0,0 +1,40 @@
+import json
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authentication import TokenAuthentication
+from rest_framework.authtoken.models import Token
+
+from accounts.authentication import CachedTokenAuthentication
+from benchmarks import seed
+from benchmarks.timing import measure
+
+
+class Command(BaseCommand):
+    help = 'Compare per-request authentication cost of TokenAuthentication and CachedTokenAuthentication'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeat', type=int, default=2000)
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        admin, _ = seed.seed_users()
+        key = Token.objects.get_or_create(user=admin)[0].key
+        cache.clear()
+
+        results = {}
+        for name, backend in (('token', TokenAuthentication()), ('cached_token', CachedTokenAuthentication())):
+            authenticate = lambda: backend.authenticate_credentials(key)
+            latency = measure(authenticate, repeat=options['repeat'], warmup=1)
+            with CaptureQueriesContext(connection) as ctx:
+                authenticate()
+            results[name] = {**latency, 'queries_per_request': len(ctx)}
+            self.stdout.write(
+                f'{name:<13} p50={latency["p50_ms"]:.4f}ms p95={latency["p95_ms"]:.4f}ms queries={len(ctx)}'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'benchmark': 'auth', 'repeat': options['repeat'], 'results': results}, fh, indent=2)
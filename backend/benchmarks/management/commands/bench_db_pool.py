@@ -0,0 +1,104 @@
+import json
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+from django.db.utils import load_backend
+
+from benchmarks.timing import summarize
+from taskapp import db_pool
+
+MODES = {
+    'direct': 'django.db.backends.postgresql',
+    'pooled': 'taskapp.postgresql_pool',
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare opening a PostgreSQL connection per request with the connection pool: each thread '
+        'repeatedly connects, runs one short query and closes, like a request with CONN_MAX_AGE=0'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent threads, like gunicorn threads or ASGI requests')
+        parser.add_argument('--requests', type=int, default=200, help='Requests per thread')
+        parser.add_argument('--query', default='SELECT COUNT(*) FROM notifications_notification WHERE is_read = false')
+        parser.add_argument('--max-size', type=int, help='Pool MAX_SIZE (default: the configured one)')
+        parser.add_argument('--only', choices=list(MODES), help='Benchmark one mode only')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        settings_dict = connections[DEFAULT_DB_ALIAS].settings_dict
+        if settings_dict['ENGINE'] not in MODES.values():
+            raise CommandError('bench_db_pool needs a PostgreSQL DATABASE_URL')
+        pool = {**db_pool.POOL_DEFAULTS, **settings_dict.get('POOL', {})}
+        if options['max_size']:
+            pool.update(MAX_SIZE=options['max_size'], MIN_SIZE=min(pool['MIN_SIZE'], options['max_size']))
+
+        results = {}
+        for mode, engine in MODES.items():
+            if options['only'] and mode != options['only']:
+                continue
+            config = {**settings_dict, 'ENGINE': engine, 'CONN_MAX_AGE': 0, 'POOL': pool}
+            result = results[mode] = self.run(f'bench_{mode}', config, options)
+            self.stdout.write(
+                f'{mode:<7} {result["throughput_rps"]:>8.1f} req/s  p50={result["p50_ms"]:.2f}ms '
+                f'p95={result["p95_ms"]:.2f}ms  connections opened={result["connections_opened"]}'
+            )
+        db_pool.close_pools(lambda key: key[0] == 'bench_pooled')
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({
+                    'benchmark': 'db_pool', 'threads': options['threads'], 'requests': options['requests'],
+                    'query': options['query'], 'pool': pool, 'results': results,
+                }, fh, indent=2)
+
+    def run(self, alias, config, options):
+        DatabaseWrapper = load_backend(config['ENGINE']).DatabaseWrapper
+        pool = DatabaseWrapper(dict(config), alias).get_pool() if hasattr(DatabaseWrapper, 'get_pool') else None
+        if pool is not None:
+            # A running worker would already hold MIN_SIZE open connections.
+            time.sleep(1)
+        samples = [[] for _ in range(options['threads'])]
+        # connection_created fires on every connect(), pooled or not.
+        connects = []
+
+        def count(sender, connection, **kwargs):
+            if connection.alias == alias:
+                connects.append(1)
+
+        def worker(index):
+            wrapper = DatabaseWrapper(dict(config), alias)
+            for _ in range(options['requests']):
+                start = time.perf_counter()
+                with wrapper.cursor() as cursor:
+                    cursor.execute(options['query'])
+                    cursor.fetchall()
+                # What request_finished does with CONN_MAX_AGE=0.
+                wrapper.close()
+                samples[index].append((time.perf_counter() - start) * 1000)
+
+        opened_before = pool.stats()['opened'] if pool else 0
+        connection_created.connect(count)
+        threads = [threading.Thread(target=worker, args=(index,)) for index in range(options['threads'])]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+        connection_created.disconnect(count)
+
+        flat = [sample for thread_samples in samples for sample in thread_samples]
+        result = {
+            'requests': len(flat), 'duration_s': round(elapsed, 3),
+            'throughput_rps': round(len(flat) / elapsed, 2), **summarize(flat),
+            'connections_opened': pool.stats()['opened'] - opened_before if pool else len(connects),
+        }
+        if pool:
+            result['pool'] = pool.stats()
+        return result
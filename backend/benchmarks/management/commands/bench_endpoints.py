@@ -0,0 +1,118 @@
+import json
+import time
+from datetime import timedelta
+
+from django.core.cache import cache, caches
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from benchmarks import seed
+from benchmarks.timing import summarize
+from notifications.models import Notification
+from taskapp.response_cache import RESPONSE_CACHE_ALIAS
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Time every API view in-process and count the queries it issues'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=seed.SCALES, help='Seed up to this scale first')
+        parser.add_argument('--repeat', type=int, default=30)
+        parser.add_argument('--warm', action='store_true', help='Keep caches between calls instead of clearing them')
+        parser.add_argument('--only', action='append', help='Only run endpoints whose name contains this (repeatable)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        if options['scale']:
+            seed.seed_scale(options['scale'], log=self.stdout.write)
+        admin, employees = seed.seed_users()
+        employee = employees[0]
+        clients = {
+            user.pk: Client(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
+            for user in (admin, employee)
+        }
+
+        results = []
+        for name, user, method, url, body in self.get_endpoints(admin, employee):
+            if options['only'] and not any(part in name for part in options['only']):
+                continue
+            call = self.caller(clients[user.pk], method, url, body)
+            samples, status = [], None
+            for _ in range(options['repeat'] + 1):
+                if not options['warm']:
+                    self.clear_caches()
+                start = time.perf_counter()
+                status = call().status_code
+                samples.append((time.perf_counter() - start) * 1000)
+            if not options['warm']:
+                self.clear_caches()
+            with CaptureQueriesContext(connection) as ctx:
+                call()
+            # The first call warms imports and connections; it is not counted.
+            result = {'name': name, 'method': method, 'url': url, 'status': status, 'queries': len(ctx), **summarize(samples[1:])}
+            results.append(result)
+            self.stdout.write(
+                f'{name:<28} {status} p50={result["p50_ms"]:>9.2f}ms p95={result["p95_ms"]:>9.2f}ms queries={len(ctx)}'
+            )
+
+        if options['output']:
+            counts = {
+                'tasks': Task.objects.count(),
+                'notifications': Notification.objects.count(),
+            }
+            with open(options['output'], 'w') as fh:
+                json.dump({
+                    'benchmark': 'endpoints', 'vendor': connection.vendor, 'warm': options['warm'],
+                    'repeat': options['repeat'], 'counts': counts, 'generated_at': timezone.now().isoformat(),
+                    'results': results,
+                }, fh, indent=2)
+
+    def clear_caches(self):
+        cache.clear()
+        caches[RESPONSE_CACHE_ALIAS].clear()
+
+    def caller(self, client, method, url, body):
+        send = getattr(client, method.lower())
+        if body is None:
+            return lambda: send(url)
+        return lambda: send(url, body, content_type='application/json')
+
+    def get_endpoints(self, admin, employee):
+        task = Task.objects.filter(assigned_to=employee).order_by('-pk').first()
+        notification = Notification.objects.filter(user=employee).order_by('-pk').first()
+        due_date = (timezone.now() + timedelta(days=7)).isoformat()
+
+        endpoints = [
+            ('auth.profile', employee, 'GET', '/api/auth/profile/', None),
+            ('auth.employees', admin, 'GET', '/api/auth/employees/', None),
+            ('tasks.list.admin', admin, 'GET', '/api/tasks/', None),
+            ('tasks.list.employee', employee, 'GET', '/api/tasks/', None),
+            ('tasks.list.filtered', admin, 'GET', '/api/tasks/?status=pending&priority=high', None),
+            ('tasks.list.fields', admin, 'GET', '/api/tasks/?fields=id,title,status&expand=', None),
+            ('tasks.search', admin, 'GET', '/api/tasks/?q=task%2012345', None),
+            ('tasks.statistics.admin', admin, 'GET', '/api/tasks/statistics/', None),
+            ('tasks.statistics.employee', employee, 'GET', '/api/tasks/statistics/', None),
+            ('evaluations.list', admin, 'GET', '/api/tasks/evaluations/', None),
+            ('notifications.list', employee, 'GET', '/api/notifications/', None),
+            ('notifications.unread_count', employee, 'GET', '/api/notifications/unread-count/', None),
+            ('notifications.poll', employee, 'GET', '/api/notifications/poll/', None),
+            ('tasks.create', admin, 'POST', '/api/tasks/', {
+                'title': 'Benchmark task', 'description': 'Created by bench_endpoints',
+                'assigned_to': employee.pk, 'priority': 'medium', 'due_date': due_date,
+            }),
+        ]
+        if task:
+            endpoints += [
+                ('tasks.detail', employee, 'GET', f'/api/tasks/{task.pk}/', None),
+                ('tasks.update_status', employee, 'PUT', f'/api/tasks/{task.pk}/', {'status': 'in_progress'}),
+            ]
+        if notification:
+            endpoints.append(
+                ('notifications.read', employee, 'PUT', f'/api/notifications/{notification.pk}/read/', None)
+            )
+        return endpoints
@@ -0,0 +1,65 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+from django.test import Client, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from benchmarks import seed
+from benchmarks.timing import measure
+from tasks import outbox
+
+
+class Command(BaseCommand):
+    help = 'Compare task creation latency with inline and background outbox dispatch'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=200, help='Task creations per mode')
+        parser.add_argument('--concurrency', type=int, default=4)
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        admin, employees = seed.seed_users()
+        token = Token.objects.get_or_create(user=admin)[0].key
+        payload = {
+            'title': 'Benchmark task',
+            'description': 'Created by bench_notification_dispatch',
+            'assigned_to': employees[0].pk,
+            'due_date': timezone.now().isoformat(),
+        }
+
+        def create_task():
+            client = Client(HTTP_AUTHORIZATION=f'Token {token}')
+            try:
+                return client.post('/api/tasks/', payload, content_type='application/json')
+            finally:
+                close_old_connections()
+
+        results = {}
+        for mode, is_async in (('inline', False), ('background', True)):
+            with override_settings(TASKS_OUTBOX={**settings.TASKS_OUTBOX, 'ASYNC': is_async}):
+                per_worker = max(1, options['requests'] // options['concurrency'])
+                with ThreadPoolExecutor(options['concurrency']) as pool:
+                    stats = list(pool.map(
+                        lambda _: measure(create_task, repeat=per_worker, warmup=1),
+                        range(options['concurrency']),
+                    ))
+                # Stops the background worker and dispatches what it left.
+                outbox.worker.flush()
+            results[mode] = {
+                'p50_ms': round(sorted(s['p50_ms'] for s in stats)[len(stats) // 2], 3),
+                'p95_ms': max(s['p95_ms'] for s in stats),
+            }
+            self.stdout.write(f'{mode:<10} p50={results[mode]["p50_ms"]:.3f}ms p95={results[mode]["p95_ms"]:.3f}ms')
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({
+                    'benchmark': 'notification_dispatch',
+                    'requests': options['requests'],
+                    'concurrency': options['concurrency'],
+                    'results': results,
+                }, fh, indent=2)
@@ -0,0 +1,55 @@
+import json
+
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from benchmarks import seed
+from benchmarks.timing import measure
+from taskapp.pagination import KeysetPagination
+from tasks.models import Task
+
+
+class Command(BaseCommand):
+    help = 'Compare keyset and OFFSET pagination latency on the task list at increasing depths'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Number of tasks expected in the table')
+        parser.add_argument('--seed', action='store_true', help='Insert benchmark tasks until --rows is reached')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        rows, page_size = options['rows'], options['page_size']
+        total = Task.objects.count()
+        if options['seed'] and total < rows:
+            admin, employees = seed.seed_users()
+            self.stdout.write(f'Seeding {rows - total} tasks...')
+            seed.seed_tasks(rows - total, admin, employees)
+            total = rows
+
+        ordered = Task.objects.order_by('-created_at', '-id')
+        depths = sorted({d for d in (0, 1_000, 10_000, 100_000, total // 2, total - page_size - 1) if 0 <= d < total})
+        factory = APIRequestFactory()
+        paginator = KeysetPagination()
+        results = []
+
+        for depth in depths:
+            params = {'page_size': page_size}
+            if depth:
+                # Cursor pointing at the row just before this depth, as a client
+                # paging forward would have received it.
+                params['cursor'] = paginator.encode_cursor(ordered[depth - 1])
+            request = Request(factory.get('/api/tasks/', params))
+
+            keyset = measure(lambda: paginator.paginate_queryset(Task.objects.all(), request), options['repeat'])
+            offset = measure(lambda: list(ordered[depth:depth + page_size]), options['repeat'])
+            results.append({'depth': depth, 'keyset': keyset, 'offset': offset})
+            self.stdout.write(
+                f'depth={depth:>9}  keyset p50={keyset["p50_ms"]:>8.3f}ms  offset p50={offset["p50_ms"]:>8.3f}ms'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'benchmark': 'pagination', 'rows': total, 'page_size': page_size, 'results': results}, fh, indent=2)
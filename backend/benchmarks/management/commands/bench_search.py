@@ -0,0 +1,49 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from benchmarks import seed
+from benchmarks.timing import measure
+from tasks.models import Task
+from tasks.search import icontains_search, search_tasks
+
+QUERIES = ('123456', 'task 99999', 'generated benchmarking', 'nonexistentword')
+
+
+class Command(BaseCommand):
+    help = 'Compare full-text search and icontains latency on the task list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=1_000_000, help='Number of tasks expected in the table')
+        parser.add_argument('--seed', action='store_true', help='Insert benchmark tasks until --rows is reached')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=20)
+        parser.add_argument('--query', action='append', help='Search text to time (repeatable)')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        rows, page_size = options['rows'], options['page_size']
+        total = Task.objects.count()
+        if options['seed'] and total < rows:
+            admin, employees = seed.seed_users()
+            self.stdout.write(f'Seeding {rows - total} tasks...')
+            seed.seed_tasks(rows - total, admin, employees)
+            total = rows
+
+        results = []
+        for query in options['query'] or QUERIES:
+            fulltext = search_tasks(Task.objects.all(), query).values('id')[:page_size]
+            icontains = icontains_search(Task.objects.all(), query).order_by('-created_at', '-pk').values('id')[:page_size]
+            timings = {
+                'fulltext': measure(lambda: list(fulltext.all()), options['repeat']),
+                'icontains': measure(lambda: list(icontains.all()), options['repeat']),
+            }
+            results.append({'query': query, 'matches': len(list(fulltext.all())), **timings})
+            self.stdout.write(
+                f'{query!r:>26}  fulltext p50={timings["fulltext"]["p50_ms"]:>9.3f}ms'
+                f'  icontains p50={timings["icontains"]["p50_ms"]:>9.3f}ms'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'benchmark': 'search', 'rows': total, 'page_size': page_size, 'results': results}, fh, indent=2)
@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from benchmarks import seed
+from benchmarks.timing import measure
+from tasks.models import Task
+from tasks.serializers import TaskSerializer, TaskValuesSerializer
+
+
+class Command(BaseCommand):
+    help = 'Compare TaskSerializer with the .values() based TaskValuesSerializer on a large page of tasks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=10_000, help='Number of tasks rendered per call')
+        parser.add_argument('--seed', action='store_true', help='Insert benchmark tasks until --rows is reached')
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        rows = options['rows']
+        total = Task.objects.count()
+        if options['seed'] and total < rows:
+            admin, employees = seed.seed_users()
+            self.stdout.write(f'Seeding {rows - total} tasks...')
+            seed.seed_tasks(rows - total, admin, employees)
+        tasks = Task.objects.order_by('-created_at', '-id')
+
+        def model_serializer():
+            return TaskSerializer(TaskSerializer.setup_eager_loading(tasks)[:rows], many=True).data
+
+        def values_serializer(sideload_users):
+            context = {'now': timezone.now(), 'sideload_users': sideload_users}
+            serializer = TaskValuesSerializer(context)
+            return serializer.render(serializer.values(tasks)[:rows]), serializer.sideloaded()
+
+        variants = (
+            ('model_serializer', model_serializer),
+            ('values_nested', lambda: values_serializer(False)),
+            ('values_sideloaded', lambda: values_serializer(True)),
+        )
+        results = {}
+        for name, render in variants:
+            latency = measure(render, repeat=options['repeat'], warmup=1)
+            with CaptureQueriesContext(connection) as ctx:
+                payload = json.dumps(render(), default=str)
+            results[name] = {**latency, 'queries': len(ctx), 'payload_bytes': len(payload)}
+            self.stdout.write(
+                f'{name:<18} p50={latency["p50_ms"]:>9.2f}ms p95={latency["p95_ms"]:>9.2f}ms '
+                f'queries={len(ctx)} payload={len(payload) // 1024}KiB'
+            )
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'benchmark': 'serializers', 'rows': rows, 'results': results}, fh, indent=2)
@@ -0,0 +1,98 @@
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+# Fallback when gunicorn is not installed: one single-threaded WSGI process,
+# which is what a gunicorn sync worker amounts to.
+WSGIREF = (
+    'import sys; from wsgiref.simple_server import WSGIRequestHandler, make_server; '
+    'from taskapp.wsgi import application; '
+    'WSGIRequestHandler.log_message = lambda *args: None; '
+    'make_server("127.0.0.1", int(sys.argv[1]), application).serve_forever()'
+)
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def wait_for_port(port, process, timeout=30):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise CommandError(f'Server exited with status {process.returncode}')
+        try:
+            with socket.create_connection(('127.0.0.1', port), timeout=0.5):
+                return
+        except OSError:
+            time.sleep(0.2)
+    raise CommandError(f'Server did not listen on port {port} within {timeout}s')
+
+
+class Command(BaseCommand):
+    help = 'Run load_test against one ASGI worker (async views) and one WSGI worker and compare throughput'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50, help='Concurrent virtual users')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds per server')
+        parser.add_argument('--think-time', type=float, default=0.5)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--only', choices=['asgi', 'wsgi'], help='Benchmark one server only')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def servers(self, port):
+        """(name, server, command, extra environment) for each server, one worker each."""
+        asgi = [sys.executable, '-m', 'uvicorn', 'taskapp.asgi:application', '--port', str(port), '--workers', '1', '--log-level', 'warning']
+        if shutil.which('gunicorn'):
+            wsgi_server, wsgi = 'gunicorn', ['gunicorn', 'taskapp.wsgi:application', '--bind', f'127.0.0.1:{port}', '--workers', '1', '--log-level', 'warning']
+        else:
+            wsgi_server, wsgi = 'wsgiref', [sys.executable, '-c', WSGIREF, str(port)]
+        return [
+            ('asgi', 'uvicorn', asgi, {'ASYNC_VIEWS': 'True'}),
+            ('wsgi', wsgi_server, wsgi, {'ASYNC_VIEWS': 'False'}),
+        ]
+
+    def handle(self, *args, **options):
+        results = {}
+        port = free_port()
+        for name, server, command, env in self.servers(port):
+            if options['only'] and name != options['only']:
+                continue
+            self.stdout.write(f'Starting {name}: {" ".join(command)}')
+            process = subprocess.Popen(command, cwd=settings.BASE_DIR, env={**os.environ, **env})
+            try:
+                wait_for_port(port, process)
+                with tempfile.NamedTemporaryFile(suffix='.json') as output:
+                    call_command(
+                        'load_test', base_url=f'http://127.0.0.1:{port}', users=options['users'],
+                        duration=options['duration'], think_time=options['think_time'],
+                        seed=options['seed'], output=output.name, stdout=self.stdout,
+                    )
+                    results[name] = json.loads(Path(output.name).read_text())
+                results[name]['server'] = server
+            finally:
+                process.terminate()
+                process.wait(timeout=10)
+
+        for name, result in results.items():
+            errors = sum(endpoint['errors'] for endpoint in result['results'].values())
+            self.stdout.write(f'{name}: {result["throughput_rps"]:.1f} req/s per worker, {errors} errors')
+        if {'asgi', 'wsgi'} <= results.keys() and results['wsgi']['throughput_rps']:
+            ratio = results['asgi']['throughput_rps'] / results['wsgi']['throughput_rps']
+            self.stdout.write(self.style.SUCCESS(f'ASGI/WSGI throughput per worker: {ratio:.2f}x'))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'benchmark': 'servers', 'workers': 1, 'users': options['users'], 'results': results}, fh, indent=2)
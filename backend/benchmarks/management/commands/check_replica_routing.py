@@ -0,0 +1,96 @@
+import shutil
+import time
+from contextlib import ExitStack
+from datetime import timedelta
+
+from django.core.cache import caches
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from benchmarks import seed
+from taskapp.db_router import replica_aliases, replica_setting
+from taskapp.response_cache import RESPONSE_CACHE_ALIAS
+
+
+class Command(BaseCommand):
+    help = 'Show which database serves each step of a read/write/read sequence when replicas are configured'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--skip-wait', action='store_true', help='Do not wait for the sticky window to expire')
+        parser.add_argument(
+            '--copy-sqlite', action='store_true',
+            help='Overwrite SQLite replicas with a copy of the SQLite primary first (local setup)',
+        )
+
+    def handle(self, *args, **options):
+        replicas = replica_aliases()
+        if not replicas:
+            raise CommandError(
+                'No replica configured. For a local check set '
+                'DATABASE_REPLICA_URLS=sqlite:////tmp/replica.sqlite3 and pass --copy-sqlite'
+            )
+
+        admin, employees = seed.seed_users(employees=1)
+        for user in [admin] + employees:
+            Token.objects.get_or_create(user=user)
+        if options['copy_sqlite']:
+            self.copy_sqlite(replicas)
+        admin_client = self.client_for(admin)
+        employee_client = self.client_for(employees[0])
+        task = {
+            'title': 'Replica routing check', 'description': 'Created by check_replica_routing',
+            'priority': 'low', 'due_date': (timezone.now() + timedelta(days=1)).isoformat(),
+        }
+
+        steps = [
+            ('admin reads', admin_client, 'get', replicas),
+            ('admin writes', admin_client, 'post', [DEFAULT_DB_ALIAS]),
+            ('admin reads its write (sticky)', admin_client, 'get', [DEFAULT_DB_ALIAS]),
+            ('employee reads', employee_client, 'get', replicas),
+        ]
+        if not options['skip_wait']:
+            steps.append(('admin reads after the sticky window', admin_client, 'get', replicas))
+
+        failures = 0
+        for name, client, method, expected in steps:
+            if name.endswith('after the sticky window'):
+                time.sleep(replica_setting('STICKY_SECONDS') + 0.5)
+            # Cached payloads would answer without touching any database.
+            caches[RESPONSE_CACHE_ALIAS].clear()
+            with ExitStack() as stack:
+                captured = {
+                    alias: stack.enter_context(CaptureQueriesContext(connections[alias]))
+                    for alias in [DEFAULT_DB_ALIAS] + replicas
+                }
+                if method == 'post':
+                    response = client.post('/api/tasks/', task, content_type='application/json')
+                else:
+                    response = client.get('/api/tasks/')
+            used = sorted(alias for alias, ctx in captured.items() if len(ctx))
+            ok = bool(used) and set(used) <= set(expected)
+            failures += not ok
+            label = self.style.SUCCESS('ok') if ok else self.style.ERROR('FAIL')
+            self.stdout.write(f'[{label}] {name:<38} {method.upper()} -> {response.status_code}  queries on {", ".join(used) or "-"}')
+
+        if failures:
+            raise CommandError(f'{failures} steps used an unexpected database')
+
+    def copy_sqlite(self, replicas):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != 'sqlite':
+            raise CommandError('--copy-sqlite needs a SQLite primary')
+        primary.close()
+        for alias in replicas:
+            replica = connections[alias]
+            if replica.vendor == 'sqlite':
+                replica.close()
+                # A snapshot: writes made after this point never reach it.
+                shutil.copyfile(primary.settings_dict['NAME'], replica.settings_dict['NAME'])
+                self.stdout.write(f'Copied {primary.settings_dict["NAME"]} to {alias}')
+
+    def client_for(self, user):
+        return Client(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
@@ -0,0 +1,111 @@
+import re
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from rest_framework.authtoken.models import Token
+
+from benchmarks import seed
+from notifications.models import Notification
+from tasks.models import Task, TaskEvaluation
+
+# Plans that read a whole table instead of seeking into an index.
+SEQ_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'^SCAN (\w+)(?!\w| USING)'),
+    'postgresql': re.compile(r'Seq Scan on (\w+)'),
+}
+
+
+class Command(BaseCommand):
+    help = 'Run EXPLAIN on the SQL issued by every API endpoint and flag sequential scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', action='store_true', help='Insert benchmark data before explaining')
+        parser.add_argument('--tasks', type=int, default=200_000)
+        parser.add_argument('--evaluations', type=int, default=50_000)
+        parser.add_argument('--notifications', type=int, default=500_000)
+        parser.add_argument(
+            '--ignore-table', action='append', default=['accounts_user', 'authtoken_token'],
+            help='Tables small enough that a scan is expected (repeatable)',
+        )
+        parser.add_argument('--strict', action='store_true', help='Exit with an error if any scan is flagged')
+
+    def handle(self, *args, **options):
+        vendor = connection.vendor
+        if vendor not in SEQ_SCAN_PATTERNS:
+            raise CommandError(f'EXPLAIN parsing is not implemented for {vendor}')
+
+        admin, employees = seed.seed_users()
+        if options['seed']:
+            missing = options['tasks'] - Task.objects.count()
+            if missing > 0:
+                self.stdout.write(f'Seeding {missing} tasks...')
+                seed.seed_tasks(missing, admin, employees)
+            missing = options['evaluations'] - TaskEvaluation.objects.count()
+            if missing > 0:
+                self.stdout.write(f'Seeding {missing} evaluations...')
+                seed.seed_evaluations(missing, admin)
+            missing = options['notifications'] - Notification.objects.count()
+            if missing > 0:
+                self.stdout.write(f'Seeding {missing} notifications...')
+                seed.seed_notifications(missing, [admin] + employees)
+            with connection.cursor() as cursor:
+                cursor.execute('ANALYZE')
+
+        task = Task.objects.filter(assigned_to=employees[0]).first()
+        flagged = 0
+        for user, url in self.get_endpoints(admin, employees[0], task):
+            cache.clear()
+            client = Client(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
+            with CaptureQueriesContext(connection) as ctx:
+                response = client.get(url)
+            self.stdout.write(self.style.MIGRATE_HEADING(f'{user.role:<8} GET {url} -> {response.status_code}'))
+
+            for query in ctx.captured_queries:
+                sql = query['sql']
+                if not sql.lstrip().upper().startswith('SELECT'):
+                    continue
+                scans = [
+                    table for table in self.explain(vendor, sql)
+                    if table not in options['ignore_table']
+                ]
+                status = self.style.ERROR(f'SEQ SCAN {", ".join(scans)}') if scans else self.style.SUCCESS('ok')
+                flagged += bool(scans)
+                self.stdout.write(f'  [{status}] {sql[:160]}')
+
+        if flagged and options['strict']:
+            raise CommandError(f'{flagged} queries use sequential scans')
+        self.stdout.write(f'{flagged} queries flagged')
+
+    def get_endpoints(self, admin, employee, task):
+        endpoints = [
+            (admin, '/api/tasks/'),
+            (admin, '/api/tasks/?status=pending'),
+            (admin, '/api/tasks/?priority=high'),
+            (admin, f'/api/tasks/?created_by={admin.pk}'),
+            (admin, '/api/tasks/evaluations/'),
+            (admin, '/api/tasks/statistics/'),
+            (admin, '/api/auth/employees/'),
+            (employee, '/api/tasks/'),
+            (employee, '/api/tasks/?status=in_progress'),
+            (employee, '/api/tasks/evaluations/'),
+            (employee, '/api/tasks/statistics/'),
+            (employee, '/api/notifications/'),
+            (employee, '/api/notifications/unread-count/'),
+            (employee, '/api/auth/profile/'),
+        ]
+        if task:
+            endpoints.append((employee, f'/api/tasks/{task.pk}/'))
+        return endpoints
+
+    def explain(self, vendor, sql):
+        pattern = SEQ_SCAN_PATTERNS[vendor]
+        prefix = 'EXPLAIN QUERY PLAN ' if vendor == 'sqlite' else 'EXPLAIN '
+        with connection.cursor() as cursor:
+            cursor.execute(prefix + sql)
+            rows = cursor.fetchall()
+        # SQLite returns (id, parent, notused, detail); PostgreSQL one text column.
+        lines = [row[-1] for row in rows]
+        return [match.group(1) for line in lines for match in [pattern.search(line.strip())] if match]
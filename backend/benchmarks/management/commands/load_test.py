@@ -0,0 +1,156 @@
+import json
+import random
+import threading
+import time
+import urllib.error
+import urllib.request
+from collections import defaultdict
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+
+from benchmarks import seed
+from benchmarks.timing import summarize
+from tasks.models import Task
+
+
+class VirtualUser:
+    """
+    One simulated browser session: polls the unread badge and notifications
+    like the frontend does, and mixes in task reads and writes. GET responses
+    are revalidated with their ETag, as a browser would.
+    """
+
+    def __init__(self, base_url, token, is_admin, task_ids, rng, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.headers = {'Authorization': f'Token {token}', 'Content-Type': 'application/json'}
+        self.is_admin = is_admin
+        self.task_ids = task_ids
+        self.rng = rng
+        self.timeout = timeout
+        self.etags = {}
+
+    def request(self, method, path, body=None):
+        headers = dict(self.headers)
+        if method == 'GET' and path in self.etags:
+            headers['If-None-Match'] = self.etags[path]
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(self.base_url + path, data=data, headers=headers, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                response.read()
+                status, etag = response.status, response.headers.get('ETag')
+        except urllib.error.HTTPError as exc:
+            exc.read()
+            status, etag = exc.code, None
+        if etag:
+            self.etags[path] = etag
+        return status
+
+    def actions(self):
+        """Weighted (name, method, path, body) choices for one iteration."""
+        task_id = self.rng.choice(self.task_ids) if self.task_ids else None
+        choices = [
+            (5, ('unread_count', 'GET', '/api/notifications/unread-count/', None)),
+            (3, ('notifications', 'GET', '/api/notifications/?page_size=20', None)),
+            (3, ('task_list', 'GET', '/api/tasks/?page_size=20', None)),
+            (1, ('task_list_filtered', 'GET', '/api/tasks/?status=pending', None)),
+            (1, ('statistics', 'GET', '/api/tasks/statistics/', None)),
+        ]
+        if task_id:
+            choices.append((2, ('task_detail', 'GET', f'/api/tasks/{task_id}/', None)))
+            if not self.is_admin:
+                status = self.rng.choice(['pending', 'in_progress'])
+                choices.append((1, ('task_update', 'PUT', f'/api/tasks/{task_id}/', {'status': status})))
+        if self.is_admin:
+            due_date = (timezone.now() + timedelta(days=self.rng.randint(1, 30))).isoformat()
+            choices.append((1, ('task_create', 'POST', '/api/tasks/', {
+                'title': 'Load test task', 'description': 'Created by load_test',
+                'priority': 'medium', 'due_date': due_date,
+            })))
+        weights, actions = zip(*choices)
+        return self.rng.choices(actions, weights)[0]
+
+
+class Command(BaseCommand):
+    help = 'Replay polling plus CRUD traffic from concurrent virtual users against a running server'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000')
+        parser.add_argument('--users', type=int, default=20, help='Concurrent virtual users')
+        parser.add_argument('--admins', type=int, default=1, help='How many of them act as the admin')
+        parser.add_argument('--duration', type=float, default=30, help='Seconds to run')
+        parser.add_argument('--think-time', type=float, default=0.5, help='Mean pause between requests of one user')
+        parser.add_argument('--timeout', type=float, default=30)
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for reproducible traffic')
+        parser.add_argument('--output', help='Write the results as JSON to this file')
+
+    def handle(self, *args, **options):
+        admin, employees = seed.seed_users()
+        if not employees:
+            raise CommandError('No benchmark users; run seed_benchmark_data first')
+
+        sessions = []
+        for index in range(options['users']):
+            is_admin = index < options['admins']
+            user = admin if is_admin else employees[index % len(employees)]
+            tasks = Task.objects.all() if is_admin else Task.objects.filter(assigned_to=user)
+            task_ids = list(tasks.order_by('-pk').values_list('pk', flat=True)[:200])
+            sessions.append(VirtualUser(
+                options['base_url'], Token.objects.get_or_create(user=user)[0].key, is_admin,
+                task_ids, random.Random(options['seed'] + index), options['timeout'],
+            ))
+
+        samples = defaultdict(list)
+        statuses = defaultdict(lambda: defaultdict(int))
+        lock = threading.Lock()
+        deadline = time.monotonic() + options['duration']
+
+        def run(session):
+            while time.monotonic() < deadline:
+                name, method, path, body = session.actions()
+                start = time.perf_counter()
+                try:
+                    status = session.request(method, path, body)
+                except (urllib.error.URLError, OSError) as exc:
+                    status = type(exc).__name__
+                elapsed = (time.perf_counter() - start) * 1000
+                with lock:
+                    samples[name].append(elapsed)
+                    statuses[name][str(status)] += 1
+                time.sleep(session.rng.expovariate(1 / options['think_time']) if options['think_time'] else 0)
+
+        self.stdout.write(f'{options["users"]} users against {options["base_url"]} for {options["duration"]}s...')
+        started = time.perf_counter()
+        threads = [threading.Thread(target=run, args=(session,), daemon=True) for session in sessions]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        results = {}
+        for name in sorted(samples):
+            errors = sum(count for status, count in statuses[name].items() if not status.isdigit() or int(status) >= 400)
+            results[name] = {
+                'requests': len(samples[name]),
+                'errors': errors,
+                'statuses': dict(statuses[name]),
+                **summarize(samples[name]),
+            }
+            self.stdout.write(
+                f'{name:<20} n={len(samples[name]):>6} errors={errors:>4} '
+                f'p50={results[name]["p50_ms"]:>9.2f}ms p95={results[name]["p95_ms"]:>9.2f}ms'
+            )
+        total = sum(len(values) for values in samples.values())
+        self.stdout.write(self.style.SUCCESS(f'{total} requests, {total / elapsed:.1f} req/s'))
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({
+                    'benchmark': 'load', 'base_url': options['base_url'], 'users': options['users'],
+                    'duration_s': round(elapsed, 3), 'requests': total,
+                    'throughput_rps': round(total / elapsed, 2), 'results': results,
+                }, fh, indent=2)
@@ -0,0 +1,28 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from benchmarks import seed
+
+
+class Command(BaseCommand):
+    help = 'Generate users, tasks, evaluations and notifications for benchmarks at a preset scale'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', choices=seed.SCALES, default='10k')
+        parser.add_argument('--output', help='Write the resulting row counts as JSON to this file')
+
+    def handle(self, *args, **options):
+        counts = seed.seed_scale(options['scale'], log=self.stdout.write)
+        with connection.cursor() as cursor:
+            # Fresh planner statistics, so later benchmarks see the real plans.
+            cursor.execute('ANALYZE')
+        for name, count in counts.items():
+            self.stdout.write(f'{name:<14} {count:>10}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Benchmark users log in as {seed.PREFIX}admin / {seed.PREFIX}employee<N> with password {seed.PASSWORD}'
+        ))
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({'scale': options['scale'], 'vendor': connection.vendor, 'counts': counts}, fh, indent=2)
@@ -0,0 +1,119 @@
+"""
+Synthetic data used by the benchmark commands.
+
+Everything is written with ``bulk_create`` into the configured database, so
+point ``DATABASE_URL`` at a scratch database before seeding large volumes.
+``seed_scale`` tops the tables up to one of the ``SCALES`` presets.
+"""
+
+import random
+from datetime import timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.utils import timezone
+
+from accounts.models import User
+from notifications.models import Notification
+from tasks.models import Task, TaskEvaluation
+
+PREFIX = 'bench_'
+# Same convention as create_users.py: every generated account can log in.
+PASSWORD = '123456'
+
+SCALES = {
+    '10k': {'employees': 50, 'tasks': 10_000, 'evaluations': 2_500, 'notifications': 20_000},
+    '100k': {'employees': 200, 'tasks': 100_000, 'evaluations': 25_000, 'notifications': 200_000},
+    '1m': {'employees': 1_000, 'tasks': 1_000_000, 'evaluations': 250_000, 'notifications': 2_000_000},
+}
+
+
+def seed_users(employees=50):
+    # Hashed once; hashing per user would dominate seeding large scales.
+    password = make_password(PASSWORD)
+    admin, _ = User.objects.get_or_create(
+        username=f'{PREFIX}admin',
+        defaults={'role': 'admin', 'email': f'{PREFIX}admin@example.com', 'password': password},
+    )
+    existing = User.objects.filter(username__startswith=f'{PREFIX}employee').count()
+    User.objects.bulk_create([
+        User(username=f'{PREFIX}employee{i}', email=f'{PREFIX}employee{i}@example.com', role='employee', password=password)
+        for i in range(existing, employees)
+    ], batch_size=1000)
+    staff = list(User.objects.filter(username__startswith=f'{PREFIX}employee').order_by('id')[:employees])
+    return admin, staff
+
+
+def seed_tasks(count, admin, employees, batch_size=5000, seed=0):
+    rng = random.Random(seed)
+    now = timezone.now()
+    statuses = [choice for choice, _ in Task.STATUS_CHOICES]
+    priorities = [choice for choice, _ in Task.PRIORITY_CHOICES]
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        Task.objects.bulk_create([
+            Task(
+                title=f'Benchmark task {created + i}',
+                description='Generated for benchmarking',
+                created_by=admin,
+                assigned_to=rng.choice(employees),
+                status=rng.choice(statuses),
+                priority=rng.choice(priorities),
+                due_date=now + timedelta(days=rng.randint(-60, 60)),
+            )
+            for i in range(size)
+        ], batch_size=batch_size)
+        created += size
+    return created
+
+
+def seed_evaluations(count, admin, batch_size=5000, seed=0):
+    """Evaluate up to ``count`` completed tasks that have no evaluation yet."""
+    rng = random.Random(seed)
+    task_ids = list(
+        Task.objects.filter(status='completed', evaluation__isnull=True)
+        .values_list('id', flat=True)[:count]
+    )
+    TaskEvaluation.objects.bulk_create([
+        TaskEvaluation(task_id=task_id, rating=rng.randint(1, 5), evaluated_by=admin)
+        for task_id in task_ids
+    ], batch_size=batch_size)
+    return len(task_ids)
+
+
+def seed_notifications(count, users, batch_size=5000, seed=0):
+    rng = random.Random(seed)
+    created = 0
+    while created < count:
+        size = min(batch_size, count - created)
+        Notification.objects.bulk_create([
+            Notification(
+                user=rng.choice(users),
+                title='Benchmark notification',
+                message=f'Generated notification {created + i}',
+                is_read=rng.random() < 0.7,
+            )
+            for i in range(size)
+        ], batch_size=batch_size)
+        created += size
+    return created
+
+
+def seed_scale(scale, log=None):
+    """Top the benchmark tables up to ``SCALES[scale]``; returns the final counts."""
+    target = SCALES[scale]
+    log = log or (lambda message: None)
+    admin, employees = seed_users(target['employees'])
+    steps = (
+        ('tasks', Task, lambda n: seed_tasks(n, admin, employees)),
+        ('evaluations', TaskEvaluation, lambda n: seed_evaluations(n, admin)),
+        ('notifications', Notification, lambda n: seed_notifications(n, [admin] + employees)),
+    )
+    counts = {'employees': len(employees)}
+    for name, model, seed in steps:
+        missing = target[name] - model.objects.count()
+        if missing > 0:
+            log(f'Seeding {missing} {name}...')
+            seed(missing)
+        counts[name] = model.objects.count()
+    return counts
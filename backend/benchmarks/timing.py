@@ -0,0 +1,27 @@
+import statistics
+import time
+
+
+def summarize(samples):
+    """Latency percentiles in milliseconds for ``samples`` (milliseconds)."""
+    samples = sorted(samples)
+    if not samples:
+        return {'count': 0}
+    pick = lambda q: samples[min(len(samples) - 1, int(len(samples) * q))]
+    return {
+        'p50_ms': round(statistics.median(samples), 3),
+        'p95_ms': round(pick(0.95), 3),
+        'max_ms': round(samples[-1], 3),
+    }
+
+
+def measure(func, repeat=20, warmup=2):
+    """Call ``func`` repeatedly and return latency percentiles in milliseconds."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append((time.perf_counter() - start) * 1000)
+    return summarize(samples)
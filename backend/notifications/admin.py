@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Notification
+from .models import ArchivedNotification, Notification, UnreadCounter
 
 
 @admin.register(Notification)
@@ -8,3 +8,16 @@ class NotificationAdmin(admin.ModelAdmin):
     list_filter = ('is_read', 'created_at')
     search_fields = ('title', 'message', 'user__username')
 
+
+
+@admin.register(UnreadCounter)
+class UnreadCounterAdmin(admin.ModelAdmin):
+    list_display = ('user', 'count')
+    search_fields = ('user__username',)
+
+
+@admin.register(ArchivedNotification)
+class ArchivedNotificationAdmin(admin.ModelAdmin):
+    list_display = ('title', 'user', 'is_read', 'created_at', 'archived_at')
+    list_filter = ('is_read', 'archived_at')
+    search_fields = ('title', 'user__username')
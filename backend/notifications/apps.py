@@ -5,4 +5,6 @@ class NotificationsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'notifications'
     verbose_name = 'الإشعارات'
-
+    
+    def ready(self):
+        from . import signals  # noqa: F401
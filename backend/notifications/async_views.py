@@ -0,0 +1,36 @@
+"""
+Async versions of the notification read endpoints, see ``taskapp.async_api``.
+"""
+
+from asgiref.sync import sync_to_async
+
+from taskapp.async_api import async_api_view, json_response
+from taskapp.pagination import KeysetPagination
+from . import counters, views
+from .models import Notification
+from .serializers import NotificationValuesSerializer
+
+
+@async_api_view(views.notification_list)
+async def notification_list(request):
+    if request.GET.get('mark_all_read') == 'true':
+        # A write; served by the DRF view.
+        return await sync_to_async(views.notification_list)(request)
+
+    notifications = Notification.objects.filter(user=request.user)
+    unread_count = await counters.aget_unread_count(request.user.pk)
+
+    paginator = KeysetPagination()
+    serializer = NotificationValuesSerializer.for_request(request)
+    page = await paginator.apaginate_queryset(serializer.values(notifications), request)
+    return json_response({
+        'notifications': await serializer.arender(page),
+        'unread_count': unread_count,
+        **paginator.get_paginated_data(),
+        **serializer.sideloaded(),
+    })
+
+
+@async_api_view(views.unread_count)
+async def unread_count(request):
+    return json_response({'unread_count': await counters.aget_unread_count(request.user.pk)})
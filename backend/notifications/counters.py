@@ -0,0 +1,128 @@
+"""
+Per-user unread notification counters.
+
+``UnreadCounter`` rows are adjusted with F() expressions whenever
+notifications are created, read, marked all read or deleted, and the current
+value is cached so the unread badge is a single cache (or primary key)
+lookup. Only a cache shared by every worker (``CACHE_SHARED``) is used, as
+invalidations from one worker would not reach another's local memory; the
+badge is then read from the counter row. ``reconcile`` recomputes the counters from the notification table
+and repairs any drift; it is exposed as ``manage.py reconcile_unread_counts``.
+"""
+
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, F
+
+from .models import Notification, UnreadCounter
+
+
+def _cache_key(user_id):
+    return f'notifications:unread:{user_id}'
+
+
+def _cache_timeout():
+    return getattr(settings, 'NOTIFICATIONS_UNREAD_CACHE_TIMEOUT', 60)
+
+
+def _cached():
+    return getattr(settings, 'CACHE_SHARED', False)
+
+
+def _count_from_notifications(user_id):
+    return Notification.objects.filter(user_id=user_id, is_read=False).count()
+
+
+def get_unread_count(user_id):
+    count = cache.get(_cache_key(user_id)) if _cached() else None
+    if count is None:
+        count = UnreadCounter.objects.filter(user_id=user_id).values_list('count', flat=True).first()
+        if count is None:
+            counter, _ = UnreadCounter.objects.get_or_create(
+                user_id=user_id, defaults={'count': _count_from_notifications(user_id)}
+            )
+            count = counter.count
+        count = max(count, 0)
+        if _cached():
+            cache.set(_cache_key(user_id), count, _cache_timeout())
+    return count
+
+
+async def aget_unread_count(user_id):
+    """``get_unread_count`` for async views, using the async cache and ORM."""
+    count = await cache.aget(_cache_key(user_id)) if _cached() else None
+    if count is None:
+        count = await UnreadCounter.objects.filter(user_id=user_id).values_list('count', flat=True).afirst()
+        if count is None:
+            unread = await Notification.objects.filter(user_id=user_id, is_read=False).acount()
+            counter, _ = await UnreadCounter.objects.aget_or_create(user_id=user_id, defaults={'count': unread})
+            count = counter.count
+        count = max(count, 0)
+        if _cached():
+            await cache.aset(_cache_key(user_id), count, _cache_timeout())
+    return count
+
+
+def _invalidate(user_ids):
+    keys = [_cache_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def adjust(deltas):
+    """Apply ``{user_id: delta}`` changes to the counters."""
+    deltas = {user_id: delta for user_id, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    with transaction.atomic():
+        for user_id, delta in deltas.items():
+            updated = UnreadCounter.objects.filter(user_id=user_id).update(count=F('count') + delta)
+            if not updated:
+                # First notification activity for this user: count from scratch,
+                # which already includes this change.
+                UnreadCounter.objects.get_or_create(
+                    user_id=user_id, defaults={'count': _count_from_notifications(user_id)}
+                )
+    _invalidate(deltas)
+
+
+def increment_for(notifications):
+    adjust(Counter(n.user_id for n in notifications if not n.is_read))
+
+
+def reconcile(user_ids=None, dry_run=False):
+    """
+    Recompute counters from the notification table.
+
+    Returns a list of ``(user_id, stored, actual)`` tuples for counters that
+    had drifted (or were missing) and, unless ``dry_run``, fixes them.
+    """
+    unread = Notification.objects.filter(is_read=False)
+    counters = UnreadCounter.objects.all()
+    if user_ids is not None:
+        unread = unread.filter(user_id__in=user_ids)
+        counters = counters.filter(user_id__in=user_ids)
+
+    actual = dict(unread.order_by().values_list('user_id').annotate(n=Count('id')))
+    stored = dict(counters.values_list('user_id', 'count'))
+
+    drift = [
+        (user_id, stored.get(user_id), actual.get(user_id, 0))
+        for user_id in sorted(set(actual) | set(stored))
+        if stored.get(user_id) != actual.get(user_id, 0)
+    ]
+    if drift and not dry_run:
+        with transaction.atomic():
+            existing = UnreadCounter.objects.in_bulk([user_id for user_id, old, _ in drift if old is not None])
+            for user_id, _, count in drift:
+                if user_id in existing:
+                    existing[user_id].count = count
+            UnreadCounter.objects.bulk_update(existing.values(), ['count'], batch_size=1000)
+            UnreadCounter.objects.bulk_create(
+                [UnreadCounter(user_id=user_id, count=count) for user_id, old, count in drift if old is None],
+                batch_size=1000,
+            )
+        _invalidate([user_id for user_id, _, _ in drift])
+    return drift
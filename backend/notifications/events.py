@@ -0,0 +1,72 @@
+"""
+Notification fan-out.
+
+Task and evaluation flows record ``NotificationEvent``s in the task outbox
+(``tasks.outbox``) instead of inserting notifications inline; its dispatcher
+writes them in batches with ``write_events``, so the request path no longer
+pays for notification inserts.
+
+Every event carries an ``event_key``; the (user, event_key) unique constraint
+on ``Notification`` makes retries idempotent, so each event produces exactly
+one row even if a batch is retried after a partial failure.
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+
+from django.db import transaction
+
+from . import counters
+from .models import Notification
+from .realtime import publish_notifications
+
+
+@dataclass(frozen=True)
+class NotificationEvent:
+    user_id: int
+    title: str
+    message: str
+    task_id: Optional[int] = None
+    event_key: str = ''
+
+    def to_notification(self):
+        return Notification(
+            user_id=self.user_id,
+            title=self.title,
+            message=self.message,
+            task_id=self.task_id,
+            event_key=self.event_key,
+        )
+
+
+def write_events(events):
+    """
+    Insert the notifications for ``events``, skipping ones already written.
+    Returns, and pushes to connected clients, only the rows inserted here.
+    """
+    user_ids = {event.user_id for event in events}
+    event_keys = [event.event_key for event in events]
+    with transaction.atomic():
+        written = set(
+            Notification.objects.filter(user_id__in=user_ids, event_key__in=event_keys)
+            .values_list('user_id', 'event_key')
+        )
+        new = [
+            event.to_notification() for event in events
+            if (event.user_id, event.event_key) not in written
+        ]
+        if not new:
+            return []
+        Notification.objects.bulk_create(new, ignore_conflicts=True)
+        counters.increment_for(new)
+    # ignore_conflicts leaves primary keys unset; reload the new rows to push them.
+    new_keys = {(notification.user_id, notification.event_key) for notification in new}
+    notifications = [
+        notification for notification in Notification.objects.filter(
+            user_id__in={user_id for user_id, _ in new_keys},
+            event_key__in={event_key for _, event_key in new_keys},
+        ).select_related('task__created_by', 'task__assigned_to').order_by('pk')
+        if (notification.user_id, notification.event_key) in new_keys
+    ]
+    publish_notifications(notifications)
+    return notifications
@@ -0,0 +1,23 @@
+from taskapp.exports import Export
+from .models import Notification
+
+
+def _notifications_for(user, params):
+    notifications = Notification.objects.all()
+    return notifications if user is None else notifications.filter(user=user)
+
+
+NOTIFICATIONS = Export(
+    name='notifications',
+    columns=(
+        ('id', 'id'),
+        ('user_id', 'user_id'),
+        ('user', 'user__username'),
+        ('title', 'title'),
+        ('message', 'message'),
+        ('is_read', 'is_read'),
+        ('task_id', 'task_id'),
+        ('created_at', 'created_at'),
+    ),
+    queryset_for=_notifications_for,
+)
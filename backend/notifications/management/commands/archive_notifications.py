@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+
+from notifications import retention
+
+
+class Command(BaseCommand):
+    help = 'Move notifications past their retention age out of the live table in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Notifications moved per transaction')
+        parser.add_argument('--mode', choices=retention.ARCHIVE_MODES, help='Archive to a table, to files, or only delete')
+        parser.add_argument('--directory', help='Archive directory for --mode=file')
+        parser.add_argument('--pause', type=float, help='Seconds to wait between batches')
+        parser.add_argument('--dry-run', action='store_true', help='Only count the expired notifications')
+
+    def handle(self, *args, **options):
+        if options['dry_run']:
+            self.stdout.write(f'{retention.expired().count()} notifications expired')
+            return
+        total = retention.run_retention(
+            batch_size=options['batch_size'], mode=options['mode'],
+            directory=options['directory'], pause=options['pause'],
+        )
+        self.stdout.write(self.style.SUCCESS(f'{total} notifications archived'))
@@ -0,0 +1,18 @@
+from django.core.management.base import BaseCommand
+
+from notifications import counters
+
+
+class Command(BaseCommand):
+    help = 'Recompute per-user unread notification counters and repair drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help='Only reconcile this user id (repeatable)')
+        parser.add_argument('--dry-run', action='store_true', help='Report drift without fixing it')
+
+    def handle(self, *args, **options):
+        drift = counters.reconcile(options['users'], dry_run=options['dry_run'])
+        for user_id, stored, actual in drift:
+            self.stdout.write(f'user {user_id}: stored={stored} actual={actual}')
+        action = 'found' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(f'{len(drift)} counters {action}'))
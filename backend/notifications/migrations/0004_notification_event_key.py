@@ -0,0 +1,22 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('notifications', '0003_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='event_key',
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name='مفتاح الحدث'),
+        ),
+        migrations.AddConstraint(
+            model_name='notification',
+            constraint=models.UniqueConstraint(fields=('user', 'event_key'), name='notification_unique_event'),
+        ),
+    ]
@@ -0,0 +1,43 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:03
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def populate_counters(apps, schema_editor):
+    Notification = apps.get_model('notifications', 'Notification')
+    UnreadCounter = apps.get_model('notifications', 'UnreadCounter')
+    counts = (
+        Notification.objects.filter(is_read=False)
+        .order_by()
+        .values_list('user_id')
+        .annotate(count=models.Count('id'))
+    )
+    UnreadCounter.objects.bulk_create(
+        [UnreadCounter(user_id=user_id, count=count) for user_id, count in counts],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0004_notification_event_key'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UnreadCounter',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='unread_counter', serialize=False, to=settings.AUTH_USER_MODEL, verbose_name='المستخدم')),
+                ('count', models.IntegerField(default=0, verbose_name='عدد غير المقروء')),
+            ],
+            options={
+                'verbose_name': 'عداد الإشعارات غير المقروءة',
+                'verbose_name_plural': 'عدادات الإشعارات غير المقروءة',
+            },
+        ),
+        migrations.RunPython(populate_counters, migrations.RunPython.noop),
+    ]
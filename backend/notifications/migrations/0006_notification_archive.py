@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0005_unread_counter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedNotification',
+            fields=[
+                ('id', models.BigIntegerField(primary_key=True, serialize=False, verbose_name='المعرف')),
+                ('title', models.CharField(max_length=200, verbose_name='العنوان')),
+                ('message', models.TextField(verbose_name='الرسالة')),
+                ('is_read', models.BooleanField(default=False, verbose_name='مقروء')),
+                ('task_id', models.BigIntegerField(blank=True, null=True, verbose_name='معرف المهمة')),
+                ('created_at', models.DateTimeField(verbose_name='تاريخ الإنشاء')),
+                ('archived_at', models.DateTimeField(verbose_name='تاريخ الأرشفة')),
+            ],
+            options={
+                'verbose_name': 'إشعار مؤرشف',
+                'verbose_name_plural': 'الإشعارات المؤرشفة',
+                'ordering': ['-created_at'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['created_at', 'id'], name='notification_retention_idx'),
+        ),
+        migrations.AddField(
+            model_name='archivednotification',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_notifications', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم'),
+        ),
+        migrations.AddIndex(
+            model_name='archivednotification',
+            index=models.Index(fields=['user', '-created_at'], name='archived_notif_user_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:41
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('notifications', '0006_notification_archive'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NotificationTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notification_id', models.BigIntegerField(verbose_name='معرف الإشعار')),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='تاريخ الإزالة')),
+            ],
+            options={
+                'verbose_name': 'إشعار محذوف',
+                'verbose_name_plural': 'الإشعارات المحذوفة',
+            },
+        ),
+        # Existing rows get the migration time as a constant default, so the
+        # column is added without rewriting the table; no client can hold a
+        # sync watermark older than this migration.
+        migrations.AddField(
+            model_name='notification',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'updated_at'], name='notification_user_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='notificationtombstone',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notification_tombstones', to=settings.AUTH_USER_MODEL, verbose_name='المستخدم'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationtombstone',
+            index=models.Index(fields=['user', 'removed_at'], name='notif_tombstone_user_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notificationtombstone',
+            index=models.Index(fields=['removed_at'], name='notif_tombstone_removed_idx'),
+        ),
+    ]
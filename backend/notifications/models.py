@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils import timezone
 
 User = get_user_model()
 
@@ -11,12 +12,113 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False, verbose_name='مقروء')
     task = models.ForeignKey('tasks.Task', on_delete=models.CASCADE, null=True, blank=True, related_name='notifications', verbose_name='المهمة')
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')
+    event_key = models.CharField(max_length=64, null=True, blank=True, editable=False, verbose_name='مفتاح الحدث')
+    # Bumped by every change, including read state, for delta sync (notifications.sync)
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')
     
     class Meta:
         verbose_name = 'إشعار'
         verbose_name_plural = 'الإشعارات'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination seeks on (created_at, id), see taskapp.pagination
+            models.Index(fields=['user', '-created_at', '-id'], name='notification_user_created_idx'),
+            # Unread badge and unread-only listings
+            models.Index(
+                fields=['user', '-created_at'],
+                name='notification_unread_idx',
+                condition=models.Q(is_read=False),
+            ),
+            # Oldest-first retention scans, see notifications.retention
+            models.Index(fields=['created_at', 'id'], name='notification_retention_idx'),
+            # Delta sync reads what changed after a watermark
+            models.Index(fields=['user', 'updated_at'], name='notification_user_updated_idx'),
+        ]
+        constraints = [
+            # One notification per user per emitted event, see notifications.events
+            models.UniqueConstraint(fields=['user', 'event_key'], name='notification_unique_event'),
+        ]
     
     def __str__(self):
         return f'{self.title} - {self.user.username}'
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets signal handlers tell whether a save changed the read state.
+        instance._loaded_is_read = instance.__dict__.get('is_read')
+        return instance
+
+
+class UnreadCounter(models.Model):
+    """Denormalized number of unread notifications per user, see notifications.counters."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, primary_key=True, related_name='unread_counter', verbose_name='المستخدم')
+    count = models.IntegerField(default=0, verbose_name='عدد غير المقروء')
+    
+    class Meta:
+        verbose_name = 'عداد الإشعارات غير المقروءة'
+        verbose_name_plural = 'عدادات الإشعارات غير المقروءة'
+    
+    def __str__(self):
+        return f'{self.user_id}: {self.count}'
+
 
+class ArchivedNotification(models.Model):
+    """Notification moved out of the live table by notifications.retention."""
+    id = models.BigIntegerField(primary_key=True, verbose_name='المعرف')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='archived_notifications', verbose_name='المستخدم')
+    title = models.CharField(max_length=200, verbose_name='العنوان')
+    message = models.TextField(verbose_name='الرسالة')
+    is_read = models.BooleanField(default=False, verbose_name='مقروء')
+    # A plain id: archived rows outlive the tasks they mention.
+    task_id = models.BigIntegerField(null=True, blank=True, verbose_name='معرف المهمة')
+    created_at = models.DateTimeField(verbose_name='تاريخ الإنشاء')
+    archived_at = models.DateTimeField(verbose_name='تاريخ الأرشفة')
+    
+    class Meta:
+        verbose_name = 'إشعار مؤرشف'
+        verbose_name_plural = 'الإشعارات المؤرشفة'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='archived_notif_user_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.title} - {self.user_id}'
+
+
+class NotificationTombstone(models.Model):
+    """A deleted or archived notification, reported to delta sync clients by notifications.sync."""
+    notification_id = models.BigIntegerField(verbose_name='معرف الإشعار')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='notification_tombstones', verbose_name='المستخدم')
+    removed_at = models.DateTimeField(default=timezone.now, verbose_name='تاريخ الإزالة')
+    
+    class Meta:
+        verbose_name = 'إشعار محذوف'
+        verbose_name_plural = 'الإشعارات المحذوفة'
+        indexes = [
+            models.Index(fields=['user', 'removed_at'], name='notif_tombstone_user_idx'),
+            # Purging expired tombstones
+            models.Index(fields=['removed_at'], name='notif_tombstone_removed_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.notification_id} ({self.removed_at})'
+
+
+class StreamTicket(models.Model):
+    """Short-lived, single-use credential for the event stream, see notifications.streams."""
+    key = models.CharField(max_length=64, unique=True, verbose_name='المفتاح')
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='stream_tickets', verbose_name='المستخدم')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')
+    
+    class Meta:
+        verbose_name = 'تذكرة بث'
+        verbose_name_plural = 'تذاكر البث'
+        indexes = [
+            # Dropping expired tickets
+            models.Index(fields=['created_at'], name='stream_ticket_created_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.user_id} ({self.created_at})'
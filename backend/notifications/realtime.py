@@ -0,0 +1,41 @@
+"""
+Helpers that push notification events to the user's pub/sub channel.
+
+Events are published after the surrounding transaction commits so clients
+never see rows that could still be rolled back.
+"""
+
+from django.db import transaction
+
+from .counters import get_unread_count
+from .pubsub import encode_message, get_broker
+
+
+def channel_for(user_id):
+    return f'user:{user_id}'
+
+
+def _publish(user_id, event, data):
+    get_broker().publish(channel_for(user_id), encode_message(event, data))
+
+
+def publish_notifications(notifications):
+    """Push newly created notifications followed by each user's unread count."""
+    from .serializers import NotificationSerializer
+
+    def send():
+        user_ids = []
+        for notification in notifications:
+            _publish(notification.user_id, 'notification', NotificationSerializer(notification).data)
+            if notification.user_id not in user_ids:
+                user_ids.append(notification.user_id)
+        for user_id in user_ids:
+            _publish(user_id, 'unread_count', {'unread_count': get_unread_count(user_id)})
+
+    transaction.on_commit(send)
+
+
+def publish_unread_count(user_id):
+    transaction.on_commit(
+        lambda: _publish(user_id, 'unread_count', {'unread_count': get_unread_count(user_id)})
+    )
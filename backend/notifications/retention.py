@@ -0,0 +1,143 @@
+"""
+Notification retention.
+
+Notifications older than the configured age for their read state are moved
+out of the live table oldest-first, ``BATCH_SIZE`` rows per transaction, so
+each transaction holds its row locks briefly and the live table keeps only
+what the list, badge and stream endpoints actually read. Expired rows are
+copied to ``ArchivedNotification`` (``ARCHIVE='table'``), appended to a
+gzipped NDJSON file per day under ``ARCHIVE_DIR`` (``'file'``) or just
+deleted (``'none'``), and unread counters are adjusted for the unread rows
+removed.
+
+Run it periodically with ``manage.py archive_notifications``.
+"""
+
+import gzip
+import os
+import time
+from collections import Counter
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from taskapp.exports import encode
+from . import counters, sync
+from .exports import NOTIFICATIONS
+from .models import ArchivedNotification, Notification
+from .realtime import publish_unread_count
+
+RETENTION_DEFAULTS = {
+    'READ_DAYS': 30,
+    'UNREAD_DAYS': 180,
+    'ARCHIVE': 'table',
+    'ARCHIVE_DIR': None,
+    'BATCH_SIZE': 1000,
+    'PAUSE': 0.1,
+}
+
+ARCHIVE_MODES = ('table', 'file', 'none')
+
+ARCHIVED_FIELDS = ('id', 'user_id', 'title', 'message', 'is_read', 'task_id', 'created_at')
+
+
+def retention_setting(name):
+    return getattr(settings, 'NOTIFICATIONS_RETENTION', {}).get(name, RETENTION_DEFAULTS[name])
+
+
+def expired(now=None):
+    """Notifications past their retention age; ``None`` ages keep them forever."""
+    now = now or timezone.now()
+    condition = Q()
+    for is_read, setting in ((True, 'READ_DAYS'), (False, 'UNREAD_DAYS')):
+        days = retention_setting(setting)
+        if days is not None:
+            condition |= Q(is_read=is_read, created_at__lt=now - timedelta(days=days))
+    if not condition:
+        return Notification.objects.none()
+    return Notification.objects.filter(condition)
+
+
+def archive_path(now, directory=None):
+    directory = directory or retention_setting('ARCHIVE_DIR') or os.path.join(settings.BASE_DIR, 'archive')
+    return os.path.join(directory, f'notifications-{now:%Y%m%d}.ndjson.gz')
+
+
+def _archive_to_table(ids, now):
+    rows = Notification.objects.filter(pk__in=ids).values(*ARCHIVED_FIELDS)
+    # ignore_conflicts: a batch retried after a failed delete is not duplicated.
+    ArchivedNotification.objects.bulk_create(
+        [ArchivedNotification(archived_at=now, **row) for row in rows], ignore_conflicts=True
+    )
+
+
+def _archive_to_file(ids, now, directory):
+    rows = (
+        Notification.objects.filter(pk__in=ids).order_by('pk')
+        .values_list(*[lookup for _, lookup in NOTIFICATIONS.columns])
+    )
+    path = archive_path(now, directory)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    # Each batch is appended as its own gzip member; gzip readers concatenate
+    # them. The file is not transactional: a batch whose delete is rolled
+    # back is written again by the next run.
+    with gzip.open(path, 'at', encoding='utf-8') as fh:
+        for chunk in encode(NOTIFICATIONS, rows, 'ndjson'):
+            fh.write(chunk)
+
+
+def archive_batch(now=None, batch_size=None, mode=None, directory=None):
+    """Move one batch of expired notifications out of the live table; returns its size."""
+    now = now or timezone.now()
+    batch_size = batch_size or retention_setting('BATCH_SIZE')
+    mode = mode or retention_setting('ARCHIVE')
+    if mode not in ARCHIVE_MODES:
+        raise ValueError(f'Unknown notification archive mode: {mode}')
+
+    candidates = expired(now).order_by('created_at', 'id')
+    if connection.features.has_select_for_update_skip_locked:
+        candidates = candidates.select_for_update(skip_locked=True)
+
+    with transaction.atomic():
+        batch = list(candidates.values_list('id', 'user_id', 'is_read')[:batch_size])
+        if not batch:
+            return 0
+        ids = [pk for pk, _, _ in batch]
+        if mode == 'table':
+            _archive_to_table(ids, now)
+        elif mode == 'file':
+            _archive_to_file(ids, now, directory)
+        # A plain DELETE: per-row signal handlers are replaced by one counter
+        # adjustment and one tombstone insert for the whole batch.
+        quote = connection.ops.quote_name
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'DELETE FROM {quote(Notification._meta.db_table)} WHERE {quote("id")} IN '
+                f'({", ".join(["%s"] * len(ids))})',
+                ids,
+            )
+        sync.record_removed((pk, user_id) for pk, user_id, _ in batch)
+        unread = Counter(user_id for _, user_id, is_read in batch if not is_read)
+        counters.adjust({user_id: -count for user_id, count in unread.items()})
+        for user_id in unread:
+            publish_unread_count(user_id)
+    return len(batch)
+
+
+def run_retention(now=None, batch_size=None, mode=None, directory=None, pause=None):
+    """Archive batches until no expired notification is left; returns the total."""
+    now = now or timezone.now()
+    batch_size = batch_size or retention_setting('BATCH_SIZE')
+    pause = retention_setting('PAUSE') if pause is None else pause
+    total = 0
+    while True:
+        moved = archive_batch(now, batch_size, mode, directory)
+        total += moved
+        if moved < batch_size:
+            return total
+        if pause:
+            # Leaves room for other writers between bounded transactions.
+            time.sleep(pause)
@@ -1,9 +1,10 @@
 from rest_framework import serializers
 from .models import Notification
-from tasks.serializers import TaskSerializer
+from tasks.serializers import TaskSerializer, TaskValuesSerializer
+from taskapp.serializers import EagerLoadingMixin, ValuesSerializer
 
 
-class NotificationSerializer(serializers.ModelSerializer):
+class NotificationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     task = TaskSerializer(read_only=True)
     
     class Meta:
@@ -11,3 +12,12 @@ class NotificationSerializer(serializers.ModelSerializer):
         fields = '__all__'
         read_only_fields = ('created_at',)
 
+
+class NotificationValuesSerializer(ValuesSerializer):
+    """Fast list rendering with the same output as ``NotificationSerializer``."""
+    model = Notification
+    fields = ('id', 'task', 'title', 'message', 'is_read', 'created_at', 'event_key', 'updated_at', 'user')
+    key_columns = ('id', 'created_at')
+    sources = {'user': 'user_id'}
+    datetime_fields = ('created_at', 'updated_at')
+    nested = {'task': TaskValuesSerializer}
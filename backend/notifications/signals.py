@@ -0,0 +1,27 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import counters, sync
+from .models import Notification
+from .realtime import publish_notifications, publish_unread_count
+
+
+@receiver(post_save, sender=Notification)
+def track_saved_notification(sender, instance, created, **kwargs):
+    if created:
+        counters.increment_for([instance])
+        publish_notifications([instance])
+    else:
+        was_read = getattr(instance, '_loaded_is_read', instance.is_read)
+        if was_read != instance.is_read:
+            counters.adjust({instance.user_id: -1 if instance.is_read else 1})
+        publish_unread_count(instance.user_id)
+    instance._loaded_is_read = instance.is_read
+
+
+@receiver(post_delete, sender=Notification)
+def track_deleted_notification(sender, instance, **kwargs):
+    if not instance.is_read:
+        counters.adjust({instance.user_id: -1})
+    sync.record_removed([(instance.pk, instance.user_id)])
+    publish_unread_count(instance.user_id)
@@ -0,0 +1,168 @@
+"""
+Async endpoints that deliver notifications as they are created.
+
+``notification_stream`` is a Server-Sent Events stream and needs the ASGI
+application (``taskapp.asgi``). ``notification_poll`` is the long-poll
+fallback for clients or proxies that cannot keep an event stream open.
+
+EventSource cannot send an ``Authorization`` header, and a token in the
+stream URL would end up in proxy and access logs. Browsers therefore POST
+for a ticket (``issue_ticket``) and open ``stream/?ticket=``; a ticket is
+stored in the database so any worker can redeem it, expires after
+``TICKET_TTL`` seconds and works once.
+"""
+
+import json
+import secrets
+import time
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils import timezone
+from rest_framework.exceptions import AuthenticationFailed, ValidationError
+
+from accounts.authentication import CachedTokenAuthentication
+from .models import Notification, StreamTicket
+from .pubsub import encode_message, get_broker
+from .realtime import channel_for, get_unread_count
+from .serializers import NotificationValuesSerializer
+
+STREAM_DEFAULTS = {
+    'HEARTBEAT_INTERVAL': 15,
+    'MAX_AGE': 300,
+    'RETRY_MS': 3000,
+    'POLL_TIMEOUT': 25,
+    'TICKET_TTL': 30,
+}
+
+POLL_PAGE_SIZE = 50
+
+
+def stream_setting(name):
+    return getattr(settings, 'NOTIFICATIONS_STREAM', {}).get(name, STREAM_DEFAULTS[name])
+
+
+def _ticket_cutoff():
+    return timezone.now() - timedelta(seconds=stream_setting('TICKET_TTL'))
+
+
+def issue_ticket(user):
+    """Create a stream ticket for ``user`` and return its key."""
+    StreamTicket.objects.filter(created_at__lt=_ticket_cutoff()).delete()
+    return StreamTicket.objects.create(user=user, key=secrets.token_urlsafe(32)).key
+
+
+def redeem_ticket(key):
+    """Use up the ticket ``key``; returns its user, or None if it is unknown, expired or used."""
+    ticket = StreamTicket.objects.select_related('user').filter(key=key, created_at__gte=_ticket_cutoff()).first()
+    # Of concurrent requests with the same ticket, only the one whose delete
+    # removed the row gets through.
+    if ticket is None or not StreamTicket.objects.filter(pk=ticket.pk).delete()[0]:
+        return None
+    return ticket.user if ticket.user.is_active else None
+
+
+async def _authenticate(request):
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Token '):
+        return None
+    key = header[len('Token '):].strip()
+    try:
+        user, _ = await sync_to_async(CachedTokenAuthentication().authenticate_credentials)(key)
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+def _unauthorized():
+    return JsonResponse({'error': 'بيانات الاعتماد غير صالحة'}, status=401)
+
+
+def _format_event(message):
+    # Messages are JSON of the form {"event": ..., "data": ...}.
+    return f'event: {json.loads(message)["event"]}\ndata: {message}\n\n'
+
+
+async def notification_stream(request):
+    ticket = request.GET.get('ticket')
+    user = await sync_to_async(redeem_ticket)(ticket) if ticket else await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {'error': 'البث المباشر يتطلب خادم ASGI', 'fallback': 'poll'},
+            status=503
+        )
+
+    subscription = await get_broker().subscribe(channel_for(user.pk))
+    unread_count = await sync_to_async(get_unread_count)(user.pk)
+
+    async def events():
+        try:
+            yield f'retry: {stream_setting("RETRY_MS")}\n\n'
+            yield _format_event(encode_message('unread_count', {'unread_count': unread_count}))
+            # Streams are recycled periodically; EventSource reconnects on its
+            # own and this bounds how long a vanished client can hold one.
+            deadline = time.monotonic() + stream_setting('MAX_AGE')
+            while time.monotonic() < deadline:
+                message = await subscription.get(stream_setting('HEARTBEAT_INTERVAL'))
+                if message is None:
+                    yield ': heartbeat\n\n'
+                else:
+                    yield _format_event(message)
+        finally:
+            await subscription.close()
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _poll_payload(request, user, since):
+    notifications = Notification.objects.filter(user=user)
+    serializer = NotificationValuesSerializer.for_request(request)
+    if since is None:
+        # First poll: the newest notifications.
+        page = list(serializer.values(notifications.order_by('-created_at', '-pk'))[:POLL_PAGE_SIZE])
+        last_id = max([row['id'] for row in page], default=None)
+    else:
+        # Oldest first, so a client more than a page behind catches up over
+        # the next polls instead of skipping what did not fit.
+        page = list(serializer.values(notifications.filter(pk__gt=since).order_by('pk'))[:POLL_PAGE_SIZE])
+        last_id = page[-1]['id'] if page else since
+    return {
+        'notifications': serializer.render(page),
+        'unread_count': get_unread_count(user.pk),
+        'last_id': last_id,
+    }
+
+
+async def notification_poll(request):
+    user = await _authenticate(request)
+    if user is None:
+        return _unauthorized()
+
+    since = request.GET.get('since')
+    try:
+        since = int(since) if since else None
+    except ValueError:
+        return JsonResponse({'error': 'قيمة since غير صالحة'}, status=400)
+
+    # Subscribe before reading so nothing published in between is missed.
+    subscription = await get_broker().subscribe(channel_for(user.pk))
+    try:
+        payload = await sync_to_async(_poll_payload)(request, user, since)
+        if since is not None and not payload['notifications']:
+            message = await subscription.get(stream_setting('POLL_TIMEOUT'))
+            if message is not None:
+                payload = await sync_to_async(_poll_payload)(request, user, since)
+    except ValidationError as exc:
+        # Unknown ?fields= or ?expand= names
+        return JsonResponse(exc.detail, status=400)
+    finally:
+        await subscription.close()
+    return JsonResponse(payload)
@@ -0,0 +1,24 @@
+"""
+Notification tombstones for delta sync, see ``taskapp.sync``.
+
+Deletions through the ORM are recorded by the ``post_delete`` handler;
+``notifications.retention`` records the rows it archives with a plain SQL
+DELETE.
+"""
+
+from .models import NotificationTombstone
+
+
+def record_removed(pairs):
+    """Record ``(notification id, user id)`` pairs as removed now."""
+    NotificationTombstone.objects.bulk_create(
+        NotificationTombstone(notification_id=pk, user_id=user_id) for pk, user_id in pairs
+    )
+
+
+def removed_ids(user, since):
+    """Ids of ``user``'s notifications deleted or archived after ``since``."""
+    return (
+        NotificationTombstone.objects.filter(user=user, removed_at__gt=since)
+        .order_by().values_list('notification_id', flat=True)
+    )
@@ -0,0 +1,226 @@
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import User
+from tasks.models import Task
+from . import async_views, counters, events, retention, streams
+from .models import ArchivedNotification, Notification, NotificationTombstone, StreamTicket, UnreadCounter
+
+
+def clear_caches():
+    for alias in ('default', 'responses'):
+        caches[alias].clear()
+
+
+class NotificationTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.employee = User.objects.create_user('employee', password='x')
+
+    def setUp(self):
+        clear_caches()
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.employee).key}')
+
+    def create_notifications(self, count, **fields):
+        task = Task.objects.create(
+            title='task', description='description', created_by=self.admin, assigned_to=self.employee,
+            due_date=timezone.now() + timezone.timedelta(days=1),
+        )
+        return [
+            Notification.objects.create(
+                user=self.employee, title=f'notification {index}', message='message', task=task, **fields
+            )
+            for index in range(count)
+        ]
+
+
+class ListQueryCountTests(NotificationTestCase):
+    def test_notification_list(self):
+        for count in (2, 15):
+            self.create_notifications(count)
+            clear_caches()
+            # Token, unread counter, notifications page, side-loaded tasks
+            # and users
+            with self.assertNumQueries(5):
+                response = self.client.get('/api/notifications/')
+            self.assertEqual(response.status_code, 200)
+
+
+class PollTests(NotificationTestCase):
+    def test_catches_up_oldest_first(self):
+        first = self.create_notifications(1)[0]
+        created = self.create_notifications(60)
+        response = self.client.get(f'/api/notifications/poll/?since={first.pk}')
+        payload = response.json()
+        self.assertEqual([row['id'] for row in payload['notifications']], [n.pk for n in created[:50]])
+        self.assertEqual(payload['last_id'], created[49].pk)
+
+        payload = self.client.get(f'/api/notifications/poll/?since={payload["last_id"]}').json()
+        self.assertEqual([row['id'] for row in payload['notifications']], [n.pk for n in created[50:]])
+        self.assertEqual(payload['last_id'], created[-1].pk)
+
+    def test_first_poll_returns_newest(self):
+        created = self.create_notifications(3)
+        payload = self.client.get('/api/notifications/poll/').json()
+        self.assertEqual(payload['last_id'], created[-1].pk)
+        self.assertEqual(len(payload['notifications']), 3)
+
+
+class StreamTicketTests(NotificationTestCase):
+    def test_ticket_opens_the_stream_once(self):
+        response = self.client.post('/api/notifications/stream/ticket/')
+        self.assertEqual(response.status_code, 201)
+        url = f'/api/notifications/stream/?ticket={response.json()["ticket"]}'
+        # Authenticated; the test client is not an ASGI server.
+        self.assertEqual(APIClient().get(url).status_code, 503)
+        self.assertEqual(APIClient().get(url).status_code, 401)
+
+    def test_expired_ticket(self):
+        key = streams.issue_ticket(self.employee)
+        StreamTicket.objects.update(created_at=timezone.now() - timezone.timedelta(minutes=5))
+        self.assertIsNone(streams.redeem_ticket(key))
+
+    def test_token_in_the_url_is_not_accepted(self):
+        key = Token.objects.get(user=self.employee).key
+        self.assertEqual(APIClient().get(f'/api/notifications/stream/?token={key}').status_code, 401)
+
+
+# The URL confs route to the async views only with ASYNC_VIEWS, so they are
+# called directly.
+class AsyncViewTests(NotificationTestCase):
+    def test_invalid_cursor_is_not_found(self):
+        self.create_notifications(2)
+        token = Token.objects.get(user=self.employee).key
+        request = APIRequestFactory().get('/api/notifications/?cursor=garbage!!', HTTP_AUTHORIZATION=f'Token {token}')
+        response = async_to_sync(async_views.notification_list)(request)
+        self.assertEqual(response.status_code, 404)
+        self.assertIn('detail', json.loads(response.content))
+
+
+class FieldSelectionTests(NotificationTestCase):
+    def test_unknown_names_are_rejected(self):
+        self.create_notifications(1)
+        for url in ('/api/notifications/?fields=bogus', '/api/notifications/?expand=task.bogus',
+                    '/api/notifications/poll/?fields=bogus'):
+            self.assertEqual(self.client.get(url).status_code, 400, url)
+
+    def test_nested_fields(self):
+        self.create_notifications(1)
+        response = self.client.get('/api/notifications/?fields=id,task.title')
+        self.assertEqual(response.json()['notifications'][0]['task'], {'title': 'task'})
+
+
+class UnreadCounterTests(NotificationTestCase):
+    def change_elsewhere(self, count):
+        # A write handled by another worker, whose invalidation only
+        # reaches its own cache.
+        UnreadCounter.objects.filter(user=self.employee).update(count=count)
+
+    @override_settings(CACHE_SHARED=False)
+    def test_read_from_the_row_without_a_shared_cache(self):
+        self.create_notifications(2)
+        self.assertEqual(counters.get_unread_count(self.employee.pk), 2)
+        self.change_elsewhere(5)
+        self.assertEqual(counters.get_unread_count(self.employee.pk), 5)
+
+    @override_settings(CACHE_SHARED=True)
+    def test_cached_with_a_shared_cache(self):
+        self.create_notifications(2)
+        self.assertEqual(counters.get_unread_count(self.employee.pk), 2)
+        with self.assertNumQueries(0):
+            self.assertEqual(counters.get_unread_count(self.employee.pk), 2)
+
+
+class ReadStateTests(NotificationTestCase):
+    def test_reading_twice_decrements_once(self):
+        notification, _ = self.create_notifications(2)
+        for _ in range(2):
+            response = self.client.put(f'/api/notifications/{notification.pk}/read/')
+            self.assertEqual(response.status_code, 200)
+            self.assertTrue(response.json()['is_read'])
+        self.assertEqual(counters.get_unread_count(self.employee.pk), 1)
+        self.assertEqual(self.client.put('/api/notifications/0/read/').status_code, 404)
+
+    def test_mark_all_read_keeps_notifications_created_meanwhile(self):
+        self.create_notifications(3)
+        adjust = counters.adjust
+        calls = []
+
+        def create_then_adjust(deltas):
+            calls.append(deltas)
+            if len(calls) == 1:
+                # Inserted by another request between the update and the
+                # counter change.
+                self.create_notifications(1)
+            adjust(deltas)
+
+        with mock.patch.object(counters, 'adjust', create_then_adjust):
+            self.client.get('/api/notifications/?mark_all_read=true')
+        self.assertEqual(counters.get_unread_count(self.employee.pk), 1)
+        self.assertEqual(counters.reconcile(dry_run=True), [])
+
+
+class WriteEventsTests(NotificationTestCase):
+    def event(self, key):
+        return events.NotificationEvent(self.employee.pk, 'title', 'message', event_key=key)
+
+    def test_retry_publishes_only_new_rows(self):
+        with mock.patch.object(events, 'publish_notifications') as publish:
+            events.write_events([self.event('a'), self.event('b')])
+            # A batch retried after a partial failure.
+            written = events.write_events([self.event('a'), self.event('b'), self.event('c')])
+        self.assertEqual([notification.event_key for notification in written], ['c'])
+        self.assertEqual(publish.call_args.args[0], written)
+        self.assertEqual(Notification.objects.filter(user=self.employee).count(), 3)
+
+        with mock.patch.object(events, 'publish_notifications') as publish:
+            self.assertEqual(events.write_events([self.event('c')]), [])
+        publish.assert_not_called()
+
+
+class RetentionTests(NotificationTestCase):
+    def test_archives_expired_notifications_in_batches(self):
+        old_read = self.create_notifications(3, is_read=True)
+        old_unread = self.create_notifications(2)
+        recent = self.create_notifications(1, is_read=True)
+        Notification.objects.filter(pk__in=[n.pk for n in old_read]).update(
+            created_at=timezone.now() - timezone.timedelta(days=31)
+        )
+        Notification.objects.filter(pk__in=[n.pk for n in old_unread]).update(
+            created_at=timezone.now() - timezone.timedelta(days=181)
+        )
+        self.assertEqual(counters.get_unread_count(self.employee.pk), 2)
+
+        moved = retention.run_retention(batch_size=2, mode='table', pause=0)
+        self.assertEqual(moved, 5)
+        self.assertEqual(list(Notification.objects.values_list('pk', flat=True)), [recent[0].pk])
+        self.assertEqual(ArchivedNotification.objects.count(), 5)
+        self.assertEqual(NotificationTombstone.objects.filter(user=self.employee).count(), 5)
+        clear_caches()
+        self.assertEqual(counters.get_unread_count(self.employee.pk), 0)
+
+
+class DeltaSyncTests(NotificationTestCase):
+    def test_changes_and_tombstones(self):
+        read, deleted, untouched = self.create_notifications(3)
+        since = timezone.now()
+        Notification.objects.filter(pk=untouched.pk).update(updated_at=since - timezone.timedelta(minutes=1))
+        read.is_read = True
+        read.save()
+        deleted_pk = deleted.pk
+        deleted.delete()
+
+        payload = self.client.get('/api/notifications/sync/', {'since': since.isoformat()}).json()
+        self.assertFalse(payload['reset'])
+        self.assertEqual([row['id'] for row in payload['notifications']], [read.pk])
+        self.assertEqual(payload['deleted'], [deleted_pk])
+        self.assertEqual(payload['unread_count'], 1)
@@ -1,10 +1,19 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, streams, views
+
+# Async read endpoints under ASGI, see taskapp.async_api
+reads = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.notification_list, name='notification_list'),
+    path('', reads.notification_list, name='notification_list'),
     path('<int:pk>/read/', views.notification_read, name='notification_read'),
     path('<int:pk>/delete/', views.notification_delete, name='notification_delete'),
-    path('unread-count/', views.unread_count, name='unread_count'),
+    path('unread-count/', reads.unread_count, name='unread_count'),
+    path('sync/', views.notification_sync, name='notification_sync'),
+    path('export/<str:export_format>/', views.notification_export, name='notification_export'),
+    path('stream/', streams.notification_stream, name='notification_stream'),
+    path('stream/ticket/', views.stream_ticket, name='notification_stream_ticket'),
+    path('poll/', streams.notification_poll, name='notification_poll'),
 ]
 
@@ -2,39 +2,97 @@ from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
+from django.db import transaction
+from django.utils import timezone
+from taskapp.exports import streaming_response
+from taskapp.pagination import KeysetPagination
+from taskapp.sync import collect, sync_window
+from . import counters, streams, sync
+from .exports import NOTIFICATIONS
 from .models import Notification
-from .serializers import NotificationSerializer
+from .realtime import publish_unread_count
+from .serializers import NotificationSerializer, NotificationValuesSerializer
 
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def notification_list(request):
     notifications = Notification.objects.filter(user=request.user)
-    unread_count = notifications.filter(is_read=False).count()
-    
+    unread_count = counters.get_unread_count(request.user.pk)
+
     # Mark all as read if requested
     mark_all_read = request.query_params.get('mark_all_read')
     if mark_all_read == 'true':
-        notifications.update(is_read=True)
+        with transaction.atomic():
+            updated = notifications.filter(is_read=False).update(is_read=True, updated_at=timezone.now())
+            # By the rows this update changed: a notification created
+            # meanwhile is still unread and keeps its count.
+            counters.adjust({request.user.pk: -updated})
+        publish_unread_count(request.user.pk)
+    
+    paginator = KeysetPagination()
+    serializer = NotificationValuesSerializer.for_request(request)
+    page = paginator.paginate_queryset(serializer.values(notifications), request)
+    return Response({
+        'notifications': serializer.render(page),
+        'unread_count': unread_count,
+        **paginator.get_paginated_data(),
+        **serializer.sideloaded(),
+    })
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_sync(request):
+    """Notifications created or changed since ``?since=`` and ids removed, see taskapp.sync."""
+    try:
+        since, watermark = sync_window(request.query_params.get('since'))
+    except ValueError:
+        return Response({'error': 'قيمة since غير صالحة'}, status=status.HTTP_400_BAD_REQUEST)
     
-    serializer = NotificationSerializer(notifications, many=True)
+    serializer = NotificationValuesSerializer.for_request(request)
+    changes = None
+    if since is not None:
+        notifications = Notification.objects.filter(user=request.user, updated_at__gt=since)
+        changes = collect(
+            serializer.values(notifications.order_by('updated_at', 'id')),
+            sync.removed_ids(request.user, since),
+        )
+    unread_count = counters.get_unread_count(request.user.pk)
+    if changes is None:
+        return Response({
+            'reset': True, 'watermark': serializer.format_datetime(watermark), 'unread_count': unread_count,
+        })
+    
+    rows, deleted = changes
     return Response({
-        'notifications': serializer.data,
-        'unread_count': unread_count
+        'reset': False,
+        'watermark': serializer.format_datetime(watermark),
+        'notifications': serializer.render(rows),
+        'deleted': deleted,
+        'unread_count': unread_count,
+        **serializer.sideloaded(),
     })
 
 
 @api_view(['PUT'])
 @permission_classes([IsAuthenticated])
 def notification_read(request, pk):
+    # Only the request whose update flips the row adjusts the counter, so
+    # concurrent reads of the same notification decrement it once.
+    with transaction.atomic():
+        updated = Notification.objects.filter(pk=pk, user=request.user, is_read=False).update(
+            is_read=True, updated_at=timezone.now()
+        )
+        if updated:
+            counters.adjust({request.user.pk: -updated})
+            publish_unread_count(request.user.pk)
+    
     try:
         notification = Notification.objects.get(pk=pk, user=request.user)
     except Notification.DoesNotExist:
         return Response({'error': 'الإشعار غير موجود'}, status=status.HTTP_404_NOT_FOUND)
     
-    notification.is_read = True
-    notification.save()
-    
     return Response(NotificationSerializer(notification).data)
 
 
@@ -53,6 +111,20 @@ def notification_delete(request, pk):
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def unread_count(request):
-    count = Notification.objects.filter(user=request.user, is_read=False).count()
-    return Response({'unread_count': count})
+    return Response({'unread_count': counters.get_unread_count(request.user.pk)})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def notification_export(request, export_format):
+    return streaming_response(request, NOTIFICATIONS, export_format, request.user, request.query_params)
+
 
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+def stream_ticket(request):
+    """Single-use ticket for opening the event stream, see notifications.streams."""
+    return Response({
+        'ticket': streams.issue_ticket(request.user),
+        'expires_in': streams.stream_setting('TICKET_TTL'),
+    }, status=status.HTTP_201_CREATED)
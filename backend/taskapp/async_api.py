@@ -0,0 +1,71 @@
+"""
+Async-native read endpoints.
+
+DRF 3.14 views are synchronous, so under ASGI each one occupies a worker
+thread for its whole duration. The hot read endpoints therefore also have
+async versions written as plain Django views on the async ORM and cache.
+``async_api_view`` authenticates the request's token without leaving the
+event loop and hands everything else (writes, session authentication,
+missing or invalid tokens) to the DRF view it shadows, so behaviour and
+error responses stay those of the DRF view. ``APIException``s raised by the
+async view (an invalid cursor, unknown ``?fields=``) are rendered the way
+DRF's exception handler renders them. ``json_response`` renders with DRF's
+``JSONRenderer`` so payloads are byte-for-byte the same.
+
+The URL confs route to these views when ``ASYNC_VIEWS`` is on.
+"""
+
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse
+from rest_framework.exceptions import APIException, AuthenticationFailed
+from rest_framework.renderers import JSONRenderer
+
+from accounts.authentication import CachedTokenAuthentication
+
+_renderer = JSONRenderer()
+
+
+async def authenticate(request):
+    header = request.headers.get('Authorization', '')
+    if not header.startswith('Token '):
+        return None
+    try:
+        user, _ = await CachedTokenAuthentication().aauthenticate_credentials(header[len('Token '):].strip())
+    except AuthenticationFailed:
+        return None
+    return user
+
+
+def json_response(data, status=200):
+    return HttpResponse(_renderer.render(data), content_type='application/json', status=status)
+
+
+def exception_response(exc):
+    """Response for an ``APIException``, as ``rest_framework.views.exception_handler`` builds it."""
+    data = exc.detail if isinstance(exc.detail, (list, dict)) else {'detail': exc.detail}
+    return json_response(data, status=exc.status_code)
+
+
+def async_api_view(fallback):
+    """Serve GETs from the decorated async view and the rest from ``fallback``."""
+    sync_fallback = sync_to_async(fallback)
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            if request.method == 'GET':
+                user = await authenticate(request)
+                if user is not None:
+                    request.user = user
+                    try:
+                        return await view(request, *args, **kwargs)
+                    except APIException as exc:
+                        return exception_response(exc)
+            return await sync_fallback(request, *args, **kwargs)
+        # DRF views are CSRF exempt and enforce CSRF for session auth
+        # themselves; csrf_exempt() cannot wrap coroutines on Django 4.2.
+        wrapped.csrf_exempt = True
+        return wrapped
+    return decorator
@@ -0,0 +1,263 @@
+"""
+Database connection pool.
+
+Django keeps one connection per thread, so a worker running many threads (or
+an ASGI worker, which runs every request in a fresh thread) opens a
+connection per thread and, with ``CONN_MAX_AGE`` at 0, per request.
+``ConnectionPool`` lets the threads of a process share at most ``MAX_SIZE``
+connections: Django's ``close()`` at the end of a request hands the
+connection back instead of closing it, and the next request takes it.
+
+A background thread keeps ``MIN_SIZE`` connections open, closes idle ones
+above that after ``MAX_IDLE`` seconds and replaces connections older than
+``MAX_LIFETIME``. When every connection is in use, checkouts wait up to
+``TIMEOUT`` seconds and then fail with ``PoolTimeout``. With
+``CONN_HEALTH_CHECKS`` a connection is verified before it is handed out,
+which is the check Django does itself before reusing a persistent one.
+
+The pool knows nothing about Django's backends; ``taskapp.postgresql_pool``
+plugs it into the PostgreSQL backend. Pool state is published through
+``taskapp.metrics``.
+"""
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+from django.db.utils import OperationalError
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+POOL_DEFAULTS = {
+    'MIN_SIZE': 2,
+    'MAX_SIZE': 10,
+    'TIMEOUT': 30,
+    'MAX_IDLE': 600,
+    'MAX_LIFETIME': 3600,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+class PoolTimeout(OperationalError):
+    pass
+
+
+def pool_options(settings_dict):
+    """``ConnectionPool`` keyword arguments from a database's ``POOL`` settings."""
+    return {name.lower(): settings_dict.get('POOL', {}).get(name, default) for name, default in POOL_DEFAULTS.items()}
+
+
+class PooledConnection:
+    __slots__ = ('connection', 'created', 'returned')
+
+    def __init__(self, connection):
+        self.connection = connection
+        self.created = self.returned = time.monotonic()
+
+
+class ConnectionPool:
+    def __init__(self, name, connect, check=None, min_size=2, max_size=10, timeout=30, max_idle=600, max_lifetime=3600):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError('Pool sizes must satisfy 0 <= MIN_SIZE <= MAX_SIZE and MAX_SIZE >= 1')
+        self.name = name
+        self.connect = connect
+        self.check = check
+        self.min_size, self.max_size = min_size, max_size
+        self.timeout, self.max_idle, self.max_lifetime = timeout, max_idle, max_lifetime
+        self.pid = os.getpid()
+        # Idle connections, most recently returned last: checkouts take from
+        # the end so the rest stay idle long enough to be evicted.
+        self._idle = deque()
+        self._in_use = {}
+        # Open connections plus slots reserved by connections being opened.
+        self._size = 0
+        self._waiting = 0
+        self._opened = 0
+        self._cond = threading.Condition()
+        self._closed = threading.Event()
+        self._worker = threading.Thread(target=self._maintain, name=f'db-pool-{name}', daemon=True)
+        self._worker.start()
+
+    def getconn(self):
+        started = time.monotonic()
+        with self._cond:
+            self._waiting += 1
+            try:
+                while not self._idle and self._size >= self.max_size:
+                    remaining = started + self.timeout - time.monotonic()
+                    if remaining <= 0 or self._closed.is_set():
+                        metrics.DB_POOL_TIMEOUTS.inc(self.name)
+                        raise PoolTimeout(
+                            f'No connection available in pool {self.name!r} within {self.timeout}s '
+                            f'({self.max_size} in use)'
+                        )
+                    self._publish()
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            entry = self._idle.pop() if self._idle else None
+            if entry is None:
+                self._size += 1
+            self._publish()
+        metrics.DB_POOL_WAIT.observe(time.monotonic() - started, self.name)
+
+        try:
+            if entry is not None:
+                entry = self._validate(entry)
+            if entry is None:
+                entry = self._open()
+        except BaseException:
+            self._release_slot()
+            raise
+        with self._cond:
+            self._in_use[id(entry.connection)] = entry
+        return entry.connection
+
+    def putconn(self, connection, reusable=True):
+        with self._cond:
+            entry = self._in_use.pop(id(connection), None)
+        if entry is None:
+            # Not ours (opened before a fork, or after close()).
+            self._discard(connection, 'foreign')
+            return
+        if not reusable or self._closed.is_set():
+            self._discard(connection, 'broken' if not reusable else 'pool_closed')
+            self._release_slot()
+        elif time.monotonic() - entry.created >= self.max_lifetime:
+            self._discard(connection, 'lifetime')
+            self._release_slot()
+        else:
+            entry.returned = time.monotonic()
+            with self._cond:
+                self._idle.append(entry)
+                self._publish()
+                self._cond.notify()
+
+    def close(self):
+        """Close idle connections now and in-use ones as they come back."""
+        self._closed.set()
+        with self._cond:
+            idle, self._idle = list(self._idle), deque()
+            self._size -= len(idle)
+            self._publish()
+            self._cond.notify_all()
+        for entry in idle:
+            self._discard(entry.connection, 'pool_closed')
+
+    def stats(self):
+        with self._cond:
+            return {
+                'size': self._size, 'idle': len(self._idle), 'in_use': self._size - len(self._idle),
+                'waiting': self._waiting, 'max_size': self.max_size, 'opened': self._opened,
+            }
+
+    def _open(self):
+        entry = PooledConnection(self.connect())
+        metrics.DB_POOL_OPENED.inc(self.name)
+        with self._cond:
+            self._opened += 1
+        return entry
+
+    def _validate(self, entry):
+        """Return ``entry`` if it can be handed out, else close it and return None."""
+        if time.monotonic() - entry.created >= self.max_lifetime:
+            self._discard(entry.connection, 'lifetime')
+            return None
+        if self.check is not None and not self.check(entry.connection):
+            self._discard(entry.connection, 'failed_check')
+            return None
+        return entry
+
+    def _discard(self, connection, reason):
+        metrics.DB_POOL_CLOSED.inc(self.name, reason)
+        try:
+            connection.close()
+        except Exception:
+            logger.debug('Error closing pooled connection', exc_info=True)
+
+    def _release_slot(self):
+        with self._cond:
+            self._size -= 1
+            self._publish()
+            self._cond.notify()
+
+    def _publish(self):
+        # Called with the condition held.
+        in_use = self._size - len(self._idle)
+        metrics.DB_POOL_CONNECTIONS.set(len(self._idle), self.name, 'idle')
+        metrics.DB_POOL_CONNECTIONS.set(in_use, self.name, 'in_use')
+        metrics.DB_POOL_SATURATION.set(round(in_use / self.max_size, 3), self.name)
+        metrics.DB_POOL_WAITING.set(self._waiting, self.name)
+
+    def _maintain(self):
+        interval = max(0.1, min(30, self.max_idle / 2, self.max_lifetime / 2))
+        while True:
+            try:
+                self._evict()
+                self._fill()
+            except Exception:
+                logger.exception('Connection pool %r maintenance failed', self.name)
+            if self._closed.wait(interval):
+                return
+
+    def _evict(self):
+        now = time.monotonic()
+        expired = []
+        with self._cond:
+            for entry in list(self._idle):
+                if now - entry.created >= self.max_lifetime:
+                    expired.append((entry, 'lifetime'))
+                elif now - entry.returned >= self.max_idle and self._size - len(expired) > self.min_size:
+                    expired.append((entry, 'idle'))
+            for entry, reason in expired:
+                self._idle.remove(entry)
+            self._size -= len(expired)
+            self._publish()
+        for entry, reason in expired:
+            self._discard(entry.connection, reason)
+
+    def _fill(self):
+        while not self._closed.is_set():
+            with self._cond:
+                if self._size >= self.min_size:
+                    return
+                self._size += 1
+            try:
+                entry = self._open()
+            except Exception:
+                with self._cond:
+                    self._size -= 1
+                logger.warning('Connection pool %r could not open a connection', self.name, exc_info=True)
+                return
+            with self._cond:
+                self._idle.appendleft(entry)
+                self._publish()
+                self._cond.notify()
+
+
+def get_pool(key, name, connect, check=None, **options):
+    """The process-wide pool for ``key``, created on first use."""
+    pool = _pools.get(key)
+    if pool is not None and pool.pid == os.getpid():
+        return pool
+    with _pools_lock:
+        pool = _pools.get(key)
+        # A forked worker must not share its parent's sockets.
+        if pool is None or pool.pid != os.getpid():
+            pool = _pools[key] = ConnectionPool(name, connect, check, **options)
+        return pool
+
+
+def close_pools(match=lambda key: True):
+    with _pools_lock:
+        keys = [key for key in _pools if match(key)]
+        pools = [_pools.pop(key) for key in keys]
+    for pool in pools:
+        if pool.pid == os.getpid():
+            pool.close()
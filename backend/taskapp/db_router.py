@@ -0,0 +1,154 @@
+"""
+Read-replica routing.
+
+``ReplicaRoutingMiddleware`` lets reads of safe (GET/HEAD/OPTIONS) requests
+go to the replicas configured with ``DATABASE_REPLICA_URLS``; everything
+else, including reads outside a request (commands, background threads), uses
+``default``. Once a request writes, the rest of it reads from ``default``
+and the client is pinned to ``default`` for ``STICKY_SECONDS`` so it reads
+its own writes while replicas catch up. Clients are identified by their
+``Authorization`` header or session cookie; pins are kept in the default
+cache. A pin set in one worker's local memory would not keep the client's
+next request on another worker off the replicas, so without
+``CACHE_SHARED`` every read stays on ``default``.
+
+Tokens and sessions are always read from ``default``: login creates them on
+a request that carries neither, so no pin covers the first request that
+uses them. Shared caches that are invalidated on commit (response payloads,
+statistics rollups) are refilled inside ``primary_reads`` so a lagging
+replica cannot store stale rows under the new version.
+"""
+
+import hashlib
+import logging
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+logger = logging.getLogger(__name__)
+
+REPLICA_DEFAULTS = {
+    'STICKY_SECONDS': 5,
+}
+
+SAFE_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+# Credentials are read right after they are created, see above.
+PRIMARY_MODELS = ('authtoken.token', 'sessions.session', 'notifications.streamticket')
+
+_state = ContextVar('taskapp_replica_routing', default=None)
+
+
+def replica_setting(name):
+    return getattr(settings, 'READ_REPLICAS', {}).get(name, REPLICA_DEFAULTS[name])
+
+
+def replica_aliases():
+    return [alias for alias in settings.DATABASES if alias != DEFAULT_DB_ALIAS]
+
+
+class RoutingState:
+    __slots__ = ('use_replica', 'wrote')
+
+    def __init__(self, use_replica):
+        self.use_replica = use_replica
+        self.wrote = False
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or not state.use_replica or state.wrote:
+            return DEFAULT_DB_ALIAS
+        if model._meta.label_lower in PRIMARY_MODELS:
+            return DEFAULT_DB_ALIAS
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            # Reads inside a transaction must see its uncommitted writes.
+            return DEFAULT_DB_ALIAS
+        aliases = replica_aliases()
+        return random.choice(aliases) if aliases else DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            state.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same data as the primary.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == DEFAULT_DB_ALIAS
+
+
+@contextmanager
+def primary_reads():
+    """Send the reads of the block to ``default``, e.g. to refill a shared cache."""
+    state = _state.get()
+    if state is None or not state.use_replica:
+        yield
+        return
+    state.use_replica = False
+    try:
+        yield
+    finally:
+        state.use_replica = True
+
+
+def _pin_key(request):
+    credential = request.headers.get('Authorization') or request.COOKIES.get(settings.SESSION_COOKIE_NAME)
+    if not credential:
+        return None
+    return 'replica:pin:%s' % hashlib.sha256(credential.encode()).hexdigest()[:32]
+
+
+class ReplicaRoutingMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = bool(replica_aliases())
+        if self.enabled and not getattr(settings, 'CACHE_SHARED', False):
+            logger.warning('Read replicas need CACHE_SHARED for read-your-writes pins; reading from default')
+            self.enabled = False
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        pin_key = _pin_key(request)
+        safe = request.method in SAFE_METHODS
+        state = RoutingState(safe and not (pin_key and cache.get(pin_key)))
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and pin_key:
+            cache.set(pin_key, True, replica_setting('STICKY_SECONDS'))
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        pin_key = _pin_key(request)
+        safe = request.method in SAFE_METHODS
+        state = RoutingState(safe and not (pin_key and await cache.aget(pin_key)))
+        token = _state.set(state)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote and pin_key:
+            await cache.aset(pin_key, True, replica_setting('STICKY_SECONDS'))
+        return response
@@ -0,0 +1,155 @@
+"""
+Per-request performance instrumentation.
+
+``InstrumentationMiddleware`` records, per view name, the wall time, number
+and total time of database queries, response rendering (serialization) time
+and response size into ``taskapp.metrics``. Requests over ``SLOW_REQUEST_MS``
+or ``MAX_QUERIES``, and requests that run one SQL statement
+``N_PLUS_ONE_THRESHOLD`` times or more (an N+1 pattern), are logged to
+``taskapp.performance`` with the offending SQL.
+
+Queries are observed through an execute wrapper installed once on every
+database connection. It looks the current request up in a context variable,
+which also follows ``sync_to_async`` into worker threads, so async views are
+measured too. Outside a request it costs one context variable lookup.
+"""
+
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from . import metrics
+
+logger = logging.getLogger('taskapp.performance')
+
+MONITORING_DEFAULTS = {
+    'ENABLED': True,
+    'SLOW_REQUEST_MS': 1000,
+    'MAX_QUERIES': 50,
+    'N_PLUS_ONE_THRESHOLD': 10,
+}
+
+_current = ContextVar('taskapp_request_stats', default=None)
+
+
+def monitoring_setting(name):
+    return getattr(settings, 'PERFORMANCE_MONITORING', {}).get(name, MONITORING_DEFAULTS[name])
+
+
+class RequestStats:
+    __slots__ = ('started', 'queries', 'db_time', 'statements', 'render_started', 'render_time')
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.statements = Counter()
+        self.render_started = None
+        self.render_time = 0.0
+
+
+def record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.db_time += time.perf_counter() - start
+        stats.queries += 1
+        # Parameters are bound separately, so equal SQL means the same statement.
+        stats.statements[sql] += 1
+
+
+def _install(connection, **kwargs):
+    if record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(record_query)
+
+
+class InstrumentationMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = monitoring_setting('ENABLED')
+        if self.enabled:
+            connection_created.connect(_install, dispatch_uid='taskapp.instrumentation')
+            for connection in connections.all(initialized_only=True):
+                _install(connection)
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.enabled:
+            return self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats)
+        return response
+
+    async def __acall__(self, request):
+        if not self.enabled:
+            return await self.get_response(request)
+        stats = RequestStats()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        self.record(request, response, stats)
+        return response
+
+    def process_template_response(self, request, response):
+        # DRF responses are rendered after this hook; the callback closes the
+        # interval once rendering is done.
+        stats = _current.get()
+        if stats is not None:
+            stats.render_started = time.perf_counter()
+            response.add_post_render_callback(lambda rendered: self._rendered(stats))
+        return response
+
+    @staticmethod
+    def _rendered(stats):
+        stats.render_time += time.perf_counter() - stats.render_started
+
+    def record(self, request, response, stats):
+        elapsed = time.perf_counter() - stats.started
+        match = getattr(request, 'resolver_match', None)
+        view = (match.view_name if match else None) or 'unresolved'
+
+        metrics.REQUESTS.inc(view, request.method, response.status_code)
+        metrics.REQUEST_DURATION.observe(elapsed, view)
+        metrics.DB_QUERIES.observe(stats.queries, view)
+        metrics.DB_DURATION.observe(stats.db_time, view)
+        metrics.SERIALIZATION_DURATION.observe(stats.render_time, view)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(len(response.content), view)
+
+        if elapsed * 1000 >= monitoring_setting('SLOW_REQUEST_MS') or stats.queries > monitoring_setting('MAX_QUERIES'):
+            metrics.SLOW_REQUESTS.inc(view)
+            logger.warning(
+                'Slow request %s %s (%s): %.1fms, %d queries in %.1fms, rendering %.1fms',
+                request.method, request.path, view, elapsed * 1000,
+                stats.queries, stats.db_time * 1000, stats.render_time * 1000,
+            )
+
+        threshold = monitoring_setting('N_PLUS_ONE_THRESHOLD')
+        repeated = [(sql, count) for sql, count in stats.statements.items() if count >= threshold]
+        if repeated:
+            metrics.N_PLUS_ONE.inc(view)
+            for sql, count in repeated:
+                logger.warning('Possible N+1 in %s %s (%s): %d x %s', request.method, request.path, view, count, sql)
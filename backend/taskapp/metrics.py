@@ -0,0 +1,175 @@
+"""
+In-process metrics in the Prometheus text exposition format.
+
+Counters, gauges and histograms are kept per worker process (each
+gunicorn/uvicorn worker exposes its own series, like an unaggregated
+Prometheus client), so recording is a dict lookup and a bisect under a lock. ``metrics_view`` serves
+them to admins at ``/api/metrics/``.
+"""
+
+import threading
+from bisect import bisect_left
+
+from django.http import HttpResponse
+from rest_framework import status
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100, 200)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+WAIT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5, 10, 30)
+
+
+def _escape(value):
+    return str(value).replace('\\', r'\\').replace('\n', r'\n').replace('"', r'\"')
+
+
+def _labels(names, values, extra=()):
+    pairs = list(zip(names, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{%s}' % ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+def _number(value):
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    kind = 'counter'
+
+    def __init__(self, name, documentation, labels=()):
+        self.name, self.documentation, self.label_names = name, documentation, tuple(labels)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount=1):
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labels, value in sorted(values.items()):
+            yield f'{self.name}{_labels(self.label_names, labels)} {_number(value)}'
+
+
+class Gauge(Counter):
+    kind = 'gauge'
+
+    def set(self, value, *labels):
+        with self._lock:
+            self._values[labels] = value
+
+
+class Histogram:
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labels=(), buckets=DURATION_BUCKETS):
+        self.name, self.documentation, self.label_names = name, documentation, tuple(labels)
+        self.buckets = tuple(buckets)
+        # labels -> [per-bucket counts (last one is +Inf), sum]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labels):
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labels)
+            if entry is None:
+                entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0]
+            entry[0][index] += 1
+            entry[1] += value
+
+    def samples(self):
+        with self._lock:
+            values = {labels: (list(counts), total) for labels, (counts, total) in self._values.items()}
+        for labels, (counts, total) in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ('+Inf',), counts):
+                cumulative += count
+                le = bound if bound == '+Inf' else _number(bound)
+                yield f'{self.name}_bucket{_labels(self.label_names, labels, [("le", le)])} {cumulative}'
+            yield f'{self.name}_sum{_labels(self.label_names, labels)} {_number(total)}'
+            yield f'{self.name}_count{_labels(self.label_names, labels)} {cumulative}'
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def expose(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+registry = Registry()
+
+REQUESTS = registry.register(Counter(
+    'taskapp_http_requests_total', 'HTTP requests by view, method and status code', ('view', 'method', 'status')
+))
+REQUEST_DURATION = registry.register(Histogram(
+    'taskapp_http_request_duration_seconds', 'Wall time from middleware entry to response', ('view',)
+))
+DB_QUERIES = registry.register(Histogram(
+    'taskapp_db_queries_per_request', 'Database queries issued per request', ('view',), COUNT_BUCKETS
+))
+DB_DURATION = registry.register(Histogram(
+    'taskapp_db_duration_seconds', 'Time spent executing database queries per request', ('view',)
+))
+SERIALIZATION_DURATION = registry.register(Histogram(
+    'taskapp_serialization_duration_seconds', 'Time spent rendering the response body', ('view',)
+))
+RESPONSE_SIZE = registry.register(Histogram(
+    'taskapp_response_size_bytes', 'Size of non-streaming response bodies', ('view',), SIZE_BUCKETS
+))
+SLOW_REQUESTS = registry.register(Counter(
+    'taskapp_slow_requests_total', 'Requests over the SLOW_REQUEST_MS or MAX_QUERIES thresholds', ('view',)
+))
+N_PLUS_ONE = registry.register(Counter(
+    'taskapp_n_plus_one_total', 'Requests repeating one SQL statement N_PLUS_ONE_THRESHOLD times or more', ('view',)
+))
+
+DB_POOL_CONNECTIONS = registry.register(Gauge(
+    'taskapp_db_pool_connections', 'Open pooled database connections by state (idle, in_use)', ('pool', 'state')
+))
+DB_POOL_SATURATION = registry.register(Gauge(
+    'taskapp_db_pool_saturation_ratio', 'Pooled connections in use divided by the pool MAX_SIZE', ('pool',)
+))
+DB_POOL_WAITING = registry.register(Gauge(
+    'taskapp_db_pool_waiting', 'Threads currently waiting for a pooled connection', ('pool',)
+))
+DB_POOL_WAIT = registry.register(Histogram(
+    'taskapp_db_pool_wait_seconds', 'Time spent waiting for a free pool slot', ('pool',), WAIT_BUCKETS
+))
+DB_POOL_TIMEOUTS = registry.register(Counter(
+    'taskapp_db_pool_timeouts_total', 'Checkouts that gave up after the pool TIMEOUT', ('pool',)
+))
+DB_POOL_OPENED = registry.register(Counter(
+    'taskapp_db_pool_connections_opened_total', 'Database connections opened by the pool', ('pool',)
+))
+DB_POOL_CLOSED = registry.register(Counter(
+    'taskapp_db_pool_connections_closed_total', 'Pooled connections closed, by reason', ('pool', 'reason')
+))
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def metrics_view(request):
+    if not request.user.is_admin:
+        return Response({'error': 'فقط المدير يمكنه عرض مقاييس الأداء'}, status=status.HTTP_403_FORBIDDEN)
+    response = HttpResponse(registry.expose(), content_type=CONTENT_TYPE)
+    response['Cache-Control'] = 'no-store'
+    return response
@@ -0,0 +1,86 @@
+"""
+PostgreSQL backend drawing its connections from ``taskapp.db_pool``.
+
+Select it with ``ENGINE: 'taskapp.postgresql_pool'`` and size the pool with a
+``POOL`` dict in the database settings (see ``DATABASE_POOL`` in settings).
+Everything else is Django's PostgreSQL backend: opening a connection takes
+one from the pool and closing it gives it back, so ``CONN_MAX_AGE`` still
+decides how long a thread holds on to a connection (0: one request) and
+``CONN_HEALTH_CHECKS`` whether connections are verified before reuse.
+"""
+
+from functools import partial
+
+from django.db import NO_DB_ALIAS
+from django.db.backends.postgresql import base
+from django.db.backends.postgresql.creation import DatabaseCreation as BaseDatabaseCreation
+
+from taskapp import db_pool
+
+
+def check_connection(connection):
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT 1')
+    except base.Database.Error:
+        return False
+    return True
+
+
+class DatabaseCreation(BaseDatabaseCreation):
+    # Idle pooled connections keep CREATE DATABASE ... TEMPLATE and DROP
+    # DATABASE from running, so close the pools of the database first.
+
+    def _clone_test_db(self, suffix, verbosity, keepdb=False):
+        self.connection.close()
+        name = self.connection.settings_dict['NAME']
+        db_pool.close_pools(lambda key: key[1] == name)
+        super()._clone_test_db(suffix, verbosity, keepdb)
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        db_pool.close_pools(lambda key: key[1] == test_database_name)
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    creation_class = DatabaseCreation
+
+    @property
+    def pooled(self):
+        # Connections to the maintenance database (test database creation)
+        # are rare and must not linger.
+        return self.alias != NO_DB_ALIAS
+
+    def get_pool(self, conn_params=None):
+        settings_dict = self.settings_dict
+        key = (self.alias, settings_dict['NAME'], settings_dict['HOST'], settings_dict['PORT'], settings_dict['USER'])
+        return db_pool.get_pool(
+            key, self.alias,
+            partial(self._open_connection, conn_params),
+            check_connection if settings_dict['CONN_HEALTH_CHECKS'] else None,
+            **db_pool.pool_options(settings_dict),
+        )
+
+    def _open_connection(self, conn_params=None):
+        return super().get_new_connection(conn_params or self.get_connection_params())
+
+    def get_new_connection(self, conn_params):
+        if not self.pooled:
+            return super().get_new_connection(conn_params)
+        return self.get_pool(conn_params).getconn()
+
+    def _close(self):
+        if self.connection is None:
+            return None
+        if not self.pooled:
+            return super()._close()
+        with self.wrap_database_errors:
+            self.get_pool().putconn(self.connection, reusable=self.reusable())
+
+    def reusable(self):
+        """Whether the current connection can go back to the pool, by the rules Django applies to persistent ones."""
+        if self.connection.closed or self.in_atomic_block:
+            return False
+        if self.autocommit != self.settings_dict['AUTOCOMMIT']:
+            return False
+        return not self.errors_occurred or self.is_usable()
@@ -0,0 +1,160 @@
+"""
+Versioned response caching with strong ETags for read-heavy GET endpoints.
+
+A view declares the version scopes its payload depends on (for example
+``tasks:user:7`` or ``users``). Writes bump those scopes through ``bump``,
+which changes every key derived from them. The ETag is computed from the
+scope versions alone, so a matching ``If-None-Match`` is answered with 304
+before the view, its queries or its serializers run.
+
+Payloads are rendered from the primary database (``primary_reads``), since
+a replica may not have caught up with the write that bumped the versions.
+Version tokens live in the default cache; rendered payloads live in the
+``responses`` cache, whose size is bounded by its ``MAX_ENTRIES`` and culled
+oldest-first. Payloads also expire after ``RESPONSE_CACHE_TIMEOUT`` seconds
+since fields such as ``is_overdue`` change with time alone.
+
+A version bumped in one worker's local-memory cache is invisible to the
+others, which would keep answering 304 and serving stale payloads. Without
+``CACHE_SHARED`` the decorated views therefore run on every request and
+send no ETag.
+"""
+
+import hashlib
+import time
+import uuid
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.cache import patch_vary_headers
+from django.utils.http import parse_etags
+from rest_framework import status
+from rest_framework.response import Response
+
+from .db_router import primary_reads
+
+RESPONSE_CACHE_ALIAS = 'responses'
+
+
+def _version_key(scope):
+    return f'version:{scope}'
+
+
+def get_versions(scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            # add() keeps a version another request initialised meanwhile.
+            cache.add(key, uuid.uuid4().hex, None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, '') for key in keys]
+
+
+async def aget_versions(scopes):
+    keys = [_version_key(scope) for scope in scopes]
+    versions = await cache.aget_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        for key in missing:
+            await cache.aadd(key, uuid.uuid4().hex, None)
+        versions.update(await cache.aget_many(missing))
+    return [versions.get(key, '') for key in keys]
+
+
+def bump(scopes):
+    """Invalidate every cached response that depends on ``scopes``."""
+    cache.set_many({_version_key(scope): uuid.uuid4().hex for scope in scopes}, None)
+
+
+def _enabled():
+    return getattr(settings, 'CACHE_SHARED', False)
+
+
+def _etag(view, request, versions, timeout):
+    bucket = int(time.time() // timeout)
+    identity = repr((
+        view.__module__, view.__name__, request.user.pk,
+        request.get_full_path(), bucket, versions,
+    ))
+    return '"%s"' % hashlib.sha256(identity.encode()).hexdigest()[:40]
+
+
+def _finalize(response, etag):
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    patch_vary_headers(response, ['Authorization'])
+    return response
+
+
+def conditional_response(scopes):
+    """
+    Cache successful GET responses of a DRF function view, or of an async
+    view returning rendered JSON (see ``taskapp.async_api``).
+
+    ``scopes(request, *args, **kwargs)`` returns the version scopes the
+    response depends on for the current user.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            return _async_conditional(view, scopes)
+
+        @wraps(view)
+        def wrapped(request, *args, **kwargs):
+            if request.method != 'GET' or not _enabled():
+                return view(request, *args, **kwargs)
+
+            timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60)
+            versions = get_versions(scopes(request, *args, **kwargs))
+            etag = _etag(view, request, versions, timeout)
+
+            if etag in parse_etags(request.headers.get('If-None-Match', '')):
+                response = Response(status=status.HTTP_304_NOT_MODIFIED)
+            else:
+                responses = caches[RESPONSE_CACHE_ALIAS]
+                data = responses.get(etag)
+                if data is not None:
+                    response = Response(data)
+                else:
+                    # The payload is cached under versions bumped on commit;
+                    # a lagging replica could still return the old rows.
+                    with primary_reads():
+                        response = view(request, *args, **kwargs)
+                    if response.status_code != status.HTTP_200_OK:
+                        return response
+                    responses.set(etag, response.data, timeout)
+            return _finalize(response, etag)
+        return wrapped
+    return decorator
+
+
+def _async_conditional(view, scopes):
+    # Same protocol; the rendered body is cached instead of ``response.data``.
+    @wraps(view)
+    async def wrapped(request, *args, **kwargs):
+        if request.method != 'GET' or not _enabled():
+            return await view(request, *args, **kwargs)
+
+        timeout = getattr(settings, 'RESPONSE_CACHE_TIMEOUT', 60)
+        versions = await aget_versions(scopes(request, *args, **kwargs))
+        etag = _etag(view, request, versions, timeout)
+
+        if etag in parse_etags(request.headers.get('If-None-Match', '')):
+            response = HttpResponseNotModified()
+        else:
+            responses = caches[RESPONSE_CACHE_ALIAS]
+            content = await responses.aget(etag)
+            if content is not None:
+                response = HttpResponse(content, content_type='application/json')
+            else:
+                with primary_reads():
+                    response = await view(request, *args, **kwargs)
+                if response.status_code != status.HTTP_200_OK:
+                    return response
+                await responses.aset(etag, response.content, timeout)
+        return _finalize(response, etag)
+    return wrapped
@@ -0,0 +1,297 @@
+"""
+Shared serializer helpers used by the accounts, tasks and notifications apps.
+"""
+
+from operator import itemgetter
+
+from django.utils import timezone
+from rest_framework import serializers
+
+
+class EagerLoadingMixin:
+    """
+    Lets a serializer declare the relations it reads so list views can build
+    a joined/prefetched queryset instead of issuing one query per row.
+
+    Relations of nested serializers that also use this mixin are collected
+    automatically and prefixed with the field's source, so a serializer only
+    lists its own direct relations.
+    """
+
+    select_related_fields = ()
+    prefetch_related_fields = ()
+
+    @classmethod
+    def get_related_lookups(cls):
+        select_related = list(cls.select_related_fields)
+        prefetch_related = list(cls.prefetch_related_fields)
+
+        for name, field in cls._declared_fields.items():
+            if isinstance(field, serializers.ListSerializer):
+                nested, many = field.child, True
+            else:
+                nested, many = field, False
+            if not isinstance(nested, EagerLoadingMixin):
+                continue
+
+            source = field.source or name
+            nested_select, nested_prefetch = type(nested).get_related_lookups()
+            if many:
+                if source not in prefetch_related:
+                    prefetch_related.append(source)
+                prefetch_related += [f'{source}__{lookup}' for lookup in nested_select + nested_prefetch]
+            else:
+                if source not in select_related:
+                    select_related.append(source)
+                select_related += [f'{source}__{lookup}' for lookup in nested_select]
+                prefetch_related += [f'{source}__{lookup}' for lookup in nested_prefetch]
+
+        return select_related, prefetch_related
+
+    @classmethod
+    def setup_eager_loading(cls, queryset):
+        select_related, prefetch_related = cls.get_related_lookups()
+        if select_related:
+            queryset = queryset.select_related(*select_related)
+        if prefetch_related:
+            queryset = queryset.prefetch_related(*prefetch_related)
+        return queryset
+
+
+class PreloadedPrimaryKeyRelatedField(serializers.PrimaryKeyRelatedField):
+    """
+    Primary key field that resolves ids from ``context['preloaded']`` (a dict
+    of model -> {pk: instance}) before falling back to a query, so bulk
+    endpoints can validate many items against one ``in_bulk`` lookup.
+    """
+
+    def to_internal_value(self, data):
+        preloaded = self.context.get('preloaded', {}).get(self.get_queryset().model)
+        if preloaded is None:
+            return super().to_internal_value(data)
+        try:
+            pk = int(data)
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if pk not in preloaded:
+            self.fail('does_not_exist', pk_value=data)
+        return preloaded[pk]
+
+
+class UserMap:
+    """
+    Users referenced by a page of rows, loaded with one ``.values()`` query
+    and rendered once each however many rows point at them.
+    """
+
+    def __init__(self, request=None):
+        self.request = request
+        self.ids = set()
+        self.users = {}
+
+    def add(self, *user_ids):
+        self.ids.update(user_ids)
+
+    def _missing(self):
+        missing = self.ids.difference(self.users)
+        missing.discard(None)
+        return missing
+
+    def load(self):
+        from accounts.serializers import UserValuesSerializer
+
+        missing = self._missing()
+        if missing:
+            self.users.update(UserValuesSerializer.render_ids(missing, self.request))
+        return self.users
+
+    async def aload(self):
+        from accounts.serializers import UserValuesSerializer
+
+        missing = self._missing()
+        if missing:
+            self.users.update(await UserValuesSerializer.arender_ids(missing, self.request))
+        return self.users
+
+    def get(self, user_id):
+        return None if user_id is None else self.users.get(user_id)
+
+
+def parse_field_paths(value):
+    """
+    Parse a ``?fields=``/``?expand=`` value such as ``id,title,task.status``
+    into a tree: ``{'id': {}, 'title': {}, 'task': {'status': {}}}``.
+    Returns ``None`` when the parameter was not given.
+    """
+    if value is None:
+        return None
+    tree = {}
+    for path in value.split(','):
+        node = tree
+        for part in filter(None, (part.strip() for part in path.split('.'))):
+            node = node.setdefault(part, {})
+    return tree
+
+
+class ValuesSerializer:
+    """
+    Read-only serializer for list endpoints that renders plain dicts straight
+    from ``QuerySet.values()`` rows, skipping model instantiation and the DRF
+    field machinery.
+
+    ``fields`` lists the output keys in order. ``user_fields`` are foreign
+    keys to ``User`` resolved through a shared ``UserMap``; ``nested`` maps
+    other foreign keys to the ``ValuesSerializer`` that renders them, fetched
+    with one extra query per relation. ``computed`` maps derived keys to the
+    columns they need and is rendered by ``get_<name>(row)``.
+
+    ``fields`` and ``expand`` (trees from ``parse_field_paths``) restrict the
+    output; only the columns of the selected keys are queried. Relations that
+    are not expanded render as ids, and ``expand=None`` expands everything.
+    Names the serializer cannot render raise ``ValidationError``.
+    With ``context['sideload_users']`` user fields stay ids and the caller
+    returns ``user_map.users`` once next to the results. Time-dependent keys
+    use ``context['now']`` so a response is computed against one instant.
+    """
+
+    model = None
+    fields = ()
+    key_columns = ('id',)
+    sources = {}
+    datetime_fields = ()
+    user_fields = ()
+    nested = {}
+    computed = {}
+
+    def __init__(self, context=None, fields=None, expand=None):
+        errors = {}
+        for param, tree, message in (('fields', fields, 'حقل غير معروف'), ('expand', expand, 'علاقة غير معروفة')):
+            unknown = self.unknown_paths(tree, param)
+            if unknown:
+                errors[param] = [f'{message}: {path}' for path in unknown]
+        if errors:
+            raise serializers.ValidationError(errors)
+        self.context = context if context is not None else {}
+        self.context.setdefault('now', timezone.now())
+        self.context.setdefault('user_map', UserMap(self.context.get('request')))
+        self.now = self.context['now']
+        self.user_map = self.context['user_map']
+        # Resolved once; DateTimeField looks the active timezone up per value.
+        self.timezone = serializers.DateTimeField().default_timezone()
+
+        self.columns = list(self.key_columns)
+        self.user_columns = []
+        self.children = {}
+        self.renderers = [
+            (name, self._renderer(name, fields, expand))
+            for name in self.fields if fields is None or name in fields
+        ]
+
+    @classmethod
+    def unknown_paths(cls, tree, param, prefix=''):
+        """
+        Paths of a ``fields`` or ``expand`` tree that name no field, or no
+        relation for ``expand``. Only ``nested`` relations have sub-paths.
+        """
+        allowed = cls.fields if param == 'fields' else (*cls.user_fields, *cls.nested)
+        unknown = []
+        for name, subtree in (tree or {}).items():
+            if name not in allowed or (subtree and name not in cls.nested):
+                unknown.append(f'{prefix}{name}')
+            elif subtree:
+                unknown += cls.nested[name].unknown_paths(subtree, param, f'{prefix}{name}.')
+        return unknown
+
+    @classmethod
+    def for_request(cls, request):
+        """Serializer configured from ``?fields=``, ``?expand=`` and ``?sideload=users``."""
+        params = getattr(request, 'query_params', request.GET)
+        context = {'now': timezone.now(), 'sideload_users': params.get('sideload') == 'users'}
+        return cls(context, parse_field_paths(params.get('fields')), parse_field_paths(params.get('expand')))
+
+    def _renderer(self, name, fields, expand):
+        if name in self.computed:
+            self.columns += self.computed[name]
+            return getattr(self, f'get_{name}')
+
+        is_relation = name in self.user_fields or name in self.nested
+        column = f'{name}_id' if is_relation else self.sources.get(name, name)
+        self.columns.append(column)
+        if is_relation and (expand is None or name in expand):
+            if name in self.user_fields:
+                self.user_columns.append(column)
+                return lambda row: self.user(row[column])
+            child = self.nested[name](
+                self.context,
+                (fields or {}).get(name) or None,
+                None if expand is None else expand[name],
+            )
+            self.children[column] = child
+            return lambda row: child.rendered.get(row[column])
+        if name in self.datetime_fields:
+            return lambda row: self.format_datetime(row[column])
+        return itemgetter(column)
+
+    def values(self, queryset, **expressions):
+        return queryset.values(*dict.fromkeys(self.columns), **expressions)
+
+    def _referenced(self, rows):
+        for column in self.user_columns:
+            self.user_map.add(*(row[column] for row in rows))
+        for column, child in self.children.items():
+            ids = {row[column] for row in rows}
+            ids.discard(None)
+            yield child, child.values(child.model.objects.filter(pk__in=ids)) if ids else None
+
+    def prepare(self, rows):
+        """Collect everything the rows reference before any is rendered."""
+        for child, queryset in self._referenced(rows):
+            child.rows = list(queryset) if queryset is not None else []
+            child.prepare(child.rows)
+
+    async def aprepare(self, rows):
+        for child, queryset in self._referenced(rows):
+            child.rows = [row async for row in queryset] if queryset is not None else []
+            await child.aprepare(child.rows)
+
+    def render_children(self):
+        for child in self.children.values():
+            child.render_children()
+            child.rendered = {row['id']: child.to_representation(row) for row in child.rows}
+
+    def format_datetime(self, value):
+        """Render an aware datetime as ``serializers.DateTimeField`` would."""
+        if value is None:
+            return None
+        if self.timezone is not None:
+            value = value.astimezone(self.timezone)
+        value = value.isoformat()
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+
+    def user(self, user_id):
+        if self.context.get('sideload_users'):
+            return user_id
+        return self.user_map.get(user_id)
+
+    def to_representation(self, row):
+        return {name: render(row) for name, render in self.renderers}
+
+    def sideloaded(self):
+        """Top-level payload to return next to the results (call after ``render``)."""
+        if self.context.get('sideload_users'):
+            return {'users': self.user_map.users}
+        return {}
+
+    def render(self, rows):
+        rows = list(rows)
+        self.prepare(rows)
+        self.user_map.load()
+        self.render_children()
+        return [self.to_representation(row) for row in rows]
+
+    async def arender(self, rows):
+        """``render`` for async views; ``rows`` is a list of ``.values()`` rows."""
+        await self.aprepare(rows)
+        await self.user_map.aload()
+        self.render_children()
+        return [self.to_representation(row) for row in rows]
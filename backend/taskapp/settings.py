@@ -37,11 +37,14 @@ INSTALLED_APPS = [
     'accounts',
     'tasks',
     'notifications',
+    'benchmarks',
 ]
 
 MIDDLEWARE = [
+    'taskapp.instrumentation.InstrumentationMiddleware',
+    'taskapp.db_router.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'whitenoise.middleware.WhiteNoiseMiddleware',
+    'taskapp.staticfiles.WhiteNoiseMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -75,15 +78,32 @@ WSGI_APPLICATION = 'taskapp.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/4.2/ref/settings/#databases
 
+# Connection pool (taskapp.db_pool): with DATABASE_POOL=True the threads of
+# each worker process share at most MAX_SIZE PostgreSQL connections, which go
+# back to the pool at the end of every request (CONN_MAX_AGE 0) instead of
+# being kept per thread. CONN_HEALTH_CHECKS then applies on checkout.
+DATABASE_POOL = os.environ.get('DATABASE_POOL', 'False') == 'True'
+DATABASE_POOL_OPTIONS = {
+    'MIN_SIZE': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 2)),
+    'MAX_SIZE': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+    'TIMEOUT': float(os.environ.get('DATABASE_POOL_TIMEOUT', 30)),
+    'MAX_IDLE': float(os.environ.get('DATABASE_POOL_MAX_IDLE', 600)),
+    'MAX_LIFETIME': float(os.environ.get('DATABASE_POOL_MAX_LIFETIME', 3600)),
+}
+
+
+def database_config(url):
+    config = dj_database_url.parse(url, conn_max_age=600, conn_health_checks=True)
+    if DATABASE_POOL and config['ENGINE'] == 'django.db.backends.postgresql':
+        config.update(ENGINE='taskapp.postgresql_pool', CONN_MAX_AGE=0, POOL=DATABASE_POOL_OPTIONS)
+    return config
+
+
 # Use PostgreSQL if DATABASE_URL is set, otherwise use SQLite
 DATABASE_URL = os.environ.get('DATABASE_URL')
 if DATABASE_URL:
     DATABASES = {
-        'default': dj_database_url.config(
-            default=DATABASE_URL,
-            conn_max_age=600,
-            conn_health_checks=True,
-        )
+        'default': database_config(DATABASE_URL)
     }
 else:
     DATABASES = {
@@ -93,6 +113,188 @@ else:
         }
     }
 
+# Read replicas: comma-separated database URLs. Safe requests read from them
+# (taskapp.db_router) except for STICKY_SECONDS after the client wrote; this
+# needs CACHE_SHARED.
+DATABASE_REPLICA_URLS = [url for url in os.environ.get('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+for index, url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f'replica{index}'] = {
+        **database_config(url.strip()),
+        # Tests run against the primary's test database.
+        'TEST': {'MIRROR': 'default'},
+    }
+DATABASE_ROUTERS = ['taskapp.db_router.ReplicaRouter'] if DATABASE_REPLICA_URLS else []
+
+READ_REPLICAS = {
+    'STICKY_SECONDS': int(os.environ.get('DATABASE_REPLICA_STICKY_SECONDS', 5)),
+}
+
+
+# Cache
+# Local memory by default; set REDIS_URL to share the cache between workers.
+REDIS_URL = os.environ.get('REDIS_URL')
+# Whether every process serving the app sees the same default cache. State
+# that a write in one worker must invalidate for all of them (cached API
+# tokens, response versions and ETags, unread counts, task statistics, read
+# replica pins) is only cached when it does; replicas are left unused without it. Local memory is per process: set
+# CACHE_SHARED=True with it only for a single process and no separate workers.
+CACHE_SHARED = os.environ.get('CACHE_SHARED', str(bool(REDIS_URL))) == 'True'
+# The 'responses' cache holds rendered GET payloads (taskapp.response_cache)
+# and is bounded separately so it cannot evict tokens or counters.
+if REDIS_URL:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+        },
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': REDIS_URL,
+            'KEY_PREFIX': 'responses',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'taskapp',
+            'OPTIONS': {
+                'MAX_ENTRIES': 10000,
+            },
+        },
+        'responses': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'taskapp-responses',
+            'OPTIONS': {
+                'MAX_ENTRIES': 2000,
+            },
+        },
+    }
+
+# Lifetime (seconds) of cached GET payloads and their ETags (CACHE_SHARED only)
+RESPONSE_CACHE_TIMEOUT = int(os.environ.get('RESPONSE_CACHE_TIMEOUT', 60))
+
+# Pub/sub used to push notifications to connected clients. The local broker
+# only reaches clients of the same worker process.
+if REDIS_URL:
+    NOTIFICATIONS_PUBSUB = {
+        'BACKEND': 'notifications.pubsub.RedisBroker',
+        'OPTIONS': {'url': REDIS_URL},
+    }
+else:
+    NOTIFICATIONS_PUBSUB = {
+        'BACKEND': 'notifications.pubsub.LocalBroker',
+    }
+
+NOTIFICATIONS_STREAM = {
+    'HEARTBEAT_INTERVAL': int(os.environ.get('NOTIFICATIONS_HEARTBEAT_INTERVAL', 15)),
+    'MAX_AGE': int(os.environ.get('NOTIFICATIONS_STREAM_MAX_AGE', 300)),
+    'RETRY_MS': 3000,
+    'POLL_TIMEOUT': int(os.environ.get('NOTIFICATIONS_POLL_TIMEOUT', 25)),
+    # Seconds a stream ticket (POST stream/ticket/) stays valid
+    'TICKET_TTL': 30,
+}
+
+# Notification retention (notifications.retention), run with
+# `manage.py archive_notifications`: read and unread notifications older than
+# READ_DAYS/UNREAD_DAYS (None keeps them) are moved BATCH_SIZE rows per
+# transaction to the archive table, to gzipped NDJSON files in ARCHIVE_DIR
+# ('file'), or deleted ('none').
+NOTIFICATIONS_RETENTION = {
+    'READ_DAYS': int(os.environ.get('NOTIFICATIONS_READ_RETENTION_DAYS', 30)),
+    'UNREAD_DAYS': int(os.environ.get('NOTIFICATIONS_UNREAD_RETENTION_DAYS', 180)),
+    'ARCHIVE': os.environ.get('NOTIFICATIONS_ARCHIVE', 'table'),
+    'ARCHIVE_DIR': os.environ.get('NOTIFICATIONS_ARCHIVE_DIR'),
+    'BATCH_SIZE': 1000,
+    'PAUSE': 0.1,
+}
+
+# Seconds a resolved API token (user and role) stays cached (CACHE_SHARED only)
+AUTH_TOKEN_CACHE_TIMEOUT = int(os.environ.get('AUTH_TOKEN_CACHE_TIMEOUT', 300))
+
+# Seconds a user's unread notification count stays cached before it is
+# re-read from its counter row (writes invalidate it immediately; CACHE_SHARED
+# only).
+NOTIFICATIONS_UNREAD_CACHE_TIMEOUT = 60
+
+# Largest payload accepted by /api/tasks/bulk/
+TASKS_BULK_MAX_ITEMS = 500
+
+# Chunked task import (tasks.imports): records validated and committed per
+# transaction, and whether PostgreSQL loads chunks with COPY
+TASKS_IMPORT = {
+    'CHUNK_SIZE': int(os.environ.get('TASKS_IMPORT_CHUNK_SIZE', 1000)),
+    'USE_COPY': True,
+}
+
+# Overdue task detector (tasks.overdue). Run it with
+# `manage.py detect_overdue_tasks --loop`, or set RUN_IN_PROCESS to scan from a
+# thread inside a single-process deployment.
+TASKS_OVERDUE = {
+    'INTERVAL': int(os.environ.get('TASKS_OVERDUE_INTERVAL', 60)),
+    'BATCH_SIZE': 1000,
+    'RUN_IN_PROCESS': os.environ.get('TASKS_OVERDUE_IN_PROCESS', 'False') == 'True',
+}
+
+# Transactional outbox for task and evaluation changes (tasks.outbox). With
+# ASYNC each process dispatches pending events from a background thread after
+# commits and every INTERVAL seconds; `manage.py dispatch_task_events --loop`
+# runs a separate dispatcher. A claimed batch is held for LEASE seconds; failed
+# events are retried after RETRY_BACKOFF seconds, doubling up to MAX_BACKOFF,
+# and given up after MAX_ATTEMPTS unless the error is a database connection one.
+TASKS_OUTBOX = {
+    'ASYNC': os.environ.get('TASKS_OUTBOX_ASYNC', 'True') == 'True',
+    'BATCH_SIZE': 500,
+    'INTERVAL': int(os.environ.get('TASKS_OUTBOX_INTERVAL', 5)),
+    'LEASE': 60,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 5,
+    'MAX_BACKOFF': 3600,
+    'KEEP_DAYS': 7,
+}
+
+# Per-employee monthly performance summaries (tasks.analytics), refreshed
+# after task and evaluation writes unless REFRESH_ON_WRITE is off; backfill
+# them with `manage.py refresh_performance`.
+TASKS_ANALYTICS = {
+    'REFRESH_ON_WRITE': os.environ.get('TASKS_ANALYTICS_REFRESH_ON_WRITE', 'True') == 'True',
+    'BACKFILL_BATCH_SIZE': 50000,
+}
+
+# Delta sync (taskapp.sync) behind /api/tasks/sync/ and
+# /api/notifications/sync/. Tombstones of deleted or reassigned rows are kept
+# for TOMBSTONE_DAYS; run `manage.py purge_tombstones` daily to drop older ones.
+DELTA_SYNC = {
+    'OVERLAP_SECONDS': 5,
+    'MAX_CHANGES': int(os.environ.get('DELTA_SYNC_MAX_CHANGES', 500)),
+    'TOMBSTONE_DAYS': int(os.environ.get('DELTA_SYNC_TOMBSTONE_DAYS', 30)),
+}
+
+# Rows fetched per server-side cursor round trip (and per response chunk) by
+# the streaming CSV/NDJSON exports, see taskapp.exports
+EXPORT_CHUNK_SIZE = 2000
+
+# Serve the hot read endpoints (task list/detail/statistics, notification list
+# and unread count) from async views on the async ORM, see taskapp.async_api.
+# Meant for the ASGI server in the Procfile and render.yaml, which turn it on;
+# under WSGI the sync DRF views are cheaper, so it is off by default.
+ASYNC_VIEWS = os.environ.get('ASYNC_VIEWS', 'False') == 'True'
+
+# Per-request instrumentation (taskapp.instrumentation), exposed to admins as
+# Prometheus metrics at /api/metrics/. Requests slower than SLOW_REQUEST_MS or
+# issuing more than MAX_QUERIES queries, and statements repeated
+# N_PLUS_ONE_THRESHOLD times in one request, are logged to taskapp.performance.
+PERFORMANCE_MONITORING = {
+    'ENABLED': os.environ.get('PERFORMANCE_MONITORING', 'True') == 'True',
+    'SLOW_REQUEST_MS': int(os.environ.get('SLOW_REQUEST_MS', 1000)),
+    'MAX_QUERIES': int(os.environ.get('SLOW_REQUEST_MAX_QUERIES', 50)),
+    'N_PLUS_ONE_THRESHOLD': 10,
+}
+
+# Upper bound (seconds) for cached task statistics rollups. Entries also
+# expire as soon as the next open task passes its due date.
+TASK_STATISTICS_CACHE_TIMEOUT = int(os.environ.get('TASK_STATISTICS_CACHE_TIMEOUT', 300))
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -148,13 +350,13 @@ AUTH_USER_MODEL = 'accounts.User'
 # REST Framework settings
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework.authentication.TokenAuthentication',
+        'accounts.authentication.CachedTokenAuthentication',
         'rest_framework.authentication.SessionAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
     ],
-    'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.PageNumberPagination',
+    'DEFAULT_PAGINATION_CLASS': 'taskapp.pagination.KeysetPagination',
     'PAGE_SIZE': 20,
 }
 
@@ -214,5 +416,10 @@ LOGGING = {
             'level': 'DEBUG',
             'propagate': False,
         },
+        'taskapp.performance': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+            'propagate': False,
+        },
     },
 }
@@ -0,0 +1,96 @@
+from unittest import mock
+
+from django.contrib.sessions.models import Session
+from django.core.cache import caches
+from django.db import DEFAULT_DB_ALIAS
+from django.test import SimpleTestCase, override_settings
+from rest_framework.authtoken.models import Token
+from rest_framework.decorators import api_view, permission_classes
+from rest_framework.permissions import AllowAny
+from rest_framework.response import Response
+from rest_framework.test import APIRequestFactory
+
+from tasks.models import Task
+from . import db_router
+from .response_cache import conditional_response
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        patcher = mock.patch.object(db_router, 'replica_aliases', return_value=['replica1'])
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.router = db_router.ReplicaRouter()
+        token = db_router._state.set(db_router.RoutingState(use_replica=True))
+        self.addCleanup(db_router._state.reset, token)
+
+    def test_safe_reads_use_replicas(self):
+        self.assertEqual(self.router.db_for_read(Task), 'replica1')
+
+    def test_credentials_are_read_from_primary(self):
+        # Created by login on a request no pin covers.
+        self.assertEqual(self.router.db_for_read(Token), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(Session), DEFAULT_DB_ALIAS)
+
+    def test_primary_reads(self):
+        with db_router.primary_reads():
+            self.assertEqual(self.router.db_for_read(Task), DEFAULT_DB_ALIAS)
+        self.assertEqual(self.router.db_for_read(Task), 'replica1')
+
+    @override_settings(CACHE_SHARED=True)
+    def test_response_cache_refills_from_primary(self):
+        caches['responses'].clear()
+        reads = []
+
+        @api_view(['GET'])
+        @permission_classes([AllowAny])
+        @conditional_response(lambda request: ['tests'])
+        def view(request):
+            reads.append(self.router.db_for_read(Task))
+            return Response({'ok': True})
+
+        view(APIRequestFactory().get('/'))
+        self.assertEqual(reads, [DEFAULT_DB_ALIAS])
+
+
+class ResponseCacheTests(SimpleTestCase):
+    def setUp(self):
+        caches['responses'].clear()
+        self.calls = 0
+
+        @api_view(['GET'])
+        @permission_classes([AllowAny])
+        @conditional_response(lambda request: ['tests'])
+        def view(request):
+            self.calls += 1
+            return Response({'ok': True})
+        self.view = view
+
+    @override_settings(CACHE_SHARED=False)
+    def test_disabled_without_a_shared_cache(self):
+        for _ in range(2):
+            response = self.view(APIRequestFactory().get('/'))
+            self.assertFalse(response.has_header('ETag'))
+        self.assertEqual(self.calls, 2)
+
+    @override_settings(CACHE_SHARED=True)
+    def test_not_modified(self):
+        etag = self.view(APIRequestFactory().get('/'))['ETag']
+        response = self.view(APIRequestFactory().get('/', HTTP_IF_NONE_MATCH=etag))
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.calls, 1)
+
+
+class ReplicaMiddlewareTests(SimpleTestCase):
+    def middleware(self):
+        with mock.patch.object(db_router, 'replica_aliases', return_value=['replica1']):
+            return db_router.ReplicaRoutingMiddleware(lambda request: Response())
+
+    @override_settings(CACHE_SHARED=False)
+    def test_needs_a_shared_cache_for_pins(self):
+        with self.assertLogs('taskapp.db_router', 'WARNING'):
+            self.assertFalse(self.middleware().enabled)
+
+    @override_settings(CACHE_SHARED=True)
+    def test_enabled_with_a_shared_cache(self):
+        self.assertTrue(self.middleware().enabled)
@@ -6,6 +6,7 @@ from django.urls import path, include
 from django.conf import settings
 from django.conf.urls.static import static
 from django.http import JsonResponse
+from .metrics import metrics_view
 
 def api_root(request):
     return JsonResponse({
@@ -16,6 +17,7 @@ def api_root(request):
             'auth': '/api/auth/',
             'tasks': '/api/tasks/',
             'notifications': '/api/notifications/',
+            'metrics': '/api/metrics/',
             'admin': '/admin/',
         }
     })
@@ -27,6 +29,7 @@ urlpatterns = [
     path('api/auth/', include('accounts.urls')),
     path('api/tasks/', include('tasks.urls')),
     path('api/notifications/', include('notifications.urls')),
+    path('api/metrics/', metrics_view, name='metrics'),
 ]
 
 if settings.DEBUG:
@@ -1,5 +1,6 @@
 from django.contrib import admin
-from .models import Task, TaskEvaluation
+from . import outbox
+from .models import EmployeePerformance, OutboxEvent, Task, TaskEvaluation, TaskImport
 
 
 @admin.register(Task)
@@ -15,3 +16,29 @@ class TaskEvaluationAdmin(admin.ModelAdmin):
     list_display = ('task', 'rating', 'evaluated_by', 'evaluated_at')
     list_filter = ('rating', 'evaluated_at')
 
+
+
+@admin.register(TaskImport)
+class TaskImportAdmin(admin.ModelAdmin):
+    list_display = ('source', 'created_by', 'status', 'created_count', 'error_count', 'created_at')
+    list_filter = ('status', 'created_at')
+    readonly_fields = ('checksum', 'next_row', 'chunk_reports', 'assigned_counts', 'created_at', 'updated_at', 'completed_at')
+
+
+@admin.register(EmployeePerformance)
+class EmployeePerformanceAdmin(admin.ModelAdmin):
+    list_display = ('employee', 'period', 'total_tasks', 'completed_tasks', 'on_time_tasks', 'late_tasks', 'overdue_tasks', 'average_rating')
+    list_filter = ('period',)
+    readonly_fields = ('refreshed_at',)
+
+
+@admin.register(OutboxEvent)
+class OutboxEventAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'task_id', 'created_at', 'processed_at', 'available_at', 'attempts')
+    list_filter = ('kind', 'processed_at')
+    readonly_fields = ('key', 'payload', 'created_at', 'processed_at', 'available_at', 'attempts', 'last_error')
+    actions = ['retry_events']
+    
+    @admin.action(description='إعادة محاولة الأحداث المحددة')
+    def retry_events(self, request, queryset):
+        outbox.retry(queryset)
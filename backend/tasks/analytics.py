@@ -0,0 +1,284 @@
+"""
+Per-employee performance summaries.
+
+``EmployeePerformance`` holds one row per employee and month (the month a
+task was created in, so a task never moves between periods) with the task,
+completion, on-time and overdue counts, the average evaluation rating and
+completion time percentiles. The analytics endpoints read only these rows.
+
+Task and evaluation writes record the (employee, month) cells they touch
+(``task_cells``/``evaluation_cells``) in their ``tasks.outbox`` event, and
+the outbox dispatcher recomputes them from their tasks off the request
+path, with one query per ``REFRESH_BATCH_SIZE`` cells (turn
+``REFRESH_ON_WRITE`` off to leave it to the batch job). The overdue
+detector does the same, so open tasks are counted as overdue once their
+deadline is flagged. ``manage.py refresh_performance`` recomputes every cell (or those
+from a given month on) for backfills, streaming the tasks ordered by
+assignee and computing each batch of cells with NumPy.
+"""
+
+from datetime import datetime
+
+import numpy as np
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Q, Sum
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+
+from .models import EmployeePerformance, Task
+
+ANALYTICS_DEFAULTS = {
+    'REFRESH_ON_WRITE': True,
+    'REFRESH_BATCH_SIZE': 100,
+    'BACKFILL_BATCH_SIZE': 50000,
+}
+
+COLUMNS = ('assigned_to_id', 'period', 'status', 'created_at', 'completed_at', 'due_date', 'evaluation__rating')
+
+OPEN_STATUSES = ('pending', 'in_progress')
+
+PERCENTILES = {'completion_p50': 0.5, 'completion_p90': 0.9}
+
+SUMMARY_FIELDS = (
+    'total_tasks', 'completed_tasks', 'on_time_tasks', 'late_tasks', 'overdue_tasks', 'rated_tasks',
+    'average_rating', 'completion_mean', *PERCENTILES,
+)
+
+
+def analytics_setting(name):
+    return getattr(settings, 'TASKS_ANALYTICS', {}).get(name, ANALYTICS_DEFAULTS[name])
+
+
+def period_of(value):
+    """First day of the month ``value`` falls in, in the current time zone."""
+    return timezone.localtime(value).date().replace(day=1)
+
+
+def period_bounds(period):
+    start = timezone.make_aware(datetime(period.year, period.month, 1))
+    if period.month == 12:
+        return start, timezone.make_aware(datetime(period.year + 1, 1, 1))
+    return start, timezone.make_aware(datetime(period.year, period.month + 1, 1))
+
+
+def parse_period(value):
+    """``date`` for a ``YYYY-MM`` query parameter; raises ``ValueError``."""
+    return datetime.strptime(value, '%Y-%m').date()
+
+
+def employee_totals(summaries):
+    """
+    Per-employee totals over the ``summaries`` queryset. Counts and means
+    add up across months; percentiles do not and are left out.
+    """
+    # The weighted sums come first: after them the count fields are shadowed
+    # by their own totals.
+    rows = summaries.order_by().values('employee').annotate(
+        rating_sum=Sum(F('average_rating') * F('rated_tasks')),
+        completion_sum=Sum(F('completion_mean') * (F('on_time_tasks') + F('late_tasks'))),
+        total_tasks=Sum('total_tasks'),
+        completed_tasks=Sum('completed_tasks'),
+        on_time_tasks=Sum('on_time_tasks'),
+        late_tasks=Sum('late_tasks'),
+        overdue_tasks=Sum('overdue_tasks'),
+        rated_tasks=Sum('rated_tasks'),
+    ).order_by('employee')
+    totals = []
+    for row in rows:
+        rating_sum, completion_sum = row.pop('rating_sum'), row.pop('completion_sum')
+        timed, rated = row['on_time_tasks'] + row['late_tasks'], row['rated_tasks']
+        totals.append({
+            **row,
+            'average_rating': round(rating_sum / rated, 3) if rated else None,
+            'completion_mean': round(completion_sum / timed, 3) if timed else None,
+            'on_time_rate': round(row['on_time_tasks'] / timed, 4) if timed else None,
+        })
+    return totals
+
+
+def _rows(tasks):
+    return tasks.annotate(period=TruncMonth('created_at')).values_list(*COLUMNS)
+
+
+def _timestamps(values):
+    return np.array([value.timestamp() if value is not None else np.nan for value in values], dtype=float)
+
+
+def summarize(rows, now=None):
+    """
+    Summary field values per (employee, period) for rows of ``COLUMNS``.
+    Returns a dict keyed by ``(employee_id, period)``.
+    """
+    if not rows:
+        return {}
+    now = (now or timezone.now()).timestamp()
+    employees, periods, statuses, created, completed, due, ratings = zip(*rows)
+    employees = np.array(employees, dtype=np.int64)
+    periods = [period_of(period) if isinstance(period, datetime) else period for period in periods]
+    period_ids = np.array([period.toordinal() for period in periods], dtype=np.int64)
+    statuses = np.array(statuses)
+    created, completed, due = _timestamps(created), _timestamps(completed), _timestamps(due)
+    ratings = np.array([np.nan if rating is None else rating for rating in ratings], dtype=float)
+
+    is_completed = statuses == 'completed'
+    # Completed tasks without completed_at count as completed but have no
+    # completion time and are neither on time nor late.
+    timed = is_completed & ~np.isnan(completed)
+    latency = np.where(timed, completed - created, np.nan)
+    on_time = timed & (completed <= due)
+    late = timed & (completed > due)
+    overdue = late | (np.isin(statuses, OPEN_STATUSES) & (due < now))
+    rated = ~np.isnan(ratings)
+
+    # Group by (employee, period) with completed latencies first and sorted
+    # within each group (NaN sorts last), so percentiles index into them.
+    order = np.lexsort((latency, period_ids, employees))
+    employees, period_ids, latency = employees[order], period_ids[order], latency[order]
+    boundary = np.r_[True, (employees[1:] != employees[:-1]) | (period_ids[1:] != period_ids[:-1])]
+    starts = np.flatnonzero(boundary)
+
+    def per_group(values):
+        return np.add.reduceat(values[order].astype(np.int64 if values.dtype == bool else float), starts)
+
+    totals = np.diff(np.r_[starts, len(order)])
+    completed_counts = per_group(is_completed)
+    timed_counts = per_group(timed)
+    rated_counts = per_group(rated)
+    rating_sums = per_group(np.nan_to_num(ratings))
+    latency_sums = np.add.reduceat(np.nan_to_num(latency), starts)
+    has_timed = timed_counts > 0
+
+    stats = {
+        'total_tasks': totals,
+        'completed_tasks': completed_counts,
+        'on_time_tasks': per_group(on_time),
+        'late_tasks': per_group(late),
+        'overdue_tasks': per_group(overdue),
+        'rated_tasks': rated_counts,
+        'average_rating': np.divide(
+            rating_sums, rated_counts, out=np.full(len(starts), np.nan), where=rated_counts > 0
+        ),
+        'completion_mean': np.divide(
+            latency_sums, timed_counts, out=np.full(len(starts), np.nan), where=has_timed
+        ),
+    }
+    for field, quantile in PERCENTILES.items():
+        # Linear interpolation between closest ranks, like np.percentile.
+        position = starts + (np.maximum(timed_counts, 1) - 1) * quantile
+        lower, upper = np.floor(position).astype(np.int64), np.ceil(position).astype(np.int64)
+        value = latency[lower] + (latency[upper] - latency[lower]) * (position - lower)
+        stats[field] = np.where(has_timed, value, np.nan)
+
+    summaries = {}
+    for index, start in enumerate(starts):
+        key = (int(employees[start]), datetime.fromordinal(int(period_ids[start])).date())
+        summaries[key] = {
+            field: (None if np.isnan(values[index]) else round(float(values[index]), 3))
+            if values.dtype.kind == 'f' else int(values[index])
+            for field, values in stats.items()
+        }
+    return summaries
+
+
+def _save(summaries, cells, now):
+    """Write ``summaries`` and delete the rows of ``cells`` that have no tasks left."""
+    if summaries:
+        EmployeePerformance.objects.bulk_create(
+            [
+                EmployeePerformance(employee_id=employee_id, period=period, refreshed_at=now, **values)
+                for (employee_id, period), values in summaries.items()
+            ],
+            update_conflicts=True,
+            unique_fields=['employee', 'period'],
+            update_fields=[*SUMMARY_FIELDS, 'refreshed_at'],
+        )
+    empty = Q()
+    for employee_id, period in set(cells) - set(summaries):
+        empty |= Q(employee_id=employee_id, period=period)
+    if empty:
+        EmployeePerformance.objects.filter(empty).delete()
+
+
+def refresh(cells, now=None):
+    """Recompute the summaries of ``(employee_id, period)`` cells."""
+    now = now or timezone.now()
+    cells = sorted(set(cells))
+    batch_size = analytics_setting('REFRESH_BATCH_SIZE')
+    for offset in range(0, len(cells), batch_size):
+        batch = cells[offset:offset + batch_size]
+        condition = Q()
+        for employee_id, period in batch:
+            start, end = period_bounds(period)
+            condition |= Q(assigned_to_id=employee_id, created_at__gte=start, created_at__lt=end)
+        summaries = summarize(list(_rows(Task.objects.filter(condition).order_by())), now)
+        with transaction.atomic():
+            _save(summaries, batch, now)
+
+
+def backfill(since=None, now=None, batch_size=None):
+    """
+    Recompute every summary, or those from the ``since`` month on; returns
+    how many were written. Tasks are streamed by assignee and month so each
+    batch holds whole cells.
+    """
+    now = now or timezone.now()
+    batch_size = batch_size or analytics_setting('BACKFILL_BATCH_SIZE')
+    tasks = Task.objects.filter(assigned_to__isnull=False)
+    stale = EmployeePerformance.objects.all()
+    if since is not None:
+        tasks = tasks.filter(created_at__gte=period_bounds(since)[0])
+        stale = stale.filter(period__gte=since)
+
+    written, kept = 0, set()
+    buffer, last_cell = [], None
+
+    def flush():
+        summaries = summarize(buffer, now)
+        with transaction.atomic():
+            _save(summaries, (), now)
+        kept.update(summaries)
+        buffer.clear()
+        return len(summaries)
+
+    for row in _rows(tasks.order_by('assigned_to_id', 'created_at')).iterator(chunk_size=2000):
+        cell = (row[0], row[1])
+        if len(buffer) >= batch_size and cell != last_cell:
+            written += flush()
+        buffer.append(row)
+        last_cell = cell
+    if buffer:
+        written += flush()
+
+    # Cells whose tasks were all deleted or reassigned.
+    removed = [
+        pk for pk, employee_id, period in stale.values_list('pk', 'employee_id', 'period')
+        if (employee_id, period) not in kept
+    ]
+    EmployeePerformance.objects.filter(pk__in=removed).delete()
+    return written
+
+
+def task_cells(tasks):
+    """
+    Cells to refresh after ``tasks`` were written, including the previous
+    assignee's; empty when ``REFRESH_ON_WRITE`` is off.
+    """
+    cells = set()
+    if not analytics_setting('REFRESH_ON_WRITE'):
+        return cells
+    for task in tasks:
+        if task.created_at is None:
+            continue
+        period = period_of(task.created_at)
+        for employee_id in (task.assigned_to_id, getattr(task, '_loaded_assigned_to_id', None)):
+            if employee_id:
+                cells.add((employee_id, period))
+    return cells
+
+
+def evaluation_cells(assigned_to_id, created_at):
+    """Cells to refresh after an evaluation of a task with these fields was written."""
+    if not analytics_setting('REFRESH_ON_WRITE') or not (assigned_to_id and created_at):
+        return set()
+    return {(assigned_to_id, period_of(created_at))}
@@ -1,8 +1,23 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 
 class TasksConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'tasks'
     verbose_name = 'المهام'
+    
+    def ready(self):
+        from . import signals  # noqa: F401
+        from .overdue import overdue_setting, scheduler
+        
+        post_migrate.connect(repair_search_index, sender=self)
+        
+        if overdue_setting('RUN_IN_PROCESS'):
+            scheduler.start()
 
+
+def repair_search_index(using, **kwargs):
+    from django.db import connections
+    from .search import repair_index
+    repair_index(connections[using])
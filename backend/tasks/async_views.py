@@ -0,0 +1,69 @@
+"""
+Async versions of the task read endpoints, see ``taskapp.async_api``.
+"""
+
+from django.db.models import F
+from django.utils import timezone
+
+from taskapp.async_api import async_api_view, json_response
+from taskapp.pagination import KeysetPagination
+from taskapp.response_cache import conditional_response
+from . import caching, statistics, views
+from .filters import filter_tasks
+from .models import Task
+from .search import search_tasks
+from .serializers import TaskValuesSerializer
+
+
+@async_api_view(views.task_list_create)
+@conditional_response(caching.request_scopes)
+async def task_list_create(request):
+    tasks = filter_tasks(Task.objects.all(), request.user, request.GET)
+
+    paginator = KeysetPagination()
+    serializer = TaskValuesSerializer.for_request(request)
+    query = request.GET.get('q', '').strip()
+    if query:
+        tasks = search_tasks(tasks, query)
+        page = [row async for row in serializer.values(tasks)[:paginator.get_page_size(request)]]
+        pagination = {'next': None, 'next_cursor': None}
+    else:
+        page = await paginator.apaginate_queryset(serializer.values(tasks), request)
+        pagination = paginator.get_paginated_data()
+    return json_response({
+        **pagination,
+        'results': await serializer.arender(page),
+        **serializer.sideloaded(),
+    })
+
+
+@async_api_view(views.task_detail)
+@conditional_response(caching.request_scopes)
+async def task_detail(request, pk):
+    # Same payload as TaskSerializer, which the DRF view renders.
+    serializer = TaskValuesSerializer({'now': timezone.now()})
+    row = await serializer.values(Task.objects.filter(pk=pk), detail_owner_id=F('assigned_to_id')).afirst()
+    if row is None:
+        return json_response({'error': 'المهمة غير موجودة'}, status=404)
+
+    # Permission check
+    if request.user.is_employee and row['detail_owner_id'] != request.user.pk:
+        return json_response({'error': 'ليس لديك صلاحية للوصول لهذه المهمة'}, status=403)
+
+    return json_response((await serializer.arender([row]))[0])
+
+
+@async_api_view(views.task_statistics)
+async def task_statistics(request):
+    scope = statistics.scope_for_user(request.user)
+    data = dict(await statistics.aget_statistics(scope))
+
+    # Optional breakdowns, e.g. ?breakdown=priority,assignee
+    breakdowns = request.GET.get('breakdown')
+    if breakdowns:
+        for breakdown in breakdowns.split(','):
+            if breakdown not in statistics.BREAKDOWNS:
+                return json_response({'error': f'تقسيم غير مدعوم: {breakdown}'}, status=400)
+            data[f'by_{breakdown}'] = await statistics.aget_statistics(scope, breakdown)
+
+    return json_response(data)
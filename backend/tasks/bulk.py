@@ -0,0 +1,152 @@
+"""
+Bulk create, update and delete for tasks.
+
+Each operation validates every item first, using one ``in_bulk`` query for
+all referenced users and tasks, then writes the valid items with
+``bulk_create``/``bulk_update`` in a single transaction, together with one
+``tasks.outbox`` event for the notifications and summary refreshes. Invalid
+items are reported individually by their index in the request payload.
+"""
+
+from django.conf import settings
+from django.utils import timezone
+
+from accounts.models import User
+from notifications.events import NotificationEvent
+from . import analytics, outbox, sync
+from .caching import invalidate_tasks
+from .overdue import reset_if_rescheduled, track_deadlines
+from .models import Task
+from .serializers import TaskCreateSerializer, TaskUpdateSerializer
+
+
+def max_items():
+    return getattr(settings, 'TASKS_BULK_MAX_ITEMS', 500)
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ids(values):
+    return {pk for pk in map(_to_int, values) if pk is not None}
+
+
+def _preload_users(items):
+    ids = _ids(item.get('assigned_to') for item in items if isinstance(item, dict))
+    return {User: User.objects.in_bulk(ids)} if ids else {User: {}}
+
+
+def _item_error(index, errors):
+    return {'index': index, 'errors': errors}
+
+
+def bulk_create_tasks(items, user):
+    context = {'preloaded': _preload_users(items)}
+    tasks, errors = [], []
+    for index, item in enumerate(items):
+        serializer = TaskCreateSerializer(data=item, context=context)
+        if serializer.is_valid():
+            tasks.append(Task(created_by=user, **serializer.validated_data))
+        else:
+            errors.append(_item_error(index, serializer.errors))
+
+    if tasks:
+        with outbox.event('tasks_created') as event:
+            Task.objects.bulk_create(tasks)
+            track_deadlines(tasks)
+            event.add_notifications(
+                NotificationEvent(
+                    user_id=task.assigned_to_id,
+                    title='مهمة جديدة',
+                    message=f'تم تعيين مهمة جديدة لك: {task.title}',
+                    task_id=task.pk,
+                )
+                for task in tasks if task.assigned_to_id
+            )
+            event.add_cells(analytics.task_cells(tasks))
+        invalidate_tasks(tasks)
+    return tasks, errors
+
+
+def bulk_update_tasks(items, user):
+    task_ids = _ids(item.get('id') for item in items if isinstance(item, dict))
+    existing = Task.objects.select_related('created_by', 'assigned_to').in_bulk(task_ids)
+    context = {'preloaded': _preload_users(items)}
+    now = timezone.now()
+
+    tasks, errors, fields, events = {}, [], {'updated_at'}, []
+    for index, item in enumerate(items):
+        if not isinstance(item, dict) or 'id' not in item:
+            errors.append(_item_error(index, {'id': ['هذا الحقل مطلوب']}))
+            continue
+        task = existing.get(_to_int(item['id']))
+        if task is None or task.pk in tasks:
+            errors.append(_item_error(index, {'id': ['المهمة غير موجودة أو مكررة']}))
+            continue
+        if user.is_employee:
+            if task.assigned_to_id != user.pk:
+                errors.append(_item_error(index, {'id': ['ليس لديك صلاحية للوصول لهذه المهمة']}))
+                continue
+            if set(item) - {'id', 'status'}:
+                errors.append(_item_error(index, {'status': ['يمكنك تحديث حالة المهمة فقط']}))
+                continue
+
+        data = {key: value for key, value in item.items() if key != 'id'}
+        serializer = TaskUpdateSerializer(task, data=data, partial=True, context=context)
+        if not serializer.is_valid():
+            errors.append(_item_error(index, serializer.errors))
+            continue
+
+        for field, value in serializer.validated_data.items():
+            setattr(task, field, value)
+            fields.add(field)
+        if serializer.validated_data.get('status') == 'completed' and task.completed_at is None:
+            task.completed_at = now
+            fields.add('completed_at')
+        if reset_if_rescheduled(task, now):
+            fields.add('overdue_at')
+        task.updated_at = now
+        tasks[task.pk] = task
+
+        if user.is_employee and 'status' in data:
+            events.append(NotificationEvent(
+                user_id=task.created_by_id,
+                title='تحديث المهمة',
+                message=f'تم تحديث حالة المهمة "{task.title}" من قبل {user.username}',
+                task_id=task.pk,
+            ))
+
+    tasks = list(tasks.values())
+    if tasks:
+        with outbox.event('tasks_updated') as event:
+            Task.objects.bulk_update(tasks, sorted(fields))
+            sync.record_unassigned(tasks)
+            track_deadlines(tasks, now)
+            event.add_notifications(events)
+            event.add_cells(analytics.task_cells(tasks))
+        invalidate_tasks(tasks)
+    return tasks, errors
+
+
+def bulk_delete_tasks(ids, user):
+    requested = list(ids)
+    existing = Task.objects.in_bulk(_ids(requested))
+    deletable, errors = [], []
+    for index, value in enumerate(requested):
+        task = existing.get(_to_int(value))
+        if task is None:
+            errors.append(_item_error(index, {'id': ['المهمة غير موجودة']}))
+        elif task.created_by_id != user.pk:
+            errors.append(_item_error(index, {'id': ['فقط منشئ المهمة يمكنه حذفها']}))
+        elif task.pk not in deletable:
+            deletable.append(task.pk)
+
+    if deletable:
+        # Deleting through the ORM fires the signal handlers for each task.
+        with outbox.event('tasks_deleted'):
+            Task.objects.filter(pk__in=deletable).delete()
+    return deletable, errors
@@ -0,0 +1,48 @@
+"""
+Cache invalidation for task writes, shared by the model signal handlers and
+the bulk endpoints (which bypass signals). Caches are invalidated once the
+surrounding transaction commits, so a concurrent read cannot cache the old
+rows under the new versions.
+"""
+
+from django.db import transaction
+
+from taskapp import response_cache
+from . import statistics
+
+ADMIN_SCOPE = 'tasks:admin'
+
+
+def user_scope(user_id):
+    return f'tasks:user:{user_id}'
+
+
+def request_scopes(request, *args, **kwargs):
+    """Version scopes of task, evaluation and detail payloads for this user."""
+    tasks_scope = ADMIN_SCOPE if request.user.is_admin else user_scope(request.user.pk)
+    return [tasks_scope, 'users']
+
+
+def _invalidate(statistics_scopes, user_ids):
+    def invalidate():
+        statistics.invalidate_scopes(statistics_scopes)
+        response_cache.bump([ADMIN_SCOPE] + [user_scope(user_id) for user_id in user_ids])
+    
+    # Runs right away outside a transaction.
+    transaction.on_commit(invalidate)
+
+
+def invalidate_tasks(tasks):
+    user_ids = set()
+    for task in tasks:
+        user_ids.update((task.created_by_id, task.assigned_to_id, getattr(task, '_loaded_assigned_to_id', None)))
+    user_ids.discard(None)
+    _invalidate(statistics.scopes_for_tasks(tasks), user_ids)
+    for task in tasks:
+        task._loaded_assigned_to_id = task.assigned_to_id
+
+
+def invalidate_evaluation(evaluation, assignee_id):
+    user_ids = {evaluation.evaluated_by_id, assignee_id}
+    user_ids.discard(None)
+    _invalidate((), user_ids)
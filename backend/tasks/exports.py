@@ -0,0 +1,49 @@
+from taskapp.exports import Export
+from .filters import filter_evaluations, filter_tasks
+from .models import Task, TaskEvaluation
+
+
+def _tasks_for(user, params):
+    tasks = Task.objects.all()
+    return tasks if user is None else filter_tasks(tasks, user, params)
+
+
+def _evaluations_for(user, params):
+    evaluations = TaskEvaluation.objects.all()
+    return evaluations if user is None else filter_evaluations(evaluations, user)
+
+
+TASKS = Export(
+    name='tasks',
+    columns=(
+        ('id', 'id'),
+        ('title', 'title'),
+        ('description', 'description'),
+        ('status', 'status'),
+        ('priority', 'priority'),
+        ('created_by_id', 'created_by_id'),
+        ('created_by', 'created_by__username'),
+        ('assigned_to_id', 'assigned_to_id'),
+        ('assigned_to', 'assigned_to__username'),
+        ('due_date', 'due_date'),
+        ('created_at', 'created_at'),
+        ('updated_at', 'updated_at'),
+        ('completed_at', 'completed_at'),
+    ),
+    queryset_for=_tasks_for,
+)
+
+EVALUATIONS = Export(
+    name='evaluations',
+    columns=(
+        ('id', 'id'),
+        ('task_id', 'task_id'),
+        ('task', 'task__title'),
+        ('rating', 'rating'),
+        ('feedback', 'feedback'),
+        ('evaluated_by_id', 'evaluated_by_id'),
+        ('evaluated_by', 'evaluated_by__username'),
+        ('evaluated_at', 'evaluated_at'),
+    ),
+    queryset_for=_evaluations_for,
+)
@@ -0,0 +1,34 @@
+"""
+Role-based filtering shared by the task list, evaluation list and export
+endpoints.
+"""
+
+
+def filter_tasks(tasks, user, params):
+    # Filtering based on user role
+    if user.is_employee:
+        tasks = tasks.filter(assigned_to=user)
+    elif user.is_admin:
+        # Admin can see all tasks or filter by created_by
+        created_by = params.get('created_by')
+        if created_by:
+            tasks = tasks.filter(created_by_id=created_by)
+    
+    # Additional filters
+    status_filter = params.get('status')
+    if status_filter:
+        tasks = tasks.filter(status=status_filter)
+    
+    priority_filter = params.get('priority')
+    if priority_filter:
+        tasks = tasks.filter(priority=priority_filter)
+    
+    return tasks
+
+
+def filter_evaluations(evaluations, user):
+    if user.is_employee:
+        evaluations = evaluations.filter(task__assigned_to=user)
+    elif user.is_admin:
+        evaluations = evaluations.filter(evaluated_by=user)
+    return evaluations
@@ -0,0 +1,314 @@
+"""
+Chunked task import from CSV, JSON or NDJSON files.
+
+Records are read lazily and validated a chunk at a time against lookup
+tables loaded once per import (employees by id and username, status and
+priority choices). Each chunk is written with ``bulk_create``, or with
+``COPY`` on PostgreSQL, in the same transaction that advances the
+``TaskImport`` checkpoint, so an interrupted import resumes after the last
+committed chunk without duplicating rows. Records that fail validation,
+including NDJSON lines that are not valid JSON, are reported per row in the
+chunk report and the rest of the chunk is still imported. Assigned employees get one summary
+notification each once the whole file has been imported.
+"""
+
+import csv
+import hashlib
+import io
+import json
+from datetime import datetime, time
+from itertools import islice
+
+from django.conf import settings
+from django.db import DatabaseError, connection
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from accounts.models import User
+from notifications.events import NotificationEvent
+from . import analytics, outbox
+from .caching import invalidate_tasks
+from .overdue import track_deadlines
+from .models import Task, TaskImport
+
+IMPORT_DEFAULTS = {
+    'CHUNK_SIZE': 1000,
+    'USE_COPY': True,
+}
+
+FORMATS = ('csv', 'json', 'ndjson')
+
+COPY_FIELDS = (
+    'title', 'description', 'created_by', 'assigned_to', 'status', 'priority',
+    'due_date', 'created_at', 'updated_at', 'completed_at',
+)
+
+
+class ImportFailed(Exception):
+    """The file could not be read or a chunk could not be written."""
+
+
+class InvalidRecord:
+    """An NDJSON line that is not valid JSON, reported as a row error."""
+
+    def __init__(self, error):
+        self.error = error
+
+
+def import_setting(name):
+    return getattr(settings, 'TASKS_IMPORT', {}).get(name, IMPORT_DEFAULTS[name])
+
+
+def detect_format(filename):
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    return {'jsonl': 'ndjson'}.get(extension, extension)
+
+
+def file_checksum(fileobj):
+    digest = hashlib.sha256()
+    for block in iter(lambda: fileobj.read(1 << 16), b''):
+        digest.update(block)
+    fileobj.seek(0)
+    return digest.hexdigest()
+
+
+def read_records(fileobj, fmt):
+    """Yield one dict per record from a binary file object."""
+    if fmt == 'json':
+        # A JSON array has to be parsed whole; NDJSON is read line by line.
+        records = json.load(io.TextIOWrapper(fileobj, encoding='utf-8-sig'))
+        if not isinstance(records, list):
+            raise ValueError('ملف JSON يجب أن يحتوي على قائمة من المهام')
+        yield from records
+        return
+
+    text = io.TextIOWrapper(fileobj, encoding='utf-8-sig', newline='')
+    if fmt == 'csv':
+        yield from csv.DictReader(text)
+    else:
+        for line in text:
+            if line.strip():
+                try:
+                    yield json.loads(line)
+                except ValueError as exc:
+                    yield InvalidRecord(str(exc))
+
+
+class LookupTables:
+    """Everything a record is validated against, loaded once per import."""
+
+    def __init__(self):
+        self.assignees = {}
+        for pk, username in User.objects.filter(role='employee').values_list('id', 'username'):
+            self.assignees[str(pk)] = pk
+            self.assignees[username] = pk
+        # Accept both stored values and their Arabic labels.
+        self.statuses = self._choices(Task.STATUS_CHOICES)
+        self.priorities = self._choices(Task.PRIORITY_CHOICES)
+
+    @staticmethod
+    def _choices(choices):
+        return {**{label: value for value, label in choices}, **{value: value for value, _ in choices}}
+
+
+def _text(record, name):
+    value = record.get(name)
+    return value.strip() if isinstance(value, str) else value
+
+
+def _parse_due_date(value):
+    if isinstance(value, str):
+        parsed = parse_datetime(value.strip())
+        if parsed is None:
+            day = parse_date(value.strip())
+            parsed = datetime.combine(day, time.min) if day else None
+    else:
+        parsed = None
+    if parsed is not None and timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def validate_record(record, lookups, user, now):
+    """Return ``(task, errors)``; ``task`` is an unsaved ``Task`` or ``None``."""
+    if isinstance(record, InvalidRecord):
+        return None, {'non_field_errors': [f'سطر JSON غير صالح: {record.error}']}
+    if not isinstance(record, dict):
+        return None, {'non_field_errors': ['السجل يجب أن يكون كائناً']}
+
+    errors = {}
+    title = _text(record, 'title')
+    if not title:
+        errors['title'] = ['هذا الحقل مطلوب']
+    elif len(title) > 200:
+        errors['title'] = ['العنوان أطول من 200 حرف']
+
+    description = _text(record, 'description')
+    if not description:
+        errors['description'] = ['هذا الحقل مطلوب']
+
+    assigned_to_id = None
+    assignee = _text(record, 'assigned_to')
+    if assignee not in (None, ''):
+        assigned_to_id = lookups.assignees.get(str(assignee))
+        if assigned_to_id is None:
+            errors['assigned_to'] = ['يمكن تعيين المهمة للموظفين فقط']
+
+    status = lookups.statuses.get(_text(record, 'status') or 'pending')
+    if status is None:
+        errors['status'] = ['قيمة الحالة غير صالحة']
+
+    priority = lookups.priorities.get(_text(record, 'priority') or 'medium')
+    if priority is None:
+        errors['priority'] = ['قيمة الأولوية غير صالحة']
+
+    due_date = _parse_due_date(record.get('due_date'))
+    if due_date is None:
+        errors['due_date'] = ['تاريخ الانتهاء مطلوب بصيغة ISO 8601']
+
+    if errors:
+        return None, errors
+    return Task(
+        title=title,
+        description=description,
+        created_by=user,
+        assigned_to_id=assigned_to_id,
+        status=status,
+        priority=priority,
+        due_date=due_date,
+        created_at=now,
+        updated_at=now,
+        completed_at=now if status == 'completed' else None,
+    ), {}
+
+
+def _copy_tasks(tasks):
+    """Load ``tasks`` with PostgreSQL ``COPY ... FROM STDIN``."""
+    fields = [Task._meta.get_field(name) for name in COPY_FIELDS]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for task in tasks:
+        row = []
+        for field in fields:
+            value = getattr(task, field.attname)
+            row.append(value.isoformat() if isinstance(value, datetime) else value)
+        writer.writerow(row)
+    buffer.seek(0)
+
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(field.column) for field in fields)
+    with connection.cursor() as cursor:
+        # Unquoted empty CSV values load as NULL.
+        cursor.copy_expert(
+            f'COPY {quote(Task._meta.db_table)} ({columns}) FROM STDIN WITH (FORMAT csv)', buffer
+        )
+
+
+def load_tasks(tasks):
+    if import_setting('USE_COPY') and connection.vendor == 'postgresql':
+        _copy_tasks(tasks)
+    else:
+        Task.objects.bulk_create(tasks)
+
+
+def _chunks(records, size):
+    records = iter(records)
+    while True:
+        chunk = list(islice(records, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def run_import(job, fileobj, chunk_size=None):
+    """Import ``fileobj`` into ``job``, resuming after ``job.next_row``."""
+    size = chunk_size or import_setting('CHUNK_SIZE')
+    lookups = LookupTables()
+    user = job.created_by
+    records = islice(read_records(fileobj, job.format), job.next_row, None)
+    if job.status != 'running':
+        job.status = 'running'
+        job.save(update_fields=['status', 'updated_at'])
+
+    try:
+        for chunk in _chunks(records, size):
+            now = timezone.now()
+            start = job.next_row
+            tasks, errors = [], []
+            for offset, record in enumerate(chunk):
+                task, record_errors = validate_record(record, lookups, user, now)
+                if task is None:
+                    # Rows are reported 1-based, in file order.
+                    errors.append({'row': start + offset + 1, 'errors': record_errors})
+                else:
+                    tasks.append(task)
+
+            # Keyed by chunk: a chunk that is retried after a rollback records
+            # its event again, one that committed is never re-run.
+            with outbox.event('tasks_imported', key=f'import:{job.pk}:{start}') as event:
+                if tasks:
+                    load_tasks(tasks)
+                    track_deadlines(tasks, now)
+                    event.add_cells(analytics.task_cells(tasks))
+                for task in tasks:
+                    if task.assigned_to_id:
+                        key = str(task.assigned_to_id)
+                        job.assigned_counts[key] = job.assigned_counts.get(key, 0) + 1
+                job.next_row = start + len(chunk)
+                job.created_count += len(tasks)
+                job.error_count += len(errors)
+                job.chunk_reports.append({
+                    'chunk': len(job.chunk_reports) + 1,
+                    'first_row': start + 1,
+                    'last_row': job.next_row,
+                    'created': len(tasks),
+                    'errors': errors,
+                })
+                job.save()
+            if tasks:
+                invalidate_tasks(tasks)
+    except (DatabaseError, ValueError, csv.Error) as exc:
+        # The failed chunk already advanced the counters and reports on this
+        # instance; report what the checkpoints actually committed.
+        job.refresh_from_db()
+        job.status = 'failed'
+        job.save(update_fields=['status', 'updated_at'])
+        raise ImportFailed(str(exc)) from exc
+
+    with outbox.event('import_completed', key=f'import:{job.pk}') as event:
+        job.status = 'completed'
+        job.completed_at = timezone.now()
+        job.save(update_fields=['status', 'completed_at', 'updated_at'])
+        notify_assignees(job, event)
+    return job
+
+
+def notify_assignees(job, event):
+    # One summary per employee; the event key makes a re-run idempotent.
+    event.add_notifications(
+        NotificationEvent(
+            user_id=int(user_id),
+            title='مهام جديدة',
+            message=f'تم تعيين {count} مهمة جديدة لك',
+            event_key=f'import:{job.pk}:{user_id}',
+        )
+        for user_id, count in job.assigned_counts.items()
+    )
+
+
+def start_import(fileobj, filename, user, fmt=None, restart=False):
+    """
+    Return the ``TaskImport`` to run for ``fileobj``. Unless ``restart`` is
+    set, the latest import of the same file by ``user`` is returned instead
+    of a new one, so unfinished imports resume and completed ones can be
+    reported rather than duplicated.
+    """
+    fmt = fmt or detect_format(filename)
+    if fmt not in FORMATS:
+        raise ValueError('صيغة الملف غير مدعومة')
+    checksum = file_checksum(fileobj)
+    if not restart:
+        job = TaskImport.objects.filter(created_by=user, checksum=checksum, format=fmt).first()
+        if job is not None:
+            return job
+    return TaskImport.objects.create(created_by=user, source=filename[:255], checksum=checksum, format=fmt)
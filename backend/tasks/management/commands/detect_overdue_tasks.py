@@ -0,0 +1,24 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.overdue import overdue_setting, run_until_caught_up
+
+
+class Command(BaseCommand):
+    help = 'Flag tasks whose deadline passed since the last scan and notify their assignee and creator'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep scanning every --interval seconds')
+        parser.add_argument('--interval', type=int, help='Seconds between scans (default TASKS_OVERDUE INTERVAL)')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or overdue_setting('INTERVAL')
+        while True:
+            flagged = run_until_caught_up()
+            self.stdout.write(f'{flagged} tasks became overdue')
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(interval)
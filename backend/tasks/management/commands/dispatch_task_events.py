@@ -0,0 +1,25 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from tasks.outbox import dispatch_pending, outbox_setting, purge_processed
+
+
+class Command(BaseCommand):
+    help = 'Hand pending task outbox events to their consumers (notifications, performance summaries)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help='Keep dispatching every --interval seconds')
+        parser.add_argument('--interval', type=int, help='Seconds between runs (default TASKS_OUTBOX INTERVAL)')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or outbox_setting('INTERVAL')
+        while True:
+            dispatched = dispatch_pending()
+            purged = purge_processed()
+            self.stdout.write(f'{dispatched} events dispatched, {purged} processed events purged')
+            if not options['loop']:
+                break
+            close_old_connections()
+            time.sleep(interval)
@@ -0,0 +1,45 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from notifications.exports import NOTIFICATIONS
+from taskapp.exports import FORMATS, encode
+from tasks.exports import EVALUATIONS, TASKS
+
+EXPORTS = {export.name: export for export in (TASKS, EVALUATIONS, NOTIFICATIONS)}
+
+
+class Command(BaseCommand):
+    help = 'Stream tasks, evaluations or notifications to a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('dataset', choices=sorted(EXPORTS))
+        parser.add_argument('--format', choices=sorted(FORMATS), default='csv')
+        parser.add_argument('--output', help='File to write (default: stdout)')
+        parser.add_argument('--user', help='Apply the role-based filters of this username, as the API does')
+        parser.add_argument('--status', help='Only tasks with this status')
+        parser.add_argument('--priority', help='Only tasks with this priority')
+
+    def handle(self, *args, **options):
+        user = None
+        if options['user']:
+            try:
+                user = User.objects.get(username=options['user'])
+            except User.DoesNotExist:
+                raise CommandError(f'Unknown user {options["user"]}')
+        params = {key: options[key] for key in ('status', 'priority') if options[key]}
+        if params and user is None:
+            # Filters go through the same code path as the API for any role.
+            raise CommandError('--status/--priority require --user')
+
+        export = EXPORTS[options['dataset']]
+        out = open(options['output'], 'w', encoding='utf-8', newline='') if options['output'] else sys.stdout
+        try:
+            for chunk in encode(export, export.rows(user, params), options['format']):
+                out.write(chunk)
+        finally:
+            if out is not sys.stdout:
+                out.close()
+        if options['output']:
+            self.stderr.write(self.style.SUCCESS(f'Exported {export.name} to {options["output"]}'))
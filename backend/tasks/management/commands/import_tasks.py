@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from accounts.models import User
+from tasks import imports
+
+
+class Command(BaseCommand):
+    help = 'Import tasks from a CSV, JSON or NDJSON file in resumable chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--created-by', required=True, help='Username of the admin the tasks are created by')
+        parser.add_argument('--format', choices=imports.FORMATS, help='Defaults to the file extension')
+        parser.add_argument('--chunk-size', type=int, help='Records validated and written per transaction')
+        parser.add_argument('--restart', action='store_true', help='Ignore earlier imports of this file and start over')
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(username=options['created_by'], role='admin')
+        except User.DoesNotExist:
+            raise CommandError(f'No admin named {options["created_by"]}')
+
+        with open(options['path'], 'rb') as fileobj:
+            try:
+                job = imports.start_import(fileobj, options['path'], user, options['format'], options['restart'])
+            except ValueError as exc:
+                raise CommandError(str(exc))
+            if job.status == 'completed':
+                raise CommandError(f'File already imported as import #{job.pk}; use --restart to import it again')
+            if job.next_row:
+                self.stdout.write(f'Resuming import #{job.pk} after record {job.next_row}')
+
+            reported = len(job.chunk_reports)
+            try:
+                imports.run_import(job, fileobj, options['chunk_size'])
+            except imports.ImportFailed as exc:
+                raise CommandError(f'Import #{job.pk} stopped after record {job.next_row}: {exc}')
+            finally:
+                for report in job.chunk_reports[reported:]:
+                    self.stdout.write(
+                        f'chunk {report["chunk"]}: rows {report["first_row"]}-{report["last_row"]} '
+                        f'created={report["created"]} errors={len(report["errors"])}'
+                    )
+                    for error in report['errors']:
+                        self.stdout.write(f'  row {error["row"]}: {error["errors"]}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Import #{job.pk}: {job.created_count} tasks created, {job.error_count} records rejected'
+        ))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from notifications.models import NotificationTombstone
+from taskapp.sync import purge_tombstones
+from tasks.models import TaskTombstone
+
+
+class Command(BaseCommand):
+    help = 'Delete delta sync tombstones older than DELTA_SYNC TOMBSTONE_DAYS in bounded batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, help='Tombstones deleted per transaction')
+
+    def handle(self, *args, **options):
+        for model in (TaskTombstone, NotificationTombstone):
+            total = purge_tombstones(model, batch_size=options['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'{model._meta.label}: {total} tombstones purged'))
@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from tasks import analytics
+
+
+class Command(BaseCommand):
+    help = 'Recompute the per-employee performance summaries from tasks and evaluations (backfill)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--since', help='Only recompute months from this one on (YYYY-MM)')
+        parser.add_argument('--batch-size', type=int, help='Tasks summarized per NumPy batch')
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = analytics.parse_period(options['since'])
+            except ValueError:
+                raise CommandError('--since must be YYYY-MM')
+        total = analytics.backfill(since=since, batch_size=options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{total} performance summaries refreshed'))
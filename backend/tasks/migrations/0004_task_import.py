@@ -0,0 +1,40 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:15
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0003_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskImport',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.CharField(max_length=255, verbose_name='الملف')),
+                ('checksum', models.CharField(db_index=True, max_length=64, verbose_name='بصمة الملف')),
+                ('format', models.CharField(max_length=10, verbose_name='الصيغة')),
+                ('status', models.CharField(choices=[('running', 'قيد التنفيذ'), ('completed', 'مكتمل'), ('failed', 'فشل')], default='running', max_length=20, verbose_name='الحالة')),
+                ('next_row', models.PositiveIntegerField(default=0, verbose_name='السجل التالي')),
+                ('created_count', models.PositiveIntegerField(default=0, verbose_name='المهام المنشأة')),
+                ('error_count', models.PositiveIntegerField(default=0, verbose_name='السجلات المرفوضة')),
+                ('chunk_reports', models.JSONField(default=list, verbose_name='تقرير الدفعات')),
+                ('assigned_counts', models.JSONField(default=dict, verbose_name='عدد المهام لكل موظف')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ البدء')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+                ('completed_at', models.DateTimeField(blank=True, null=True, verbose_name='تاريخ الانتهاء')),
+                ('created_by', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_imports', to=settings.AUTH_USER_MODEL, verbose_name='بواسطة')),
+            ],
+            options={
+                'verbose_name': 'استيراد مهام',
+                'verbose_name_plural': 'عمليات استيراد المهام',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,45 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:17
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils import timezone
+
+
+def flag_existing_overdue(apps, schema_editor):
+    # Tasks already overdue are not announced retroactively.
+    Task = apps.get_model('tasks', 'Task')
+    Task.objects.filter(
+        status__in=['pending', 'in_progress'], due_date__lte=timezone.now()
+    ).update(overdue_at=F('due_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0004_task_import'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScanWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False, verbose_name='الاسم')),
+                ('value', models.DateTimeField(verbose_name='القيمة')),
+                ('updated_at', models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')),
+            ],
+            options={
+                'verbose_name': 'علامة المسح',
+                'verbose_name_plural': 'علامات المسح',
+            },
+        ),
+        migrations.AddField(
+            model_name='task',
+            name='overdue_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='تاريخ رصد التأخير'),
+        ),
+        migrations.RunPython(flag_existing_overdue, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('overdue_at__isnull', True), ('status__in', ['pending', 'in_progress'])), fields=['due_date'], name='task_overdue_scan_idx'),
+        ),
+    ]
@@ -0,0 +1,78 @@
+from django.db import migrations
+
+# The DDL is spelled out here rather than imported from tasks.search, so
+# later changes to that module cannot change what this migration does.
+
+# %(arabic)s is 'arabic', or 'simple' when the server has no Arabic
+# configuration. The expression must stay identical to the document
+# tasks.search queries for the index to be used.
+PG_CREATE_INDEX = """
+CREATE INDEX IF NOT EXISTS task_search_idx ON tasks_task USING gin ((
+    setweight(to_tsvector('english'::regconfig, coalesce("title", '')), 'A')
+    || setweight(to_tsvector('english'::regconfig, coalesce("description", '')), 'B')
+    || setweight(to_tsvector('%(arabic)s'::regconfig, coalesce("title", '')), 'A')
+    || setweight(to_tsvector('%(arabic)s'::regconfig, coalesce("description", '')), 'B')
+))
+"""
+
+PG_DROP_INDEX = 'DROP INDEX IF EXISTS task_search_idx'
+
+SQLITE_CREATE_INDEX = [
+    """CREATE VIRTUAL TABLE IF NOT EXISTS tasks_task_fts USING fts5(
+        title, description, content='tasks_task', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_ai AFTER INSERT ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_ad AFTER DELETE ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    """CREATE TRIGGER IF NOT EXISTS tasks_task_fts_au AFTER UPDATE OF title, description ON tasks_task BEGIN
+        INSERT INTO tasks_task_fts(tasks_task_fts, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO tasks_task_fts(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    "INSERT INTO tasks_task_fts(tasks_task_fts) VALUES ('rebuild')",
+]
+
+SQLITE_DROP_INDEX = [
+    'DROP TRIGGER IF EXISTS tasks_task_fts_ai',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_ad',
+    'DROP TRIGGER IF EXISTS tasks_task_fts_au',
+    'DROP TABLE IF EXISTS tasks_task_fts',
+]
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        with schema_editor.connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_ts_config WHERE cfgname = 'arabic'")
+            arabic = 'arabic' if cursor.fetchone() else 'simple'
+        schema_editor.execute(PG_CREATE_INDEX % {'arabic': arabic})
+    elif vendor == 'sqlite':
+        for statement in SQLITE_CREATE_INDEX:
+            schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute(PG_DROP_INDEX)
+    elif vendor == 'sqlite':
+        for statement in SQLITE_DROP_INDEX:
+            schema_editor.execute(statement)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0005_overdue_detector'),
+    ]
+
+    operations = [
+        # Backend-specific: a GIN tsvector index on PostgreSQL, an FTS5 table
+        # with sync triggers on SQLite; nothing elsewhere.
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
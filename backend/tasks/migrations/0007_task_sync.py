@@ -0,0 +1,44 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:41
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0006_task_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('task_id', models.BigIntegerField(verbose_name='معرف المهمة')),
+                ('assigned_to_id', models.BigIntegerField(blank=True, null=True, verbose_name='معرف المكلف')),
+                ('deleted', models.BooleanField(default=True, verbose_name='محذوفة')),
+                ('removed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='تاريخ الإزالة')),
+            ],
+            options={
+                'verbose_name': 'مهمة محذوفة',
+                'verbose_name_plural': 'المهام المحذوفة',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['updated_at'], name='task_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['assigned_to', 'updated_at'], name='task_assignee_updated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['removed_at'], name='task_tombstone_removed_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['assigned_to_id', 'removed_at'], name='task_tombstone_assignee_idx'),
+        ),
+    ]
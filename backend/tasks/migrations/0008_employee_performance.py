@@ -0,0 +1,46 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:47
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('tasks', '0007_task_sync'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EmployeePerformance',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('period', models.DateField(verbose_name='الفترة')),
+                ('total_tasks', models.PositiveIntegerField(default=0, verbose_name='عدد المهام')),
+                ('completed_tasks', models.PositiveIntegerField(default=0, verbose_name='المهام المكتملة')),
+                ('on_time_tasks', models.PositiveIntegerField(default=0, verbose_name='المكتملة في الموعد')),
+                ('late_tasks', models.PositiveIntegerField(default=0, verbose_name='المكتملة بعد الموعد')),
+                ('overdue_tasks', models.PositiveIntegerField(default=0, verbose_name='المهام المتأخرة')),
+                ('rated_tasks', models.PositiveIntegerField(default=0, verbose_name='المهام المقيمة')),
+                ('average_rating', models.FloatField(blank=True, null=True, verbose_name='متوسط التقييم')),
+                ('completion_mean', models.FloatField(blank=True, null=True, verbose_name='متوسط مدة الإنجاز')),
+                ('completion_p50', models.FloatField(blank=True, null=True, verbose_name='وسيط مدة الإنجاز')),
+                ('completion_p90', models.FloatField(blank=True, null=True, verbose_name='مدة الإنجاز (المئين 90)')),
+                ('refreshed_at', models.DateTimeField(default=django.utils.timezone.now, verbose_name='تاريخ التحديث')),
+                ('employee', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='performance', to=settings.AUTH_USER_MODEL, verbose_name='الموظف')),
+            ],
+            options={
+                'verbose_name': 'أداء موظف',
+                'verbose_name_plural': 'أداء الموظفين',
+                'ordering': ['-period', 'employee'],
+                'indexes': [models.Index(fields=['period'], name='performance_period_idx')],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='employeeperformance',
+            constraint=models.UniqueConstraint(fields=('employee', 'period'), name='performance_employee_period_uniq'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 4.2.7 on 2026-10-18 19:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('tasks', '0008_employee_performance'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OutboxEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=40, unique=True, verbose_name='المفتاح')),
+                ('kind', models.CharField(max_length=30, verbose_name='النوع')),
+                ('task_id', models.BigIntegerField(blank=True, null=True, verbose_name='معرف المهمة')),
+                ('payload', models.JSONField(default=dict, verbose_name='البيانات')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')),
+                ('processed_at', models.DateTimeField(blank=True, null=True, verbose_name='تاريخ المعالجة')),
+                ('attempts', models.PositiveSmallIntegerField(default=0, verbose_name='المحاولات')),
+            ],
+            options={
+                'verbose_name': 'حدث صادر',
+                'verbose_name_plural': 'الأحداث الصادرة',
+                'indexes': [models.Index(condition=models.Q(('processed_at__isnull', True)), fields=['id'], name='outbox_pending_idx'), models.Index(fields=['processed_at'], name='outbox_processed_idx')],
+            },
+        ),
+    ]
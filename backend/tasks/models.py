@@ -30,15 +30,50 @@ class Task(models.Model):
     created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')
     updated_at = models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')
     completed_at = models.DateTimeField(null=True, blank=True, verbose_name='تاريخ الإتمام')
+    # Set by the overdue detector once it has notified about this deadline
+    overdue_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name='تاريخ رصد التأخير')
     
     class Meta:
         verbose_name = 'مهمة'
         verbose_name_plural = 'المهام'
         ordering = ['-created_at']
+        indexes = [
+            # Keyset pagination seeks on (created_at, id), see taskapp.pagination
+            models.Index(fields=['-created_at', '-id'], name='task_created_idx'),
+            models.Index(fields=['assigned_to', '-created_at', '-id'], name='task_assignee_created_idx'),
+            # Filters used by the task list and statistics views
+            models.Index(fields=['assigned_to', 'status', '-created_at'], name='task_assignee_status_idx'),
+            models.Index(fields=['created_by', '-created_at'], name='task_creator_created_idx'),
+            models.Index(fields=['status', '-created_at'], name='task_status_created_idx'),
+            models.Index(fields=['priority', '-created_at'], name='task_priority_created_idx'),
+            # Delta sync reads what changed after a watermark, see tasks.sync
+            models.Index(fields=['updated_at'], name='task_updated_idx'),
+            models.Index(fields=['assigned_to', 'updated_at'], name='task_assignee_updated_idx'),
+            # Overdue scans only ever look at open tasks
+            models.Index(
+                fields=['due_date'],
+                name='task_open_due_idx',
+                condition=models.Q(status__in=['pending', 'in_progress']),
+            ),
+            # Open tasks the overdue detector has not flagged yet, see tasks.overdue
+            models.Index(
+                fields=['due_date'],
+                name='task_overdue_scan_idx',
+                condition=models.Q(status__in=['pending', 'in_progress'], overdue_at__isnull=True),
+            ),
+        ]
     
     def __str__(self):
         return self.title
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored assignee so a reassignment can also refresh the
+        # previous assignee's cached statistics.
+        instance._loaded_assigned_to_id = instance.__dict__.get('assigned_to_id')
+        return instance
+    
     @property
     def is_overdue(self):
         return timezone.now() > self.due_date and self.status not in ['completed', 'cancelled']
@@ -51,6 +86,25 @@ class Task(models.Model):
         return None
 
 
+class TaskSearchEntry(models.Model):
+    """
+    Row of the SQLite FTS5 index over task titles and descriptions, see
+    tasks.search. The virtual table and its sync triggers are created by
+    migration 0006; ``document`` is the hidden column FTS5 names after the
+    table, which MATCH and bm25() take.
+    """
+    task = models.OneToOneField(
+        Task, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid', related_name='search_entry'
+    )
+    title = models.TextField()
+    description = models.TextField()
+    document = models.TextField(db_column='tasks_task_fts')
+    
+    class Meta:
+        managed = False
+        db_table = 'tasks_task_fts'
+
+
 class TaskEvaluation(models.Model):
     RATING_CHOICES = [
         (1, 'ضعيف جداً'),
@@ -73,3 +127,152 @@ class TaskEvaluation(models.Model):
     def __str__(self):
         return f'تقييم {self.task.title} - {self.rating}'
 
+
+class TaskTombstone(models.Model):
+    """A task that left a task list, reported to delta sync clients by tasks.sync."""
+    # Plain ids: tombstones outlive the task and possibly the user.
+    task_id = models.BigIntegerField(verbose_name='معرف المهمة')
+    # The employee whose list lost the task; null when it was unassigned.
+    assigned_to_id = models.BigIntegerField(null=True, blank=True, verbose_name='معرف المكلف')
+    # False when the task was only reassigned away from assigned_to.
+    deleted = models.BooleanField(default=True, verbose_name='محذوفة')
+    removed_at = models.DateTimeField(default=timezone.now, verbose_name='تاريخ الإزالة')
+    
+    class Meta:
+        verbose_name = 'مهمة محذوفة'
+        verbose_name_plural = 'المهام المحذوفة'
+        indexes = [
+            models.Index(fields=['removed_at'], name='task_tombstone_removed_idx'),
+            models.Index(fields=['assigned_to_id', 'removed_at'], name='task_tombstone_assignee_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.task_id} ({self.removed_at})'
+
+
+class EmployeePerformance(models.Model):
+    """
+    Per-employee summary of the tasks assigned to them in one month (by
+    ``created_at``), maintained by tasks.analytics.
+    """
+    employee = models.ForeignKey(User, on_delete=models.CASCADE, related_name='performance', verbose_name='الموظف')
+    # First day of the month, in TIME_ZONE
+    period = models.DateField(verbose_name='الفترة')
+    total_tasks = models.PositiveIntegerField(default=0, verbose_name='عدد المهام')
+    completed_tasks = models.PositiveIntegerField(default=0, verbose_name='المهام المكتملة')
+    # Completed by / after the deadline; tasks completed without a
+    # completed_at are in neither.
+    on_time_tasks = models.PositiveIntegerField(default=0, verbose_name='المكتملة في الموعد')
+    late_tasks = models.PositiveIntegerField(default=0, verbose_name='المكتملة بعد الموعد')
+    # Completed late, or still open past the deadline
+    overdue_tasks = models.PositiveIntegerField(default=0, verbose_name='المهام المتأخرة')
+    rated_tasks = models.PositiveIntegerField(default=0, verbose_name='المهام المقيمة')
+    average_rating = models.FloatField(null=True, blank=True, verbose_name='متوسط التقييم')
+    # Seconds from created_at to completed_at, over on_time + late tasks
+    completion_mean = models.FloatField(null=True, blank=True, verbose_name='متوسط مدة الإنجاز')
+    completion_p50 = models.FloatField(null=True, blank=True, verbose_name='وسيط مدة الإنجاز')
+    completion_p90 = models.FloatField(null=True, blank=True, verbose_name='مدة الإنجاز (المئين 90)')
+    refreshed_at = models.DateTimeField(default=timezone.now, verbose_name='تاريخ التحديث')
+    
+    class Meta:
+        verbose_name = 'أداء موظف'
+        verbose_name_plural = 'أداء الموظفين'
+        ordering = ['-period', 'employee']
+        constraints = [
+            models.UniqueConstraint(fields=['employee', 'period'], name='performance_employee_period_uniq'),
+        ]
+        indexes = [
+            models.Index(fields=['period'], name='performance_period_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.employee} ({self.period:%Y-%m})'
+    
+    @property
+    def on_time_rate(self):
+        timed = self.on_time_tasks + self.late_tasks
+        if not timed:
+            return None
+        return round(self.on_time_tasks / timed, 4)
+
+
+class OutboxEvent(models.Model):
+    """
+    Work to do after a task or evaluation change, written in the same
+    transaction and handed to the consumers of tasks.outbox.
+    """
+    # Idempotency key; notifications derive their event keys from it.
+    key = models.CharField(max_length=40, unique=True, verbose_name='المفتاح')
+    kind = models.CharField(max_length=30, verbose_name='النوع')
+    task_id = models.BigIntegerField(null=True, blank=True, verbose_name='معرف المهمة')
+    payload = models.JSONField(default=dict, verbose_name='البيانات')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاريخ الإنشاء')
+    processed_at = models.DateTimeField(null=True, blank=True, verbose_name='تاريخ المعالجة')
+    # When a dispatcher may next pick the event up: pushed forward while one
+    # holds it and after a failure; null once it has been given up on.
+    available_at = models.DateTimeField(null=True, blank=True, default=timezone.now, verbose_name='موعد المعالجة')
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name='المحاولات')
+    last_error = models.TextField(blank=True, verbose_name='آخر خطأ')
+    
+    class Meta:
+        verbose_name = 'حدث صادر'
+        verbose_name_plural = 'الأحداث الصادرة'
+        indexes = [
+            # The dispatcher reads pending events that are due, oldest first
+            models.Index(
+                fields=['available_at', 'id'],
+                name='outbox_pending_idx',
+                condition=models.Q(processed_at__isnull=True),
+            ),
+            # Purging processed events
+            models.Index(fields=['processed_at'], name='outbox_processed_idx'),
+        ]
+    
+    def __str__(self):
+        return f'{self.kind} ({self.key})'
+
+
+class ScanWatermark(models.Model):
+    """Position a periodic scanner has processed up to, see tasks.overdue."""
+    name = models.CharField(max_length=50, primary_key=True, verbose_name='الاسم')
+    value = models.DateTimeField(verbose_name='القيمة')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')
+    
+    class Meta:
+        verbose_name = 'علامة المسح'
+        verbose_name_plural = 'علامات المسح'
+    
+    def __str__(self):
+        return f'{self.name}: {self.value}'
+
+
+class TaskImport(models.Model):
+    """Checkpoint and report of a chunked task import, see tasks.imports."""
+    STATUS_CHOICES = [
+        ('running', 'قيد التنفيذ'),
+        ('completed', 'مكتمل'),
+        ('failed', 'فشل'),
+    ]
+    
+    created_by = models.ForeignKey(User, on_delete=models.CASCADE, related_name='task_imports', verbose_name='بواسطة')
+    source = models.CharField(max_length=255, verbose_name='الملف')
+    checksum = models.CharField(max_length=64, db_index=True, verbose_name='بصمة الملف')
+    format = models.CharField(max_length=10, verbose_name='الصيغة')
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='running', verbose_name='الحالة')
+    # Records before this index are committed; a resumed import skips them.
+    next_row = models.PositiveIntegerField(default=0, verbose_name='السجل التالي')
+    created_count = models.PositiveIntegerField(default=0, verbose_name='المهام المنشأة')
+    error_count = models.PositiveIntegerField(default=0, verbose_name='السجلات المرفوضة')
+    chunk_reports = models.JSONField(default=list, verbose_name='تقرير الدفعات')
+    assigned_counts = models.JSONField(default=dict, verbose_name='عدد المهام لكل موظف')
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name='تاريخ البدء')
+    updated_at = models.DateTimeField(auto_now=True, verbose_name='تاريخ التحديث')
+    completed_at = models.DateTimeField(null=True, blank=True, verbose_name='تاريخ الانتهاء')
+    
+    class Meta:
+        verbose_name = 'استيراد مهام'
+        verbose_name_plural = 'عمليات استيراد المهام'
+        ordering = ['-created_at']
+    
+    def __str__(self):
+        return f'{self.source} ({self.get_status_display()})'
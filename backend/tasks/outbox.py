@@ -0,0 +1,362 @@
+"""
+Transactional outbox for task and evaluation changes.
+
+A write wraps itself in ``event(kind)``, which opens a transaction and, at
+its end, inserts one ``OutboxEvent`` row describing the follow-up work: the
+notifications to send and the performance summary cells (see
+``tasks.analytics``) to refresh. The model signal handlers add to the event
+of the write they fire in; a change made outside any ``event`` block (the
+admin site, a shell) gets a row of its own. Because the row commits or rolls
+back with the change, follow-up work is neither lost when a process dies
+after committing nor done for a change that was rolled back.
+
+After commit the dispatcher reads pending rows in batches and hands them to
+each consumer in ``CONSUMERS``. Delivery is at least once, so consumers are
+idempotent: notifications carry event keys derived from the row's unique
+``key`` (the ``(user, event_key)`` constraint drops repeats) and summary
+refreshes recompute their cells from scratch.
+
+A dispatcher claims a batch by pushing its ``available_at`` ``LEASE``
+seconds ahead, then hands it over in one transaction that also marks the
+rows processed. A batch that fails is retried event by event, each in its
+own transaction, so one bad row does not hold back the others. A failed
+event is tried again after a delay that doubles from ``RETRY_BACKOFF`` up to
+``MAX_BACKOFF`` seconds; database connection errors are retried for as long
+as they last, other errors give the event up after ``MAX_ATTEMPTS`` (its
+``available_at`` is cleared; ``retry`` or the admin action requeues it).
+
+With ``ASYNC`` a background thread per process drains the outbox when
+woken after a commit and every ``INTERVAL`` seconds, which also picks up
+rows left by other processes. ``manage.py dispatch_task_events --loop``
+runs the same loop as a separate worker. Processed rows are kept for
+``KEEP_DAYS``. At exit the thread is stopped before the process dispatches
+what is left itself.
+
+The full-text search index is maintained by the database itself (see
+``tasks.search``) and needs no consumer.
+"""
+
+import atexit
+import logging
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import asdict, replace
+from datetime import date, timedelta
+
+from django.conf import settings
+from django.db import InterfaceError, OperationalError, close_old_connections, connection, transaction
+from django.utils import timezone
+
+from notifications.events import NotificationEvent, write_events
+from . import analytics
+from .models import OutboxEvent, Task
+
+logger = logging.getLogger(__name__)
+
+OUTBOX_DEFAULTS = {
+    'ASYNC': True,
+    'BATCH_SIZE': 500,
+    'INTERVAL': 5,
+    'LEASE': 60,
+    'MAX_ATTEMPTS': 5,
+    'RETRY_BACKOFF': 5,
+    'MAX_BACKOFF': 3600,
+    'KEEP_DAYS': 7,
+}
+
+# Connection and locking errors, which go away without the event changing.
+TRANSIENT_ERRORS = (OperationalError, InterfaceError)
+
+_local = threading.local()
+
+
+def outbox_setting(name):
+    return getattr(settings, 'TASKS_OUTBOX', {}).get(name, OUTBOX_DEFAULTS[name])
+
+
+class PendingEvent:
+    """The outbox row being collected by an ``event`` block."""
+
+    def __init__(self, kind, task_id=None, key=None):
+        self.kind, self.task_id = kind, task_id
+        self.key = key or uuid.uuid4().hex
+        self.notifications = []
+        self.cells = set()
+
+    def notify(self, user, title, message, task=None):
+        """Queue a notification for ``user`` (a ``User`` or a user id)."""
+        user_id = getattr(user, 'pk', user)
+        if user_id is not None:
+            self.add_notifications([NotificationEvent(user_id, title, message, getattr(task, 'pk', task))])
+
+    def add_notifications(self, events):
+        """Queue ``NotificationEvent``s; those without an event key get one derived from ``key``."""
+        self.notifications.extend(events)
+
+    def add_cells(self, cells):
+        self.cells.update(cells)
+
+    def save(self):
+        if not self.notifications and not self.cells:
+            return
+        notifications = []
+        for index, notification in enumerate(self.notifications):
+            notification = asdict(notification)
+            notification['event_key'] = notification['event_key'] or f'{self.key}:{index}'
+            notifications.append(notification)
+        # Recording a key that is already in the outbox is a no-op.
+        OutboxEvent.objects.bulk_create([OutboxEvent(
+            key=self.key, kind=self.kind, task_id=self.task_id,
+            payload={
+                'notifications': notifications,
+                'cells': [[employee_id, period.isoformat()] for employee_id, period in sorted(self.cells)],
+            },
+        )], ignore_conflicts=True)
+        transaction.on_commit(dispatch_soon)
+
+
+def _active():
+    if not hasattr(_local, 'events'):
+        _local.events = []
+    return _local.events
+
+
+@contextmanager
+def event(kind, task_id=None, key=None):
+    """
+    Run the block in a transaction and record one outbox row for it. Yields
+    the ``PendingEvent`` to add notifications to.
+    """
+    pending = PendingEvent(kind, task_id, key)
+    with transaction.atomic():
+        _active().append(pending)
+        try:
+            yield pending
+        finally:
+            _active().pop()
+        pending.save()
+
+
+def add_cells(cells, kind='task_changed', task_id=None):
+    """Add summary cells to the current event, or record them on their own."""
+    if not cells:
+        return
+    active = _active()
+    if active:
+        active[-1].add_cells(cells)
+    else:
+        with event(kind, task_id) as pending:
+            pending.add_cells(cells)
+
+
+def deliver_notifications(events):
+    notifications = [
+        NotificationEvent(**notification)
+        for outbox_event in events for notification in outbox_event.payload.get('notifications', ())
+    ]
+    if not notifications:
+        return
+    # A task deleted since the event was recorded no longer cascades to its
+    # notifications; deliver them without the link.
+    task_ids = {notification.task_id for notification in notifications if notification.task_id}
+    existing = set(Task.objects.filter(pk__in=task_ids).values_list('pk', flat=True)) if task_ids else set()
+    write_events([
+        notification if notification.task_id in existing else replace(notification, task_id=None)
+        for notification in notifications
+    ])
+
+
+def refresh_performance(events):
+    cells = {
+        (employee_id, date.fromisoformat(period))
+        for outbox_event in events for employee_id, period in outbox_event.payload.get('cells', ())
+    }
+    if cells:
+        analytics.refresh(cells)
+
+
+CONSUMERS = (
+    ('notifications', deliver_notifications),
+    ('performance', refresh_performance),
+)
+
+
+def _claim(batch_size):
+    """Take up to ``batch_size`` due events for ``LEASE`` seconds."""
+    now = timezone.now()
+    due = OutboxEvent.objects.filter(
+        processed_at__isnull=True, available_at__lte=now
+    ).order_by('available_at', 'pk')
+    if connection.features.has_select_for_update_skip_locked:
+        # Rows another dispatcher is claiming are left to it.
+        due = due.select_for_update(skip_locked=True)
+    with transaction.atomic():
+        events = list(due[:batch_size])
+        # A dispatcher that dies before finishing leaves the rows to be
+        # claimed again once the lease runs out.
+        OutboxEvent.objects.filter(pk__in=[outbox_event.pk for outbox_event in events]).update(
+            available_at=now + timedelta(seconds=outbox_setting('LEASE'))
+        )
+    return events
+
+
+def _consume(events):
+    # Each call commits on its own, so deferred constraint checks fail here
+    # rather than in a transaction shared with other events.
+    with transaction.atomic():
+        for name, consumer in CONSUMERS:
+            consumer(events)
+        OutboxEvent.objects.filter(pk__in=[outbox_event.pk for outbox_event in events]).update(
+            processed_at=timezone.now(), last_error=''
+        )
+
+
+def _retry_delay(attempts):
+    return min(outbox_setting('RETRY_BACKOFF') * 2 ** max(attempts - 1, 0), outbox_setting('MAX_BACKOFF'))
+
+
+def _record_failure(outbox_event, error):
+    """
+    Schedule a failed event for another try. Errors from the database
+    connection are retried for as long as they last; any other error gives
+    the event up after ``MAX_ATTEMPTS``.
+    """
+    attempts = outbox_event.attempts + 1
+    transient = isinstance(error, TRANSIENT_ERRORS)
+    if transient or attempts < outbox_setting('MAX_ATTEMPTS'):
+        available_at = timezone.now() + timedelta(seconds=_retry_delay(attempts))
+    else:
+        logger.error('Giving up outbox event %s (%s) after %d attempts', outbox_event.key, outbox_event.kind, attempts)
+        available_at = None
+    try:
+        OutboxEvent.objects.filter(pk=outbox_event.pk).update(
+            attempts=attempts, available_at=available_at, last_error=repr(error)[:2000]
+        )
+    except Exception:
+        # The lease still runs out, so the event is tried again either way.
+        logger.exception('Could not record the failure of outbox event %s', outbox_event.key)
+
+
+def _dispatch(batch_size):
+    events = _claim(batch_size)
+    if not events:
+        return 0, 0
+    try:
+        _consume(events)
+        return len(events), len(events)
+    except TRANSIENT_ERRORS as error:
+        # Splitting the batch would only hit the same error once per event.
+        logger.warning('Outbox batch of %d events hit a database error, retrying later', len(events), exc_info=True)
+        for outbox_event in events:
+            _record_failure(outbox_event, error)
+        return len(events), 0
+    except Exception:
+        logger.warning('Outbox batch of %d events failed, retrying one by one', len(events), exc_info=True)
+    done = 0
+    for outbox_event in events:
+        try:
+            _consume([outbox_event])
+            done += 1
+        except Exception as error:
+            logger.exception('Outbox event %s (%s) failed', outbox_event.key, outbox_event.kind)
+            _record_failure(outbox_event, error)
+    return len(events), done
+
+
+def dispatch(batch_size=None):
+    """Hand one batch of due events to the consumers; returns how many succeeded."""
+    return _dispatch(batch_size or outbox_setting('BATCH_SIZE'))[1]
+
+
+def dispatch_pending():
+    """Dispatch until no events are due; returns how many were handed over."""
+    total = 0
+    batch_size = outbox_setting('BATCH_SIZE')
+    while True:
+        claimed, done = _dispatch(batch_size)
+        total += done
+        if claimed < batch_size:
+            return total
+
+
+def retry(queryset):
+    """Make given-up or backed-off events due again."""
+    return queryset.filter(processed_at__isnull=True).update(available_at=timezone.now(), attempts=0)
+
+
+def purge_processed(now=None):
+    cutoff = (now or timezone.now()) - timedelta(days=outbox_setting('KEEP_DAYS'))
+    return OutboxEvent.objects.filter(processed_at__lt=cutoff).delete()[0]
+
+
+class OutboxWorker:
+    def __init__(self):
+        self._wake = threading.Event()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._stopping = False
+        self._purged = None
+    
+    def wake(self):
+        if self._stopping:
+            return
+        self._ensure_worker()
+        self._wake.set()
+    
+    def _ensure_worker(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='task-outbox', daemon=True)
+                self._thread.start()
+    
+    def _run(self):
+        while not self._stopping:
+            self._wake.wait(outbox_setting('INTERVAL'))
+            self._wake.clear()
+            if self._stopping:
+                break
+            try:
+                dispatch_pending()
+                if self._purged is None or time.monotonic() - self._purged > 3600:
+                    purge_processed()
+                    self._purged = time.monotonic()
+            except Exception:
+                logger.exception('Task outbox dispatch failed')
+            finally:
+                close_old_connections()
+    
+    def stop(self, timeout=30):
+        """Stop the background thread once its current batch is done."""
+        self._stopping = True
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+    
+    def flush(self):
+        """Stop the worker, then dispatch what is left before the process exits."""
+        if self._thread is None:
+            return
+        self.stop()
+        if self._thread.is_alive():
+            # Rows it still holds are picked up by the next process.
+            logger.warning('Task outbox worker did not stop; leaving pending events')
+            return
+        try:
+            dispatch_pending()
+        except Exception:
+            logger.exception('Task outbox dispatch failed at shutdown')
+
+
+worker = OutboxWorker()
+atexit.register(worker.flush)
+
+
+def dispatch_soon():
+    if outbox_setting('ASYNC'):
+        worker.wake()
+    else:
+        dispatch_pending()
@@ -0,0 +1,179 @@
+"""
+Overdue task detection.
+
+``detect_overdue`` finds open tasks whose deadline passed since the last
+scan with a range scan over ``task_overdue_scan_idx`` (open tasks with no
+``overdue_at`` yet), bounded below by a persisted watermark. Each newly
+overdue task is flagged with ``overdue_at`` and its assignee and creator are
+notified in one batch. The statistics and response caches of the affected
+scopes are invalidated, so overdue counts track deadlines as they pass.
+
+Run it periodically with ``manage.py detect_overdue_tasks --loop`` or, on a
+single process, with ``TASKS_OVERDUE['RUN_IN_PROCESS']``. Concurrent runs
+are safe: flagging only touches unflagged rows, notifications carry a
+per-deadline event key and the watermark only advances from the value the
+scan read, so a deadline set in the past meanwhile is not skipped.
+"""
+
+import logging
+import threading
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from django.utils import timezone
+
+from notifications.events import NotificationEvent
+from . import analytics, outbox
+from .caching import invalidate_tasks
+from .models import ScanWatermark, Task
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = ('pending', 'in_progress')
+
+WATERMARK = 'overdue_tasks'
+
+OVERDUE_DEFAULTS = {
+    'INTERVAL': 60,
+    'BATCH_SIZE': 1000,
+    'RUN_IN_PROCESS': False,
+}
+
+
+def overdue_setting(name):
+    return getattr(settings, 'TASKS_OVERDUE', {}).get(name, OVERDUE_DEFAULTS[name])
+
+
+def get_watermark():
+    return ScanWatermark.objects.filter(name=WATERMARK).values_list('value', flat=True).first()
+
+
+def lower_watermark(due_date):
+    """Make the next scan cover ``due_date`` (for deadlines set in the past)."""
+    ScanWatermark.objects.filter(name=WATERMARK, value__gte=due_date).update(
+        value=due_date - timedelta(microseconds=1)
+    )
+
+
+def _advance_watermark(old, new):
+    """
+    Move the watermark from ``old`` to ``new`` unless ``track_deadlines``
+    lowered it since it was read; the next scan then starts from there.
+    """
+    if old is None:
+        ScanWatermark.objects.bulk_create([ScanWatermark(name=WATERMARK, value=new)], ignore_conflicts=True)
+    else:
+        ScanWatermark.objects.filter(name=WATERMARK, value=old).update(value=new, updated_at=timezone.now())
+
+
+def track_deadlines(tasks, now=None):
+    """Lower the watermark for open tasks saved with a deadline already past."""
+    now = now or timezone.now()
+    due_dates = [
+        task.due_date for task in tasks
+        if task.status in OPEN_STATUSES and task.overdue_at is None and task.due_date <= now
+    ]
+    if due_dates:
+        lower_watermark(min(due_dates))
+
+
+def reset_if_rescheduled(task, now=None):
+    """Clear ``overdue_at`` once a flagged task has a future deadline again."""
+    if task.overdue_at is not None and task.due_date > (now or timezone.now()):
+        task.overdue_at = None
+        return True
+    return False
+
+
+def _events(tasks):
+    for task in tasks:
+        # One key per deadline, so a rescheduled task can be reported again.
+        key = f'overdue:{task.pk}:{int(task.due_date.timestamp())}'
+        recipients = {task.assigned_to_id, task.created_by_id}
+        recipients.discard(None)
+        for user_id in recipients:
+            yield NotificationEvent(
+                user_id=user_id,
+                title='مهمة متأخرة',
+                message=f'تجاوزت المهمة "{task.title}" موعد انتهائها',
+                task_id=task.pk,
+                event_key=key,
+            )
+
+
+def detect_overdue(now=None, batch_size=None):
+    """Flag and announce tasks that became overdue; returns how many."""
+    now = now or timezone.now()
+    batch_size = batch_size or overdue_setting('BATCH_SIZE')
+    watermark = get_watermark()
+
+    candidates = Task.objects.filter(
+        status__in=OPEN_STATUSES, overdue_at__isnull=True, due_date__lte=now
+    )
+    if watermark is not None:
+        candidates = candidates.filter(due_date__gt=watermark)
+    if connection.features.has_select_for_update_skip_locked:
+        # Rows another scanner is flagging right now are left to it.
+        candidates = candidates.select_for_update(skip_locked=True)
+
+    with outbox.event('tasks_overdue') as event:
+        tasks = list(
+            candidates.order_by('due_date', 'pk')
+            .only('id', 'title', 'due_date', 'status', 'assigned_to_id', 'created_by_id', 'created_at')[:batch_size]
+        )
+        if tasks:
+            Task.objects.filter(pk__in=[task.pk for task in tasks], overdue_at__isnull=True).update(overdue_at=now, updated_at=now)
+            event.add_notifications(_events(tasks))
+            event.add_cells(analytics.task_cells(tasks))
+        if len(tasks) < batch_size:
+            new_watermark = now
+        else:
+            # Deadlines equal to the last one may not all fit in this batch.
+            new_watermark = tasks[-1].due_date - timedelta(microseconds=1)
+        _advance_watermark(watermark, new_watermark)
+
+    if tasks:
+        invalidate_tasks(tasks)
+    return len(tasks)
+
+
+def run_until_caught_up(now=None):
+    total = 0
+    batch_size = overdue_setting('BATCH_SIZE')
+    while True:
+        flagged = detect_overdue(now, batch_size)
+        total += flagged
+        if flagged < batch_size:
+            return total
+
+
+class OverdueScheduler:
+    """Daemon thread that runs the detector every ``INTERVAL`` seconds."""
+
+    def __init__(self):
+        self._thread = None
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name='overdue-detector', daemon=True)
+                self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _run(self):
+        while not self._stop.wait(overdue_setting('INTERVAL')):
+            try:
+                run_until_caught_up()
+            except Exception:
+                logger.exception('Overdue task scan failed')
+            finally:
+                close_old_connections()
+
+
+scheduler = OverdueScheduler()
@@ -0,0 +1,156 @@
+"""
+Ranked full-text search over task titles and descriptions.
+
+PostgreSQL: a GIN expression index over weighted ``english`` and ``arabic``
+tsvectors (``simple`` when the server has no Arabic configuration), queried
+with ``websearch_to_tsquery`` and ranked with ``ts_rank``.
+
+SQLite: an FTS5 external-content table, ``tasks_task_fts``, joined to the
+tasks through the unmanaged ``TaskSearchEntry`` model and ranked with
+``bm25``. Triggers keep it in sync with ``tasks_task`` on insert, update and
+delete, including bulk writes and imports that bypass model signals.
+``repair_index`` reinstalls them after every migrate, because SQLite table
+rebuilds during schema changes drop triggers.
+
+Migration 0006 creates the index with its own copy of this DDL.
+
+Other backends fall back to ``icontains``.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Func, Q, Value
+from django.db.models.expressions import RawSQL
+
+TABLE = 'tasks_task'
+FTS_TABLE = 'tasks_task_fts'
+PG_INDEX = 'task_search_idx'
+# Title matches weigh more than description matches.
+TITLE_WEIGHT, DESCRIPTION_WEIGHT = 10.0, 1.0
+
+_pg_configs = None
+
+
+def _pg_configs_for(conn):
+    global _pg_configs
+    if _pg_configs is None:
+        with conn.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_ts_config WHERE cfgname = 'arabic'")
+            arabic = 'arabic' if cursor.fetchone() else 'simple'
+        _pg_configs = ('english', arabic)
+    return _pg_configs
+
+
+def _pg_document(configs, table=None):
+    prefix = f'"{table}".' if table else ''
+    parts = []
+    for config in configs:
+        parts.append(f"setweight(to_tsvector('{config}'::regconfig, coalesce({prefix}\"title\", '')), 'A')")
+        parts.append(f"setweight(to_tsvector('{config}'::regconfig, coalesce({prefix}\"description\", '')), 'B')")
+    return ' || '.join(parts)
+
+
+def _pg_query(configs):
+    return ' || '.join(f"websearch_to_tsquery('{config}'::regconfig, %s)" for config in configs)
+
+
+SQLITE_SETUP = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, description, content='{TABLE}', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {FTS_TABLE}_au AFTER UPDATE OF title, description ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {FTS_TABLE}(rowid, title, description) VALUES (new.id, new.title, new.description);
+    END""",
+]
+
+
+def ensure_index(conn=None):
+    """Create the search index and fill it from the existing tasks."""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        if conn.vendor == 'postgresql':
+            document = _pg_document(_pg_configs_for(conn))
+            cursor.execute(f'CREATE INDEX IF NOT EXISTS {PG_INDEX} ON {TABLE} USING gin (({document}))')
+        elif conn.vendor == 'sqlite':
+            for statement in SQLITE_SETUP:
+                cursor.execute(statement)
+            cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def repair_index(conn=None):
+    """Reinstall missing SQLite sync triggers and rebuild the stale index."""
+    conn = conn or connection
+    if conn.vendor != 'sqlite':
+        return
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR name LIKE %s", [FTS_TABLE, f'{FTS_TABLE}_a_']
+        )
+        names = {row[0] for row in cursor.fetchall()}
+    # Only an installed index is repaired; it is created by migration 0006.
+    if FTS_TABLE in names and len(names) < 4:
+        ensure_index(conn)
+
+
+class Match(Func):
+    """``<FTS5 column> MATCH <query>``, as a condition for ``filter()``."""
+    template = '%(expressions)s'
+    arg_joiner = ' MATCH '
+    output_field = BooleanField()
+
+
+def _fts5_query(text):
+    # Each word becomes a quoted phrase so user input cannot inject FTS5
+    # operators; the words are ANDed and the last one is matched as a prefix.
+    words = re.findall(r'\w+', text)
+    if not words:
+        return None
+    phrases = ['"%s"' % word for word in words]
+    phrases[-1] += '*'
+    return ' '.join(phrases)
+
+
+def icontains_search(queryset, text):
+    return queryset.filter(Q(title__icontains=text) | Q(description__icontains=text))
+
+
+def search_tasks(queryset, text):
+    """
+    Filter ``queryset`` to tasks matching ``text``, annotated with
+    ``search_rank`` (higher is better) and ordered by it.
+    """
+    text = text.strip()
+    if connection.vendor == 'postgresql':
+        configs = _pg_configs_for(connection)
+        document, query = _pg_document(configs, TABLE), _pg_query(configs)
+        params = [text] * len(configs)
+        return (
+            queryset.filter(RawSQL(f'({document}) @@ ({query})', params, output_field=BooleanField()))
+            .annotate(search_rank=RawSQL(f'ts_rank({document}, {query})', params, output_field=FloatField()))
+            .order_by('-search_rank', '-pk')
+        )
+    if connection.vendor == 'sqlite':
+        match = _fts5_query(text)
+        if match is None:
+            return queryset.none()
+        # An inner join on the index rowid, driven by the MATCH.
+        return (
+            queryset.filter(search_entry__isnull=False)
+            .filter(Match(F('search_entry__document'), Value(match)))
+            .annotate(search_rank=-Func(
+                F('search_entry__document'), Value(TITLE_WEIGHT), Value(DESCRIPTION_WEIGHT),
+                function='bm25', output_field=FloatField(),
+            ))
+            .order_by('-search_rank', '-pk')
+        )
+    return icontains_search(queryset, text).order_by('-created_at', '-pk')
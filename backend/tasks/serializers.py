@@ -1,9 +1,13 @@
 from rest_framework import serializers
-from .models import Task, TaskEvaluation
+from .models import EmployeePerformance, Task, TaskEvaluation, TaskImport
+from accounts.models import User
 from accounts.serializers import UserSerializer
+from taskapp.serializers import (
+    EagerLoadingMixin, PreloadedPrimaryKeyRelatedField, ValuesSerializer
+)
 
 
-class TaskSerializer(serializers.ModelSerializer):
+class TaskSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     created_by = UserSerializer(read_only=True)
     assigned_to = UserSerializer(read_only=True)
     is_overdue = serializers.ReadOnlyField()
@@ -15,7 +19,31 @@ class TaskSerializer(serializers.ModelSerializer):
         read_only_fields = ('created_at', 'updated_at', 'completed_at')
 
 
+class TaskValuesSerializer(ValuesSerializer):
+    """Fast list rendering with the same output as ``TaskSerializer``."""
+    model = Task
+    fields = (
+        'id', 'created_by', 'assigned_to', 'is_overdue', 'duration_days', 'title', 'description',
+        'status', 'priority', 'due_date', 'created_at', 'updated_at', 'completed_at', 'overdue_at',
+    )
+    key_columns = ('id', 'created_at')
+    datetime_fields = ('due_date', 'created_at', 'updated_at', 'completed_at', 'overdue_at')
+    user_fields = ('created_by', 'assigned_to')
+    computed = {
+        'is_overdue': ('due_date', 'status'),
+        'duration_days': ('due_date', 'created_at'),
+    }
+    
+    def get_is_overdue(self, row):
+        return self.now > row['due_date'] and row['status'] not in ('completed', 'cancelled')
+    
+    def get_duration_days(self, row):
+        return (row['due_date'] - row['created_at']).days if row['due_date'] else None
+
+
 class TaskCreateSerializer(serializers.ModelSerializer):
+    assigned_to = PreloadedPrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
+    
     class Meta:
         model = Task
         fields = ('title', 'description', 'assigned_to', 'priority', 'due_date')
@@ -27,6 +55,8 @@ class TaskCreateSerializer(serializers.ModelSerializer):
 
 
 class TaskUpdateSerializer(serializers.ModelSerializer):
+    assigned_to = PreloadedPrimaryKeyRelatedField(queryset=User.objects.all(), required=False, allow_null=True)
+    
     class Meta:
         model = Task
         fields = ('title', 'description', 'assigned_to', 'status', 'priority', 'due_date')
@@ -38,7 +68,7 @@ class TaskUpdateSerializer(serializers.ModelSerializer):
         return value
 
 
-class TaskEvaluationSerializer(serializers.ModelSerializer):
+class TaskEvaluationSerializer(EagerLoadingMixin, serializers.ModelSerializer):
     task = TaskSerializer(read_only=True)
     evaluated_by = UserSerializer(read_only=True)
     
@@ -48,6 +78,15 @@ class TaskEvaluationSerializer(serializers.ModelSerializer):
         read_only_fields = ('evaluated_at',)
 
 
+class TaskEvaluationValuesSerializer(ValuesSerializer):
+    """Fast list rendering with the same output as ``TaskEvaluationSerializer``."""
+    model = TaskEvaluation
+    fields = ('id', 'task', 'evaluated_by', 'rating', 'feedback', 'evaluated_at')
+    datetime_fields = ('evaluated_at',)
+    user_fields = ('evaluated_by',)
+    nested = {'task': TaskValuesSerializer}
+
+
 class TaskEvaluationCreateSerializer(serializers.ModelSerializer):
     class Meta:
         model = TaskEvaluation
@@ -60,3 +99,17 @@ class TaskEvaluationCreateSerializer(serializers.ModelSerializer):
             raise serializers.ValidationError('تم تقييم هذه المهمة مسبقاً')
         return value
 
+
+class TaskImportSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = TaskImport
+        fields = '__all__'
+
+
+class EmployeePerformanceSerializer(serializers.ModelSerializer):
+    employee_username = serializers.CharField(source='employee.username', read_only=True)
+    on_time_rate = serializers.FloatField(read_only=True)
+    
+    class Meta:
+        model = EmployeePerformance
+        fields = '__all__'
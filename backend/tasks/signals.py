@@ -0,0 +1,53 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from . import analytics, outbox, sync
+from .caching import invalidate_evaluation, invalidate_tasks
+from .overdue import reset_if_rescheduled, track_deadlines
+from .models import Task, TaskEvaluation
+
+
+@receiver(pre_save, sender=Task)
+def reset_overdue_flag(sender, instance, **kwargs):
+    reset_if_rescheduled(instance)
+
+
+@receiver(post_save, sender=Task)
+def track_task_deadline(sender, instance, **kwargs):
+    track_deadlines([instance])
+
+
+# Connected before invalidate_task_caches, which resets _loaded_assigned_to_id
+# that this and record_task_change read.
+@receiver(post_save, sender=Task)
+def record_unassigned_task(sender, instance, created, **kwargs):
+    if not created:
+        sync.record_unassigned([instance])
+
+
+@receiver(post_delete, sender=Task)
+def record_deleted_task(sender, instance, **kwargs):
+    sync.record_deleted([instance])
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def record_task_change(sender, instance, **kwargs):
+    outbox.add_cells(analytics.task_cells([instance]), task_id=instance.pk)
+
+
+@receiver(post_save, sender=Task)
+@receiver(post_delete, sender=Task)
+def invalidate_task_caches(sender, instance, **kwargs):
+    invalidate_tasks([instance])
+
+
+@receiver(post_save, sender=TaskEvaluation)
+@receiver(post_delete, sender=TaskEvaluation)
+def record_evaluation_change(sender, instance, **kwargs):
+    # The task may already be gone when evaluations are cascade-deleted.
+    assignee_id, created_at = Task.objects.filter(pk=instance.task_id).values_list(
+        'assigned_to_id', 'created_at'
+    ).first() or (None, None)
+    outbox.add_cells(analytics.evaluation_cells(assignee_id, created_at), task_id=instance.task_id)
+    invalidate_evaluation(instance, assignee_id)
@@ -0,0 +1,125 @@
+"""
+Task statistics rollups.
+
+All counters for a scope are computed with a single conditional-aggregation
+query and cached per scope (all tasks for admins, assigned tasks for each
+employee). Task saves and deletes invalidate the affected scopes through
+``tasks.caching``; rollups are recomputed on the primary database so a
+lagging read replica cannot cache counts from before the write. Those
+invalidations only reach the worker's own local-memory cache, so rollups
+are cached only with ``CACHE_SHARED`` and computed per request otherwise.
+
+Overdue counts read the ``overdue_at`` flag set by ``tasks.overdue``, whose
+runs invalidate the affected scopes, so cached counts do not go stale as
+deadlines pass.
+"""
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Count, F, Q
+
+from taskapp.db_router import primary_reads
+from .models import Task
+
+OPEN_STATUSES = ('pending', 'in_progress')
+
+BREAKDOWNS = {
+    'priority': lambda queryset: queryset.values('priority').order_by('priority'),
+    'assignee': lambda queryset: queryset.values(
+        assignee_id=F('assigned_to'),
+        assignee_username=F('assigned_to__username'),
+    ).order_by('assignee_username'),
+}
+
+ADMIN_SCOPE = 'admin'
+
+
+def employee_scope(user_id):
+    return f'employee:{user_id}'
+
+
+def scope_for_user(user):
+    return ADMIN_SCOPE if user.is_admin else employee_scope(user.pk)
+
+
+def _cached():
+    return getattr(settings, 'CACHE_SHARED', False)
+
+
+def _cache_key(scope, breakdown=None):
+    key = f'tasks:statistics:{scope}'
+    return f'{key}:{breakdown}' if breakdown else key
+
+
+def _scope_queryset(scope):
+    if scope == ADMIN_SCOPE:
+        return Task.objects.all()
+    return Task.objects.filter(assigned_to_id=scope.split(':', 1)[1])
+
+
+def _counters():
+    return {
+        'total_tasks': Count('id'),
+        'pending_tasks': Count('id', filter=Q(status='pending')),
+        'in_progress_tasks': Count('id', filter=Q(status='in_progress')),
+        'completed_tasks': Count('id', filter=Q(status='completed')),
+        'overdue_tasks': Count('id', filter=Q(status__in=OPEN_STATUSES, overdue_at__isnull=False)),
+    }
+
+
+def _result(rows, breakdown):
+    return rows[0] if breakdown is None else rows
+
+
+def _timeout():
+    return getattr(settings, 'TASK_STATISTICS_CACHE_TIMEOUT', 300)
+
+
+def get_statistics(scope, breakdown=None):
+    key = _cache_key(scope, breakdown)
+    result = cache.get(key) if _cached() else None
+    if result is None:
+        queryset = _scope_queryset(scope).order_by()
+        with primary_reads():
+            if breakdown is None:
+                rows = [queryset.aggregate(**_counters())]
+            else:
+                rows = list(BREAKDOWNS[breakdown](queryset).annotate(**_counters()))
+        result = _result(rows, breakdown)
+        if _cached():
+            cache.set(key, result, _timeout())
+    return result
+
+
+async def aget_statistics(scope, breakdown=None):
+    """``get_statistics`` for async views, using the async cache and ORM."""
+    key = _cache_key(scope, breakdown)
+    result = await cache.aget(key) if _cached() else None
+    if result is None:
+        queryset = _scope_queryset(scope).order_by()
+        with primary_reads():
+            if breakdown is None:
+                rows = [await queryset.aaggregate(**_counters())]
+            else:
+                rows = [row async for row in BREAKDOWNS[breakdown](queryset).annotate(**_counters())]
+        result = _result(rows, breakdown)
+        if _cached():
+            await cache.aset(key, result, _timeout())
+    return result
+
+
+def invalidate_scopes(scopes):
+    keys = []
+    for scope in scopes:
+        keys.append(_cache_key(scope))
+        keys += [_cache_key(scope, breakdown) for breakdown in BREAKDOWNS]
+    cache.delete_many(keys)
+
+
+def scopes_for_tasks(tasks):
+    scopes = {ADMIN_SCOPE}
+    for task in tasks:
+        for user_id in (task.assigned_to_id, getattr(task, '_loaded_assigned_to_id', None)):
+            if user_id:
+                scopes.add(employee_scope(user_id))
+    return scopes
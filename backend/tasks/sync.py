@@ -0,0 +1,36 @@
+"""
+Task tombstones for delta sync, see ``taskapp.sync``.
+
+Deleted tasks are recorded for admins and for their assignee; tasks
+reassigned away from an employee are recorded for that employee only. The
+model signal handlers and the bulk endpoints (which bypass signals) call
+these before ``caching.invalidate_tasks`` resets ``_loaded_assigned_to_id``.
+"""
+
+from .models import TaskTombstone
+
+
+def record_deleted(tasks):
+    TaskTombstone.objects.bulk_create(
+        TaskTombstone(task_id=task.pk, assigned_to_id=task.assigned_to_id) for task in tasks
+    )
+
+
+def record_unassigned(tasks):
+    tombstones = [
+        TaskTombstone(task_id=task.pk, assigned_to_id=task._loaded_assigned_to_id, deleted=False)
+        for task in tasks
+        if getattr(task, '_loaded_assigned_to_id', None) not in (None, task.assigned_to_id)
+    ]
+    if tombstones:
+        TaskTombstone.objects.bulk_create(tombstones)
+
+
+def removed_ids(user, since):
+    """Ids of tasks that left ``user``'s task list after ``since``."""
+    tombstones = TaskTombstone.objects.filter(removed_at__gt=since)
+    if user.is_employee:
+        tombstones = tombstones.filter(assigned_to_id=user.pk)
+    else:
+        tombstones = tombstones.filter(deleted=True)
+    return tombstones.order_by().values_list('task_id', flat=True)
@@ -0,0 +1,493 @@
+import json
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import DatabaseError, OperationalError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+from rest_framework.authtoken.models import Token
+from rest_framework.test import APIClient, APIRequestFactory
+
+from accounts.models import User
+from notifications.models import Notification
+from taskapp.sync import purge_tombstones
+from . import async_views, imports, outbox, overdue, statistics, views
+from .models import OutboxEvent, Task, TaskEvaluation, TaskImport, TaskTombstone
+
+
+def clear_caches():
+    for alias in ('default', 'responses'):
+        caches[alias].clear()
+
+
+# Outbox events are dispatched inline when a test runs on_commit callbacks.
+@override_settings(TASKS_OUTBOX={'ASYNC': False})
+class TaskTestCase(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.admin = User.objects.create_user('admin', password='x', role='admin')
+        cls.employees = [User.objects.create_user(f'employee{i}', password='x') for i in range(3)]
+
+    def setUp(self):
+        clear_caches()
+        self.client = self.client_for(self.admin)
+
+    def client_for(self, user):
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get_or_create(user=user)[0].key}')
+        return client
+
+    def create_tasks(self, count, **fields):
+        tasks = []
+        for index in range(count):
+            tasks.append(Task.objects.create(**{
+                'title': f'task {index}',
+                'description': 'description',
+                'created_by': self.admin,
+                'assigned_to': self.employees[index % len(self.employees)],
+                'due_date': timezone.now() + timezone.timedelta(days=1),
+                **fields,
+            }))
+        return tasks
+
+
+class ListQueryCountTests(TaskTestCase):
+    """List endpoints run a fixed number of queries whatever the row count."""
+
+    def seed(self, count):
+        for task in self.create_tasks(count, status='completed'):
+            TaskEvaluation.objects.create(task=task, rating=4, evaluated_by=self.admin)
+
+    def assert_queries(self, url, expected):
+        for count in (2, 15):
+            self.seed(count)
+            clear_caches()
+            with self.assertNumQueries(expected):
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+
+    def test_task_list(self):
+        # Token, tasks page, side-loaded users
+        self.assert_queries('/api/tasks/', 3)
+
+    def test_evaluation_list(self):
+        # Token, evaluations, side-loaded tasks and users
+        self.assert_queries('/api/tasks/evaluations/', 4)
+
+
+class BulkTests(TaskTestCase):
+    def task_data(self, **fields):
+        return {
+            'title': 'task', 'description': 'description', 'assigned_to': self.employees[0].pk,
+            'due_date': (timezone.now() + timezone.timedelta(days=1)).isoformat(), **fields,
+        }
+
+    def test_create_reports_invalid_items(self):
+        response = self.client.post(
+            '/api/tasks/bulk/', [self.task_data(), self.task_data(title=''), self.task_data()], format='json'
+        )
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['created']), 2)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1])
+        self.assertEqual(Task.objects.count(), 2)
+        # One outbox event notifies both assignees.
+        event = OutboxEvent.objects.get(kind='tasks_created')
+        self.assertEqual(len(event.payload['notifications']), 2)
+
+    def test_all_invalid_is_rejected(self):
+        response = self.client.post('/api/tasks/bulk/', [self.task_data(title='')], format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertFalse(Task.objects.exists())
+
+    def test_employee_updates_status_of_own_tasks_only(self):
+        own, other = self.create_tasks(2)
+        client = self.client_for(self.employees[0])
+        response = client.patch('/api/tasks/bulk/', [
+            {'id': own.pk, 'status': 'completed'},
+            {'id': other.pk, 'status': 'completed'},
+            {'id': own.pk, 'title': 'renamed'},
+        ], format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        own.refresh_from_db()
+        other.refresh_from_db()
+        self.assertEqual(own.status, 'completed')
+        self.assertIsNotNone(own.completed_at)
+        self.assertEqual(other.status, 'pending')
+
+    def test_delete_only_own_tasks(self):
+        task, = self.create_tasks(1)
+        other_admin = User.objects.create_user('admin2', password='x', role='admin')
+        foreign, = self.create_tasks(1, created_by=other_admin)
+        response = self.client.delete('/api/tasks/bulk/', {'ids': [task.pk, foreign.pk, 0]}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['deleted'], [task.pk])
+        self.assertEqual([error['index'] for error in response.data['errors']], [1, 2])
+        self.assertEqual(list(Task.objects.values_list('pk', flat=True)), [foreign.pk])
+
+
+class StatisticsTests(TaskTestCase):
+    @override_settings(CACHE_SHARED=False)
+    def test_computed_per_request_without_a_shared_cache(self):
+        task, _ = self.create_tasks(2)
+        self.assertEqual(statistics.get_statistics(statistics.ADMIN_SCOPE)['pending_tasks'], 2)
+        # Written by another worker, whose invalidation stays in its own cache.
+        Task.objects.filter(pk=task.pk).update(status='completed')
+        counts = statistics.get_statistics(statistics.ADMIN_SCOPE)
+        self.assertEqual((counts['pending_tasks'], counts['completed_tasks']), (1, 1))
+
+    @override_settings(CACHE_SHARED=True)
+    def test_cached_until_a_write_with_a_shared_cache(self):
+        task, _ = self.create_tasks(2)
+        statistics.get_statistics(statistics.ADMIN_SCOPE)
+        with self.assertNumQueries(0):
+            statistics.get_statistics(statistics.ADMIN_SCOPE)
+        with self.captureOnCommitCallbacks(execute=True):
+            task.status = 'completed'
+            task.save()
+        self.assertEqual(statistics.get_statistics(statistics.ADMIN_SCOPE)['completed_tasks'], 1)
+
+
+class OverdueTests(TaskTestCase):
+    def past_due(self, **fields):
+        return self.create_tasks(1, due_date=timezone.now() - timezone.timedelta(hours=1), **fields)[0]
+
+    def test_statistics_count_flagged_tasks(self):
+        self.past_due()
+        self.assertEqual(statistics.get_statistics(statistics.ADMIN_SCOPE)['overdue_tasks'], 0)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(overdue.detect_overdue(), 1)
+        self.assertEqual(statistics.get_statistics(statistics.ADMIN_SCOPE)['overdue_tasks'], 1)
+
+    def test_scan_keeps_a_watermark_lowered_meanwhile(self):
+        overdue.detect_overdue()
+        read_watermark = overdue.get_watermark
+
+        def lowered_after_read():
+            watermark = read_watermark()
+            # Saved by another request while the scan runs.
+            self.past_due()
+            return watermark
+
+        with mock.patch.object(overdue, 'get_watermark', lowered_after_read):
+            self.assertEqual(overdue.detect_overdue(), 0)
+        self.assertEqual(overdue.detect_overdue(), 1)
+
+
+# Tokens and scope versions are cached as with Redis.
+@override_settings(CACHE_SHARED=True)
+class ConditionalResponseTests(TaskTestCase):
+    def test_not_modified_until_a_write_commits(self):
+        task, = self.create_tasks(1)
+        response = self.client.get('/api/tasks/')
+        etag = response['ETag']
+        self.assertEqual(response.status_code, 200)
+
+        # Answered from the cached token and scope versions alone.
+        with self.assertNumQueries(0):
+            response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/tasks/{task.pk}/', {'title': 'renamed'}, format='json')
+        response = self.client.get('/api/tasks/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(response.json()['results'][0]['title'], 'renamed')
+
+    def test_employee_sees_changes_to_their_tasks(self):
+        task, = self.create_tasks(1)
+        client = self.client_for(self.employees[0])
+        etag = client.get(f'/api/tasks/{task.pk}/')['ETag']
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.put(f'/api/tasks/{task.pk}/', {'priority': 'urgent'}, format='json')
+        response = client.get(f'/api/tasks/{task.pk}/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['priority'], 'urgent')
+
+
+# The URL confs route to the async views only with ASYNC_VIEWS, so they are
+# called directly.
+class AsyncViewTests(TaskTestCase):
+    def request(self, path):
+        token = Token.objects.get(user=self.admin).key
+        return APIRequestFactory().get(path, HTTP_AUTHORIZATION=f'Token {token}')
+
+    def async_response(self, path):
+        return async_to_sync(async_views.task_list_create)(self.request(path))
+
+    def sync_response(self, path):
+        return views.task_list_create(self.request(path)).render()
+
+    def test_invalid_cursor_matches_drf_view(self):
+        self.create_tasks(3)
+        response = self.async_response('/api/tasks/?cursor=garbage!!')
+        expected = self.sync_response('/api/tasks/?cursor=garbage!!')
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(response.status_code, expected.status_code)
+        self.assertEqual(response.content, expected.content)
+
+    def test_list_matches_drf_view(self):
+        self.create_tasks(3)
+        response = self.async_response('/api/tasks/?page_size=2')
+        clear_caches()
+        self.assertEqual(response.content, self.sync_response('/api/tasks/?page_size=2').content)
+
+
+class FieldSelectionTests(TaskTestCase):
+    def test_selected_fields(self):
+        self.create_tasks(2)
+        response = self.client.get('/api/tasks/?fields=id,title,assigned_to&expand=')
+        self.assertEqual(response.status_code, 200)
+        for row in response.json()['results']:
+            self.assertEqual(set(row), {'id', 'title', 'assigned_to'})
+            self.assertIsInstance(row['assigned_to'], int)
+
+    def test_unknown_names_are_rejected(self):
+        self.create_tasks(1)
+        for query in ('fields=bogus', 'fields=id,title.length', 'expand=title', 'expand=bogus'):
+            response = self.client.get(f'/api/tasks/?{query}')
+            self.assertEqual(response.status_code, 400, query)
+
+        response = self.client.get('/api/tasks/evaluations/?fields=task.bogus')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(list(response.json()), ['fields'])
+
+
+class ImportTests(TaskTestCase):
+    def ndjson(self, *lines):
+        return SimpleUploadedFile('tasks.ndjson', '\n'.join(lines).encode())
+
+    def record(self, title):
+        return json.dumps({
+            'title': title, 'description': 'description', 'assigned_to': self.employees[0].username,
+            'due_date': '2030-01-01',
+        })
+
+    def test_malformed_lines_are_row_errors(self):
+        upload = self.ndjson(self.record('first'), '{"title": ', '[1, 2]', self.record('second'))
+        response = self.client.post('/api/tasks/import/', {'file': upload})
+        self.assertEqual(response.status_code, 201)
+        job = TaskImport.objects.get()
+        self.assertEqual((job.status, job.next_row, job.created_count, job.error_count), ('completed', 4, 2, 2))
+        self.assertEqual([error['row'] for error in job.chunk_reports[0]['errors']], [2, 3])
+        self.assertEqual(sorted(Task.objects.values_list('title', flat=True)), ['first', 'second'])
+
+    def test_resumes_after_last_committed_chunk(self):
+        lines = [self.record(f'task {index}') for index in range(5)]
+        job = imports.start_import(self.ndjson(*lines), 'tasks.ndjson', self.admin)
+        save_event = outbox.PendingEvent.save
+        calls = []
+
+        # Fails the third checkpoint as it commits, after the chunk was
+        # loaded and counted.
+        def fail_third_chunk(event):
+            calls.append(event.key)
+            if len(calls) == 3:
+                raise DatabaseError('connection lost')
+            save_event(event)
+
+        with mock.patch.object(outbox.PendingEvent, 'save', fail_third_chunk):
+            with self.assertRaises(imports.ImportFailed):
+                imports.run_import(job, self.ndjson(*lines), chunk_size=2)
+        # What the view reports: the committed checkpoint, not the failed chunk.
+        self.assertEqual((job.status, job.next_row, job.created_count), ('failed', 4, 4))
+        self.assertEqual(len(job.chunk_reports), 2)
+        self.assertEqual(job.assigned_counts, {str(self.employees[0].pk): 4})
+
+        # Uploading the same file again resumes the failed import.
+        response = self.client.post('/api/tasks/import/', {'file': self.ndjson(*lines)})
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['id'], job.pk)
+        self.assertEqual(Task.objects.count(), 5)
+        self.assertEqual(sorted(Task.objects.values_list('title', flat=True)), [f'task {index}' for index in range(5)])
+
+        response = self.client.post('/api/tasks/import/', {'file': self.ndjson(*lines)})
+        self.assertEqual(response.status_code, 409)
+
+
+class SearchTests(TaskTestCase):
+    def search(self, text):
+        response = self.client.get('/api/tasks/', {'q': text})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.json()['results']]
+
+    def test_title_matches_rank_first(self):
+        in_description, in_title, unrelated = self.create_tasks(3)
+        Task.objects.filter(pk=in_description.pk).update(description='quarterly report draft')
+        Task.objects.filter(pk=in_title.pk).update(title='quarterly report')
+        self.assertEqual(self.search('quarterly repo'), [in_title.pk, in_description.pk])
+
+    def test_index_follows_writes(self):
+        task, = self.create_tasks(1, title='invoice')
+        self.assertEqual(self.search('invoice'), [task.pk])
+        clear_caches()
+        Task.objects.filter(pk=task.pk).update(title='receipt')
+        self.assertEqual(self.search('invoice'), [])
+        clear_caches()
+        self.assertEqual(self.search('receipt'), [task.pk])
+        task.delete()
+        clear_caches()
+        self.assertEqual(self.search('receipt'), [])
+
+
+class TombstonePurgeTests(TaskTestCase):
+    def test_purges_expired_tombstones_only(self):
+        tasks = self.create_tasks(5)
+        for task in tasks:
+            task.delete()
+        self.assertEqual(TaskTombstone.objects.count(), 5)
+        expired = [tombstone.pk for tombstone in TaskTombstone.objects.all()[:3]]
+        TaskTombstone.objects.filter(pk__in=expired).update(removed_at=timezone.now() - timezone.timedelta(days=31))
+
+        self.assertEqual(purge_tombstones(TaskTombstone, batch_size=2), 3)
+        self.assertFalse(TaskTombstone.objects.filter(pk__in=expired).exists())
+        self.assertEqual(TaskTombstone.objects.count(), 2)
+
+
+class DeltaSyncTests(TaskTestCase):
+    def sync(self, client, since):
+        response = client.get('/api/tasks/sync/', {'since': since.isoformat()} if since else {})
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def test_without_watermark_asks_for_reset(self):
+        payload = self.sync(self.client, None)
+        self.assertTrue(payload['reset'])
+        self.assertIn('watermark', payload)
+
+    def test_changes_and_tombstones(self):
+        # Assigned to employees 0, 1, 2 and 0.
+        kept, changed, deleted, reassigned = self.create_tasks(4)
+        since = timezone.now()
+        Task.objects.filter(pk=kept.pk).update(updated_at=since - timezone.timedelta(minutes=1))
+        changed.title = 'changed'
+        changed.save()
+        deleted_pk = deleted.pk
+        deleted.delete()
+        reassigned.assigned_to = self.employees[1]
+        reassigned.save()
+
+        payload = self.sync(self.client, since)
+        self.assertFalse(payload['reset'])
+        self.assertEqual(sorted(row['id'] for row in payload['results']), [changed.pk, reassigned.pk])
+        # Admins see every task, so only deletions leave their list.
+        self.assertEqual(payload['deleted'], [deleted_pk])
+
+        payload = self.sync(self.client_for(self.employees[0]), since)
+        self.assertEqual((payload['results'], payload['deleted']), ([], [reassigned.pk]))
+        payload = self.sync(self.client_for(self.employees[1]), since)
+        self.assertEqual(sorted(row['id'] for row in payload['results']), [changed.pk, reassigned.pk])
+        self.assertEqual(payload['deleted'], [])
+        payload = self.sync(self.client_for(self.employees[2]), since)
+        self.assertEqual((payload['results'], payload['deleted']), ([], [deleted_pk]))
+
+    def test_expired_watermark_asks_for_reset(self):
+        payload = self.sync(self.client, timezone.now() - timezone.timedelta(days=31))
+        self.assertTrue(payload['reset'])
+
+
+class OutboxTests(TaskTestCase):
+    def record(self, count):
+        events = []
+        for index in range(count):
+            with outbox.event('test') as event:
+                event.notify(self.employees[0], f'title {index}', 'message')
+            events.append(OutboxEvent.objects.get(key=event.key))
+        return events
+
+    def failing_for(self, bad, error):
+        def consumer(events):
+            if any(outbox_event.pk == bad.pk for outbox_event in events):
+                raise error
+            outbox.deliver_notifications(events)
+        return mock.patch.object(outbox, 'CONSUMERS', (('notifications', consumer),))
+
+    def make_due(self, outbox_event, **fields):
+        OutboxEvent.objects.filter(pk=outbox_event.pk).update(available_at=timezone.now(), **fields)
+
+    def test_delivers_notifications_once(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post('/api/tasks/', {
+                'title': 'task', 'description': 'description', 'assigned_to': self.employees[0].pk,
+                'due_date': (timezone.now() + timezone.timedelta(days=1)).isoformat(),
+            }, format='json')
+        self.assertEqual(response.status_code, 201)
+        event = OutboxEvent.objects.get(kind='task_created')
+        self.assertIsNotNone(event.processed_at)
+        self.assertEqual(Notification.objects.filter(user=self.employees[0]).count(), 1)
+
+        OutboxEvent.objects.update(processed_at=None, available_at=timezone.now())
+        outbox.dispatch_pending()
+        self.assertEqual(Notification.objects.filter(user=self.employees[0]).count(), 1)
+
+    def test_failed_event_does_not_hold_back_others(self):
+        good, bad = self.record(2)
+        with self.failing_for(bad, ValueError('bad payload')):
+            self.assertEqual(outbox.dispatch_pending(), 1)
+        good.refresh_from_db()
+        bad.refresh_from_db()
+        self.assertIsNotNone(good.processed_at)
+        self.assertIsNone(bad.processed_at)
+        self.assertEqual(bad.attempts, 1)
+        self.assertGreater(bad.available_at, timezone.now())
+        self.assertIn('bad payload', bad.last_error)
+        self.assertEqual(Notification.objects.count(), 1)
+
+    def test_gives_up_after_max_attempts(self):
+        bad, = self.record(1)
+        self.make_due(bad, attempts=outbox.outbox_setting('MAX_ATTEMPTS') - 1)
+        with self.failing_for(bad, ValueError('bad payload')):
+            outbox.dispatch_pending()
+        bad.refresh_from_db()
+        self.assertIsNone(bad.available_at)
+
+        outbox.retry(OutboxEvent.objects.all())
+        outbox.dispatch_pending()
+        bad.refresh_from_db()
+        self.assertIsNotNone(bad.processed_at)
+
+    def test_transient_errors_back_off_without_giving_up(self):
+        bad, = self.record(1)
+        self.make_due(bad, attempts=outbox.outbox_setting('MAX_ATTEMPTS') + 10)
+        with self.failing_for(bad, OperationalError('database is locked')):
+            outbox.dispatch_pending()
+        bad.refresh_from_db()
+        self.assertIsNone(bad.processed_at)
+        delay = (bad.available_at - timezone.now()).total_seconds()
+        self.assertTrue(0 < delay <= outbox.outbox_setting('MAX_BACKOFF'))
+
+    def test_flush_stops_the_worker_first(self):
+        worker = outbox.OutboxWorker()
+        with mock.patch.object(outbox, 'dispatch_pending') as dispatch_pending, \
+                mock.patch.object(outbox, 'purge_processed'):
+            worker.wake()
+            worker.flush()
+            self.assertFalse(worker._thread.is_alive())
+            self.assertTrue(dispatch_pending.called)
+            calls = dispatch_pending.call_count
+            worker.wake()
+            self.assertEqual(dispatch_pending.call_count, calls)
+
+
+@override_settings(TASKS_OUTBOX={'ASYNC': False})
+class OutboxCommitTests(TransactionTestCase):
+    def test_task_deleted_before_dispatch(self):
+        admin = User.objects.create_user('admin', password='x', role='admin')
+        employee = User.objects.create_user('employee', password='x')
+        with mock.patch.object(outbox, 'dispatch_soon'):
+            with outbox.event('task_created') as event:
+                task = Task.objects.create(
+                    title='task', description='description', created_by=admin, assigned_to=employee,
+                    due_date=timezone.now() + timezone.timedelta(days=1),
+                )
+                event.notify(employee, 'title', 'message', task=task)
+            task.delete()
+
+        outbox.dispatch_pending()
+        self.assertFalse(OutboxEvent.objects.filter(processed_at__isnull=True).exists())
+        notification = Notification.objects.get(user=employee)
+        self.assertIsNone(notification.task_id)
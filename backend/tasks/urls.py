@@ -1,10 +1,21 @@
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
+
+# Async read endpoints under ASGI, see taskapp.async_api
+reads = async_views if settings.ASYNC_VIEWS else views
 
 urlpatterns = [
-    path('', views.task_list_create, name='task_list_create'),
-    path('<int:pk>/', views.task_detail, name='task_detail'),
+    path('', reads.task_list_create, name='task_list_create'),
+    path('sync/', views.task_sync, name='task_sync'),
+    path('bulk/', views.task_bulk, name='task_bulk'),
+    path('export/<str:export_format>/', views.task_export, name='task_export'),
+    path('import/', views.task_import, name='task_import'),
+    path('import/<int:pk>/', views.task_import_detail, name='task_import_detail'),
+    path('<int:pk>/', reads.task_detail, name='task_detail'),
     path('evaluations/', views.evaluation_list_create, name='evaluation_list_create'),
-    path('statistics/', views.task_statistics, name='task_statistics'),
+    path('evaluations/export/<str:export_format>/', views.evaluation_export, name='evaluation_export'),
+    path('statistics/', reads.task_statistics, name='task_statistics'),
+    path('performance/', views.task_performance, name='task_performance'),
 ]
 
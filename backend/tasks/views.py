@@ -1,41 +1,50 @@
 from rest_framework import status
-from rest_framework.decorators import api_view, permission_classes
+from rest_framework.decorators import api_view, parser_classes, permission_classes
+from rest_framework.parsers import MultiPartParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.response import Response
 from django.db.models import Q
-from .models import Task, TaskEvaluation
+from django.utils import timezone
+from taskapp.pagination import KeysetPagination
+from taskapp.response_cache import conditional_response
+from taskapp.exports import streaming_response
+from taskapp.sync import collect, sync_window
+from . import analytics, bulk, caching, imports, outbox, statistics, sync
+from .exports import EVALUATIONS, TASKS
+from .filters import filter_evaluations, filter_tasks
+from .models import EmployeePerformance, Task, TaskEvaluation, TaskImport
+from .search import search_tasks
 from .serializers import (
     TaskSerializer, TaskCreateSerializer, TaskUpdateSerializer,
-    TaskEvaluationSerializer, TaskEvaluationCreateSerializer
+    TaskEvaluationSerializer, TaskEvaluationCreateSerializer,
+    TaskValuesSerializer, TaskEvaluationValuesSerializer, TaskImportSerializer,
+    EmployeePerformanceSerializer
 )
 
 
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@conditional_response(caching.request_scopes)
 def task_list_create(request):
     if request.method == 'GET':
-        tasks = Task.objects.all()
+        tasks = filter_tasks(Task.objects.all(), request.user, request.query_params)
         
-        # Filtering based on user role
-        if request.user.is_employee:
-            tasks = tasks.filter(assigned_to=request.user)
-        elif request.user.is_admin:
-            # Admin can see all tasks or filter by created_by
-            created_by = request.query_params.get('created_by')
-            if created_by:
-                tasks = tasks.filter(created_by_id=created_by)
-        
-        # Additional filters
-        status_filter = request.query_params.get('status')
-        if status_filter:
-            tasks = tasks.filter(status=status_filter)
-        
-        priority_filter = request.query_params.get('priority')
-        if priority_filter:
-            tasks = tasks.filter(priority=priority_filter)
-        
-        serializer = TaskSerializer(tasks, many=True)
-        return Response(serializer.data)
+        paginator = KeysetPagination()
+        serializer = TaskValuesSerializer.for_request(request)
+        query = request.query_params.get('q', '').strip()
+        if query:
+            # Ranked search returns the best matches only, without a cursor.
+            tasks = search_tasks(tasks, query)
+            page = list(serializer.values(tasks)[:paginator.get_page_size(request)])
+            pagination = {'next': None, 'next_cursor': None}
+        else:
+            page = paginator.paginate_queryset(serializer.values(tasks), request)
+            pagination = paginator.get_paginated_data()
+        return Response({
+            **pagination,
+            'results': serializer.render(page),
+            **serializer.sideloaded(),
+        })
     
     elif request.method == 'POST':
         if not request.user.is_admin:
@@ -46,27 +55,60 @@ def task_list_create(request):
         
         serializer = TaskCreateSerializer(data=request.data)
         if serializer.is_valid():
-            task = serializer.save(created_by=request.user)
-            
-            # Create notification for assigned employee
-            if task.assigned_to:
-                from notifications.models import Notification
-                Notification.objects.create(
-                    user=task.assigned_to,
-                    title='مهمة جديدة',
-                    message=f'تم تعيين مهمة جديدة لك: {task.title}',
-                    task=task
-                )
+            with outbox.event('task_created') as event:
+                task = serializer.save(created_by=request.user)
+                event.task_id = task.pk
+                
+                # Notify the assigned employee
+                if task.assigned_to_id:
+                    event.notify(
+                        task.assigned_to_id,
+                        title='مهمة جديدة',
+                        message=f'تم تعيين مهمة جديدة لك: {task.title}',
+                        task=task
+                    )
             
             return Response(TaskSerializer(task).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_sync(request):
+    """Tasks created or changed since ``?since=`` and ids removed from the list, see taskapp.sync."""
+    try:
+        since, watermark = sync_window(request.query_params.get('since'))
+    except ValueError:
+        return Response({'error': 'قيمة since غير صالحة'}, status=status.HTTP_400_BAD_REQUEST)
+    
+    serializer = TaskValuesSerializer.for_request(request)
+    changes = None
+    if since is not None:
+        # The whole list the user can see; filters are applied client-side.
+        tasks = filter_tasks(Task.objects.all(), request.user, {}).filter(updated_at__gt=since)
+        changes = collect(
+            serializer.values(tasks.order_by('updated_at', 'id')),
+            sync.removed_ids(request.user, since),
+        )
+    if changes is None:
+        return Response({'reset': True, 'watermark': serializer.format_datetime(watermark)})
+    
+    rows, deleted = changes
+    return Response({
+        'reset': False,
+        'watermark': serializer.format_datetime(watermark),
+        'results': serializer.render(rows),
+        'deleted': deleted,
+        **serializer.sideloaded(),
+    })
+
+
 @api_view(['GET', 'PUT', 'DELETE'])
 @permission_classes([IsAuthenticated])
+@conditional_response(caching.request_scopes)
 def task_detail(request, pk):
     try:
-        task = Task.objects.get(pk=pk)
+        task = TaskSerializer.setup_eager_loading(Task.objects.all()).get(pk=pk)
     except Task.DoesNotExist:
         return Response({'error': 'المهمة غير موجودة'}, status=status.HTTP_404_NOT_FOUND)
     
@@ -82,6 +124,7 @@ def task_detail(request, pk):
         return Response(serializer.data)
     
     elif request.method == 'PUT':
+        extra = {}
         if request.user.is_employee:
             # Employees can only update status
             if 'status' not in request.data:
@@ -90,26 +133,23 @@ def task_detail(request, pk):
                     status=status.HTTP_403_FORBIDDEN
                 )
             if request.data.get('status') == 'completed':
-                from django.utils import timezone
-                task.completed_at = timezone.now()
-                task.save()
-            
-            serializer = TaskUpdateSerializer(task, data=request.data, partial=True)
-        else:
-            serializer = TaskUpdateSerializer(task, data=request.data, partial=True)
+                extra['completed_at'] = timezone.now()
         
+        serializer = TaskUpdateSerializer(task, data=request.data, partial=True)
         if serializer.is_valid():
-            serializer.save()
-            
-            # Notify admin when employee updates status
-            if request.user.is_employee and 'status' in request.data:
-                from notifications.models import Notification
-                Notification.objects.create(
-                    user=task.created_by,
-                    title='تحديث المهمة',
-                    message=f'تم تحديث حالة المهمة "{task.title}" من قبل {request.user.username}',
-                    task=task
-                )
+            # One write for the fields and completed_at, and the outbox row
+            # in the same transaction.
+            with outbox.event('task_updated', task.pk) as event:
+                serializer.save(**extra)
+                
+                # Notify admin when employee updates status
+                if request.user.is_employee and 'status' in request.data:
+                    event.notify(
+                        task.created_by_id,
+                        title='تحديث المهمة',
+                        message=f'تم تحديث حالة المهمة "{task.title}" من قبل {request.user.username}',
+                        task=task
+                    )
             
             return Response(TaskSerializer(task).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -120,23 +160,114 @@ def task_detail(request, pk):
                 {'error': 'فقط منشئ المهمة يمكنه حذفها'},
                 status=status.HTTP_403_FORBIDDEN
             )
-        task.delete()
+        with outbox.event('task_deleted', task.pk):
+            task.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
+@api_view(['POST', 'PATCH', 'DELETE'])
+@permission_classes([IsAuthenticated])
+def task_bulk(request):
+    """
+    POST: a list of tasks to create. PATCH: a list of {"id": ..., <fields>}.
+    DELETE: {"ids": [...]}. Valid items are written together; invalid ones
+    are reported in "errors" with their index in the payload.
+    """
+    if request.method != 'PATCH' and not request.user.is_admin:
+        return Response(
+            {'error': 'فقط المدير يمكنه إنشاء أو حذف المهام'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    
+    items = request.data.get('ids') if request.method == 'DELETE' else request.data
+    if not isinstance(items, list) or not items:
+        return Response({'error': 'يجب إرسال قائمة غير فارغة'}, status=status.HTTP_400_BAD_REQUEST)
+    if len(items) > bulk.max_items():
+        return Response(
+            {'error': f'الحد الأقصى {bulk.max_items()} عنصر في الطلب الواحد'},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    
+    if request.method == 'POST':
+        tasks, errors = bulk.bulk_create_tasks(items, request.user)
+        data = {'created': TaskSerializer(tasks, many=True).data, 'errors': errors}
+        success_status = status.HTTP_201_CREATED
+    elif request.method == 'PATCH':
+        tasks, errors = bulk.bulk_update_tasks(items, request.user)
+        data = {'updated': TaskSerializer(tasks, many=True).data, 'errors': errors}
+        success_status = status.HTTP_200_OK
+    else:
+        deleted, errors = bulk.bulk_delete_tasks(items, request.user)
+        data = {'deleted': deleted, 'errors': errors}
+        success_status = status.HTTP_200_OK
+    
+    if errors and len(errors) == len(items):
+        return Response(data, status=status.HTTP_400_BAD_REQUEST)
+    return Response(data, status=success_status)
+
+
+@api_view(['POST'])
+@permission_classes([IsAuthenticated])
+@parser_classes([MultiPartParser])
+def task_import(request):
+    if not request.user.is_admin:
+        return Response(
+            {'error': 'فقط المدير يمكنه استيراد المهام'},
+            status=status.HTTP_403_FORBIDDEN
+        )
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({'file': ['هذا الحقل مطلوب']}, status=status.HTTP_400_BAD_REQUEST)
+    
+    restart = request.data.get('restart') == 'true'
+    try:
+        job = imports.start_import(upload, upload.name, request.user, request.data.get('format'), restart)
+    except ValueError as exc:
+        return Response({'error': str(exc), 'formats': list(imports.FORMATS)}, status=status.HTTP_400_BAD_REQUEST)
+    if job.status == 'completed':
+        return Response(
+            {'error': 'تم استيراد هذا الملف مسبقاً', 'import': TaskImportSerializer(job).data},
+            status=status.HTTP_409_CONFLICT
+        )
+    
+    try:
+        imports.run_import(job, upload)
+    except imports.ImportFailed as exc:
+        # Committed chunks are kept; uploading the same file again resumes.
+        return Response(
+            {'error': f'توقف الاستيراد: {exc}', 'import': TaskImportSerializer(job).data},
+            status=status.HTTP_400_BAD_REQUEST
+        )
+    return Response(TaskImportSerializer(job).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_import_detail(request, pk):
+    try:
+        job = TaskImport.objects.get(pk=pk, created_by=request.user)
+    except TaskImport.DoesNotExist:
+        return Response({'error': 'عملية الاستيراد غير موجودة'}, status=status.HTTP_404_NOT_FOUND)
+    return Response(TaskImportSerializer(job).data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_export(request, export_format):
+    return streaming_response(request, TASKS, export_format, request.user, request.query_params)
+
+
 @api_view(['GET', 'POST'])
 @permission_classes([IsAuthenticated])
+@conditional_response(caching.request_scopes)
 def evaluation_list_create(request):
     if request.method == 'GET':
-        evaluations = TaskEvaluation.objects.all()
-        
-        if request.user.is_employee:
-            evaluations = evaluations.filter(task__assigned_to=request.user)
-        elif request.user.is_admin:
-            evaluations = evaluations.filter(evaluated_by=request.user)
+        evaluations = filter_evaluations(TaskEvaluation.objects.all(), request.user)
         
-        serializer = TaskEvaluationSerializer(evaluations, many=True)
-        return Response(serializer.data)
+        serializer = TaskEvaluationValuesSerializer.for_request(request)
+        data = serializer.render(serializer.values(evaluations))
+        sideloaded = serializer.sideloaded()
+        return Response({'results': data, **sideloaded} if sideloaded else data)
     
     elif request.method == 'POST':
         if not request.user.is_admin:
@@ -147,49 +278,73 @@ def evaluation_list_create(request):
         
         serializer = TaskEvaluationCreateSerializer(data=request.data)
         if serializer.is_valid():
-            evaluation = serializer.save(evaluated_by=request.user)
-            
-            # Notify employee about evaluation
-            from notifications.models import Notification
-            Notification.objects.create(
-                user=evaluation.task.assigned_to,
-                title='تقييم المهمة',
-                message=f'تم تقييم مهمتك "{evaluation.task.title}" بتقييم {evaluation.rating}',
-                task=evaluation.task
-            )
+            with outbox.event('task_evaluated', serializer.validated_data['task'].pk) as event:
+                evaluation = serializer.save(evaluated_by=request.user)
+                
+                # Notify employee about evaluation
+                if evaluation.task.assigned_to_id:
+                    event.notify(
+                        evaluation.task.assigned_to_id,
+                        title='تقييم المهمة',
+                        message=f'تم تقييم مهمتك "{evaluation.task.title}" بتقييم {evaluation.rating}',
+                        task=evaluation.task
+                    )
             
             return Response(TaskEvaluationSerializer(evaluation).data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def evaluation_export(request, export_format):
+    return streaming_response(request, EVALUATIONS, export_format, request.user, request.query_params)
+
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
 def task_statistics(request):
-    if request.user.is_admin:
-        total_tasks = Task.objects.count()
-        pending_tasks = Task.objects.filter(status='pending').count()
-        in_progress_tasks = Task.objects.filter(status='in_progress').count()
-        completed_tasks = Task.objects.filter(status='completed').count()
-        overdue_tasks = Task.objects.filter(status__in=['pending', 'in_progress']).extra(
-            where=["due_date < datetime('now')"]
-        ).count()
-    else:
-        total_tasks = Task.objects.filter(assigned_to=request.user).count()
-        pending_tasks = Task.objects.filter(assigned_to=request.user, status='pending').count()
-        in_progress_tasks = Task.objects.filter(assigned_to=request.user, status='in_progress').count()
-        completed_tasks = Task.objects.filter(assigned_to=request.user, status='completed').count()
-        overdue_tasks = Task.objects.filter(
-            assigned_to=request.user,
-            status__in=['pending', 'in_progress']
-        ).extra(
-            where=["due_date < datetime('now')"]
-        ).count()
+    scope = statistics.scope_for_user(request.user)
+    data = dict(statistics.get_statistics(scope))
+    
+    # Optional breakdowns, e.g. ?breakdown=priority,assignee
+    breakdowns = request.query_params.get('breakdown')
+    if breakdowns:
+        for breakdown in breakdowns.split(','):
+            if breakdown not in statistics.BREAKDOWNS:
+                return Response(
+                    {'error': f'تقسيم غير مدعوم: {breakdown}'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+            data[f'by_{breakdown}'] = statistics.get_statistics(scope, breakdown)
+    
+    return Response(data)
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+def task_performance(request):
+    """
+    Per-employee monthly summaries from tasks.analytics, optionally limited
+    with ?employee=<id>, ?from=YYYY-MM and ?to=YYYY-MM. Employees only see
+    their own.
+    """
+    summaries = EmployeePerformance.objects.select_related('employee')
+    if request.user.is_employee:
+        summaries = summaries.filter(employee=request.user)
+    elif request.query_params.get('employee'):
+        if not request.query_params['employee'].isdigit():
+            return Response({'error': 'معرف الموظف غير صالح'}, status=status.HTTP_400_BAD_REQUEST)
+        summaries = summaries.filter(employee_id=request.query_params['employee'])
+    
+    try:
+        if request.query_params.get('from'):
+            summaries = summaries.filter(period__gte=analytics.parse_period(request.query_params['from']))
+        if request.query_params.get('to'):
+            summaries = summaries.filter(period__lte=analytics.parse_period(request.query_params['to']))
+    except ValueError:
+        return Response({'error': 'صيغة الفترة غير صالحة، استخدم YYYY-MM'}, status=status.HTTP_400_BAD_REQUEST)
     
     return Response({
-        'total_tasks': total_tasks,
-        'pending_tasks': pending_tasks,
-        'in_progress_tasks': in_progress_tasks,
-        'completed_tasks': completed_tasks,
-        'overdue_tasks': overdue_tasks,
+        'results': EmployeePerformanceSerializer(summaries, many=True).data,
+        'totals': analytics.employee_totals(summaries),
     })
-
@@ -7,6 +7,7 @@ import { useAuth } from '../context/AuthContext';
 import NotificationPanel from './NotificationPanel';
 import LanguageSwitcher from './LanguageSwitcher';
 import api from '../services/api';
+import { REFRESH_INTERVAL, subscribeToNotifications } from '../services/notificationStream';
 
 const Layout = ({ children }) => {
   const { user, logout } = useAuth();
@@ -26,8 +27,17 @@ const Layout = ({ children }) => {
     };
 
     fetchUnreadCount();
-    const interval = setInterval(fetchUnreadCount, 30000); // Poll every 30 seconds
-    return () => clearInterval(interval);
+    // Live updates, with a slow refresh for events the stream cannot see
+    const interval = setInterval(fetchUnreadCount, REFRESH_INTERVAL);
+    const unsubscribe = subscribeToNotifications((event, data) => {
+      if (event === 'unread_count') {
+        setUnreadCount(data.unread_count || 0);
+      }
+    });
+    return () => {
+      clearInterval(interval);
+      unsubscribe();
+    };
   }, []);
 
   const handleLogout = async () => {
@@ -14,6 +14,7 @@ import {
 } from '@mui/material';
 import { Close, Delete } from '@mui/icons-material';
 import api from '../services/api';
+import { NOTIFICATION_FIELDS, REFRESH_INTERVAL, subscribeToNotifications } from '../services/notificationStream';
 import { formatDistanceToNow } from 'date-fns';
 import { ar } from 'date-fns/locale';
 
@@ -25,16 +26,29 @@ const NotificationPanel = ({ open, onClose }) => {
   useEffect(() => {
     if (open) {
       fetchNotifications();
-      // Poll for new notifications every 30 seconds
-      const interval = setInterval(fetchNotifications, 30000);
-      return () => clearInterval(interval);
+      // New notifications are pushed by the server while the panel is open;
+      // the slow refresh catches those the stream cannot see
+      const interval = setInterval(fetchNotifications, REFRESH_INTERVAL);
+      const unsubscribe = subscribeToNotifications((event, data) => {
+        if (event === 'notification') {
+          setNotifications(prev => (
+            prev.some(notif => notif.id === data.id) ? prev : [data, ...prev]
+          ));
+        } else if (event === 'unread_count') {
+          setUnreadCount(data.unread_count || 0);
+        }
+      });
+      return () => {
+        clearInterval(interval);
+        unsubscribe();
+      };
     }
   }, [open]); // eslint-disable-line react-hooks/exhaustive-deps
 
   const fetchNotifications = async () => {
     try {
       setLoading(true);
-      const response = await api.get('/notifications/');
+      const response = await api.get('/notifications/', { params: { fields: NOTIFICATION_FIELDS } });
       setNotifications(response.data.notifications || []);
       setUnreadCount(response.data.unread_count || 0);
     } catch (error) {
@@ -70,7 +84,7 @@ const NotificationPanel = ({ open, onClose }) => {
 
   const handleMarkAllRead = async () => {
     try {
-      await api.get('/notifications/?mark_all_read=true');
+      await api.get('/notifications/', { params: { mark_all_read: 'true', fields: 'id' } });
       setNotifications(prev => prev.map(notif => ({ ...notif, is_read: true })));
       setUnreadCount(0);
     } catch (error) {
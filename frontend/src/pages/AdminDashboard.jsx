@@ -40,6 +40,7 @@ import 'react-toastify/dist/ReactToastify.css';
 
 const AdminDashboard = () => {
   const [tasks, setTasks] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [employees, setEmployees] = useState([]);
   const [statistics, setStatistics] = useState({});
   const [loading, setLoading] = useState(true);
@@ -66,10 +67,13 @@ const AdminDashboard = () => {
     fetchStatistics();
   }, []);
 
-  const fetchTasks = async () => {
+  const fetchTasks = async (cursor = null) => {
     try {
-      const response = await api.get('/tasks/');
-      setTasks(response.data);
+      const params = cursor ? { cursor } : {};
+      const response = await api.get('/tasks/', { params });
+      const { results, next_cursor } = response.data;
+      setTasks((current) => (cursor ? [...current, ...results] : results));
+      setNextCursor(next_cursor);
     } catch (error) {
       toast.error('حدث خطأ في تحميل المهام');
     } finally {
@@ -367,6 +371,14 @@ const AdminDashboard = () => {
         </Table>
       </TableContainer>
 
+      {nextCursor && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+          <Button variant="outlined" onClick={() => fetchTasks(nextCursor)}>
+            تحميل المزيد
+          </Button>
+        </Box>
+      )}
+
       {/* Create/Edit Task Dialog */}
       <Dialog open={openDialog} onClose={handleCloseDialog} maxWidth="md" fullWidth>
         <DialogTitle>{selectedTask ? 'تعديل المهمة' : 'مهمة جديدة'}</DialogTitle>
@@ -6,6 +6,7 @@ import {
   Card,
   CardContent,
   Typography,
+  Button,
   Table,
   TableBody,
   TableCell,
@@ -34,6 +35,7 @@ import 'react-toastify/dist/ReactToastify.css';
 
 const EmployeeDashboard = () => {
   const [tasks, setTasks] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [statistics, setStatistics] = useState({});
   const [loading, setLoading] = useState(true);
   const [statusFilter, setStatusFilter] = useState('all');
@@ -47,11 +49,16 @@ const EmployeeDashboard = () => {
     loadData();
   }, [statusFilter]); // eslint-disable-line react-hooks/exhaustive-deps
 
-  const fetchTasks = async () => {
+  const fetchTasks = async (cursor = null) => {
     try {
       const params = statusFilter !== 'all' ? { status: statusFilter } : {};
+      if (cursor) {
+        params.cursor = cursor;
+      }
       const response = await api.get('/tasks/', { params });
-      setTasks(response.data);
+      const { results, next_cursor } = response.data;
+      setTasks((current) => (cursor ? [...current, ...results] : results));
+      setNextCursor(next_cursor);
     } catch (error) {
       toast.error('حدث خطأ في تحميل المهام');
     } finally {
@@ -259,6 +266,14 @@ const EmployeeDashboard = () => {
         </Table>
       </TableContainer>
 
+      {nextCursor && (
+        <Box sx={{ display: 'flex', justifyContent: 'center', mt: 2 }}>
+          <Button variant="outlined" onClick={() => fetchTasks(nextCursor)}>
+            تحميل المزيد
+          </Button>
+        </Box>
+      )}
+
       <ToastContainer position="top-left" rtl={true} />
     </Container>
   );
@@ -0,0 +1,134 @@
+import api from './api';
+
+// One shared connection per tab: Server-Sent Events when the backend runs
+// under ASGI, long-polling otherwise.
+const listeners = new Set();
+let source = null;
+let streaming = false;
+let polling = false;
+let failures = 0;
+let reconnectTimer = null;
+
+const MAX_STREAM_FAILURES = 3;
+const RECONNECT_DELAY = 3000;
+
+// Only what the notification panel renders; see ?fields= on the API.
+export const NOTIFICATION_FIELDS = 'id,title,message,is_read,created_at';
+
+// Events published by another worker or by the outbox dispatcher only reach
+// this connection through a shared broker (REDIS_URL), so views also refetch
+// at this slow interval.
+export const REFRESH_INTERVAL = 120000;
+
+const emit = (event, data) => {
+  listeners.forEach((listener) => listener(event, data));
+};
+
+const poll = async () => {
+  let since = null;
+  while (polling) {
+    try {
+      const params = since !== null ? { since, fields: NOTIFICATION_FIELDS } : { fields: NOTIFICATION_FIELDS };
+      const response = await api.get('/notifications/poll/', { params, timeout: 60000 });
+      const { notifications, unread_count, last_id } = response.data;
+      if (since !== null) {
+        notifications.slice().reverse().forEach((notification) => emit('notification', notification));
+      }
+      emit('unread_count', { unread_count });
+      since = last_id ?? since ?? 0;
+    } catch (error) {
+      // Back off before retrying after a network or server error.
+      await new Promise((resolve) => setTimeout(resolve, 5000));
+    }
+  }
+};
+
+const startPolling = () => {
+  if (!polling) {
+    polling = true;
+    poll();
+  }
+};
+
+const streamFailed = () => {
+  failures += 1;
+  if (failures >= MAX_STREAM_FAILURES) {
+    // The stream keeps failing (e.g. a WSGI deployment): switch to long-polling.
+    streaming = false;
+    startPolling();
+  } else {
+    reconnectTimer = setTimeout(openStream, RECONNECT_DELAY);
+  }
+};
+
+// EventSource cannot send the Authorization header, so each connection uses
+// a single-use ticket instead of putting the token in the URL (and in logs).
+const openStream = async () => {
+  reconnectTimer = null;
+  let ticket;
+  try {
+    ticket = (await api.post('/notifications/stream/ticket/')).data.ticket;
+  } catch (error) {
+    if (streaming) {
+      streamFailed();
+    }
+    return;
+  }
+  if (!streaming || source) {
+    return;
+  }
+
+  source = new EventSource(`${api.defaults.baseURL}/notifications/stream/?ticket=${encodeURIComponent(ticket)}`);
+  source.onopen = () => {
+    failures = 0;
+  };
+  ['notification', 'unread_count'].forEach((event) => {
+    source.addEventListener(event, (message) => emit(event, JSON.parse(message.data).data));
+  });
+  source.onerror = () => {
+    // The ticket is used up: reconnect with a new one rather than letting
+    // EventSource retry the same URL (this also covers MAX_AGE recycling).
+    source.close();
+    source = null;
+    streamFailed();
+  };
+};
+
+const connect = () => {
+  if (!localStorage.getItem('token')) {
+    return;
+  }
+  if (typeof EventSource === 'undefined') {
+    startPolling();
+    return;
+  }
+  streaming = true;
+  openStream();
+};
+
+const disconnect = () => {
+  if (source) {
+    source.close();
+    source = null;
+  }
+  if (reconnectTimer) {
+    clearTimeout(reconnectTimer);
+    reconnectTimer = null;
+  }
+  streaming = false;
+  polling = false;
+  failures = 0;
+};
+
+export const subscribeToNotifications = (listener) => {
+  listeners.add(listener);
+  if (!streaming && !polling) {
+    connect();
+  }
+  return () => {
+    listeners.delete(listener);
+    if (listeners.size === 0) {
+      disconnect();
+    }
+  };
+};